@@ -6,9 +6,11 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 import re
 from typing import  Dict
-from jamo import h2j, j2hcj  
 import json
 
+# Shared with Simulation (Simulation/modules/stroke/hangul_codec.py), install once with `pip install -e .`
+from hangul_codec import decompose, jamo_list
+
 class RobotState(TypedDict):
     text: str
     decomposed_text: List[str]
@@ -267,14 +269,9 @@ def create_tools(state):
 # Node: Decompose Text
 def decompose_text(state):
     """Decompose Hangul syllables into individual jamo characters and count jamo per syllable."""
-    syllables = list(state["text"])
-    decomposed = []
-    syllable_lengths = []
-
-    for syllable in syllables:
-        jamos = list(j2hcj(h2j(syllable)))
-        decomposed.extend(jamos)
-        syllable_lengths.append(len(jamos)) 
+    jamo_ids, lengths = decompose(state["text"])
+    decomposed = jamo_list(jamo_ids)
+    syllable_lengths = lengths.tolist()
 
     state["decomposed_text"] = decomposed
     state["syllable_lengths"] = syllable_lengths
@@ -345,15 +342,15 @@ def apply_global_y_offset(state: Dict[str, any]) -> Dict[str, any]:
     text = state.get("text", "")
     offset_per_char = 0.15
 
-    syllables = list(text)
+    _, syllable_lengths = decompose(text)
+    keys = list(adjusted.keys())
     jamo_index = 0
     updated = {}
 
-    for idx, syllable in enumerate(syllables):
+    for idx, length in enumerate(syllable_lengths.tolist()):
         y_offset = idx * offset_per_char -0.3
-        components = list(j2hcj(h2j(syllable)))
-        for _ in components:
-            key = list(adjusted.keys())[jamo_index]
+        for _ in range(length):
+            key = keys[jamo_index]
             coord = adjusted[key]
 
             new_start = [round(coord["start"][i] + (y_offset if i == 1 else 0.0), 2) for i in range(3)]
@@ -0,0 +1,370 @@
+"""글자 합성과 궤적 생성 hot path 벤치마크 (Isaac Sim 없이 실행)
+
+측정 대상:
+    split_character       puzzle.splitCharacter (글자마다 한 번)
+    hangul_decompose      hangul_codec.decompose (문자열 전체 한 번)
+    make_strokes          puzzle.makeStrokes (글자마다 한 번)
+    make_strings          puzzle.makeStrings (문자열 전체 한 번)
+    compile_stroke_plan   캐시를 비운 뒤 첫 컴파일 (create_follower 비용의 대부분)
+    fr3_tcp_position      fr3_kinematics.tcp_position (음절 수만큼의 임의 관절 벡터를 한 번에)
+    korean.tick           korean.create_follower(...).step 한 틱
+    new_korean.tick       new_korean.create_follower(...).step 한 틱
+    korean.timed_tick     korean.create_timed_trajectory(...).step 한 틱 (미리 계산한 궤적 재생)
+    korean_llm.tick       korean_llm.create_follower(...).step 한 틱 (final-tool_paths.json 고정)
+    trajectory_drawer.tick  TrajectoryDrawer.update_drawing 한 틱 (debug draw는 가짜)
+
+틱 벤치마크는 간단한 1차 추종 모델로 엔드 이펙터를 움직이며 상태 기계를 돌린다.
+follower는 틱 측정 전에 만들며, verbose 출력은 /dev/null로 보낸다.
+
+사용법 (Simulation/ 에서):
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --sizes 1 9 100 --compare benchmarks/results/old.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import datetime
+import tracemalloc
+import subprocess
+import contextlib
+
+import numpy as np
+
+from benchmarks.isaac_stubs import install_isaac_stubs
+
+SIZES = (1, 9, 100, 1000, 10000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 한 측정에 쓸 최소 시간 (s)
+MIN_TIME = 0.2
+# 틱 벤치마크 최대 틱 수 (큰 문자열은 앞부분만 그린다)
+MAX_TICKS = 20000
+# tracemalloc을 켠 채로 돌릴 틱 수 (tracemalloc은 매우 느리다)
+ALLOCATION_TICKS = 2000
+
+# 엔드 이펙터 추종 모델: 매 틱 목표까지 거리의 PLANT_GAIN만큼 이동하고
+# z가 PLANT_SAG만큼 처진다 (0.05 경계에 점근해서 멈추지 않도록)
+PLANT_GAIN = 0.3
+PLANT_SAG = 0.0005
+ORIGINAL_POSITION = np.array([0.5, 0.0, 0.2])
+
+
+def sample_text(count, seed=0) -> str:
+    """가 ~ 힣 범위에서 고른 임의의 음절 문자열 (seed가 같으면 항상 같은 문자열)"""
+    rng = random.Random(seed)
+    return "".join(chr(rng.randrange(0xAC00, 0xD7A4)) for _ in range(count))
+
+
+def _allocations(fn):
+    """fn 한 번 실행 동안 tracemalloc이 본 최대/잔여 메모리 (bytes)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak - before, "retained_bytes": current - before}
+
+
+def measure_call(fn, repeat, min_time=MIN_TIME):
+    """fn 한 번 호출에 걸리는 시간 (ns)
+    Returns:
+        dict: 라운드별 호출당 시간의 min / median, 라운드당 호출 수
+    """
+    start = time.perf_counter_ns()
+    fn()
+    first = time.perf_counter_ns() - start
+    number = max(1, int(min_time * 1e9 / repeat / max(first, 1)))
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter_ns() - start) / number)
+    return {
+        "ns_per_call": float(np.median(rounds)),
+        "ns_per_call_min": float(np.min(rounds)),
+        "calls_per_round": number,
+        "rounds": repeat,
+    }
+
+
+def run_ticks(step, max_ticks):
+    """상태 기계를 추종 모델과 함께 돌리며 틱마다 걸린 시간 기록
+    Args:
+        step: (틱 번호, 획 번호, ee_pos) -> (trajectory, is_stroke_complete, ...)
+        max_ticks (int): 최대 틱 수
+    Returns:
+        tuple: (틱별 시간 ns 배열, 완료한 획 수, 끝까지 그렸는지)
+    """
+    durations = np.empty(max_ticks, dtype=np.int64)
+    ee_pos = ORIGINAL_POSITION + np.array([0.0, 0.0, 0.1])
+    current_stroke = 0
+    finished = False
+    count = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for tick in range(max_ticks):
+            start = time.perf_counter_ns()
+            result = step(tick, current_stroke, ee_pos)
+            durations[tick] = time.perf_counter_ns() - start
+            count = tick + 1
+            trajectory, is_stroke_complete = result[0], result[1]
+            if trajectory is None and is_stroke_complete:
+                finished = True
+                break
+            if trajectory is not None:
+                ee_pos = ee_pos + (trajectory - ee_pos) * PLANT_GAIN
+                ee_pos[2] -= PLANT_SAG
+            if is_stroke_complete:
+                current_stroke += 1
+    return durations[:count], current_stroke, finished
+
+
+def measure_ticks(make_step, max_ticks):
+    """틱 벤치마크 결과 (첫 틱은 따로 기록)
+    Args:
+        make_step: 상태를 초기화하고 step 함수를 돌려주는 함수
+        max_ticks (int): 최대 틱 수
+    """
+    durations, strokes, finished = run_ticks(make_step(), max_ticks)
+    steady = durations[1:] if len(durations) > 1 else durations
+    result = {
+        "ticks": int(len(durations)),
+        "strokes_completed": int(strokes),
+        "finished": finished,
+        "first_tick_ns": int(durations[0]) if len(durations) else 0,
+        "ns_per_tick": float(steady.mean()) if len(steady) else 0.0,
+        "ns_per_tick_p50": float(np.percentile(steady, 50)) if len(steady) else 0.0,
+        "ns_per_tick_p99": float(np.percentile(steady, 99)) if len(steady) else 0.0,
+        "ns_per_tick_max": int(steady.max()) if len(steady) else 0,
+    }
+    allocation_ticks = min(max_ticks, ALLOCATION_TICKS)
+    result.update(_allocations(lambda: run_ticks(make_step(), allocation_ticks)))
+    result["allocation_ticks"] = allocation_ticks
+    return result
+
+
+def _korean_step(module, text):
+    """korean / new_korean 모듈의 follower를 step 함수로 감싸기"""
+    from modules.stroke.stroke_plan import clear_plan_cache
+
+    def make_step():
+        clear_plan_cache()
+        follower = module.create_follower(text, ORIGINAL_POSITION)
+
+        def step(tick, current_stroke, ee_pos):
+            return follower.step(ee_pos, current_stroke)
+
+        return step
+
+    return make_step
+
+
+def _timed_step(module, text):
+    """korean 모듈의 TimedTrajectory를 step 함수로 감싸기"""
+    from modules.stroke.stroke_plan import clear_plan_cache
+
+    def make_step():
+        clear_plan_cache()
+        trajectory = module.create_timed_trajectory(text, ORIGINAL_POSITION)
+
+        def step(tick, current_stroke, ee_pos):
+            return trajectory.step(ee_pos, current_stroke)
+
+        return step
+
+    return make_step
+
+
+def _korean_llm_step():
+    import korean_llm
+
+    def make_step():
+        follower = korean_llm.create_follower(ORIGINAL_POSITION)
+
+        def step(tick, current_stroke, ee_pos):
+            return follower.step(ee_pos, current_stroke)
+
+        return step
+
+    return make_step
+
+
+def _drawer_step():
+    from modules.visualization.trajectory_drawer import TrajectoryDrawer
+
+    def make_step():
+        drawer = TrajectoryDrawer()
+        drawer.initialize()
+
+        def step(tick, current_stroke, ee_pos):
+            drawer.update_drawing(ee_pos)
+            # 목표를 조금씩 옮겨 추종 모델이 계속 움직이게 한다
+            return ee_pos + 0.001, False
+
+        return step
+
+    return make_step
+
+
+def run_benchmarks(sizes=SIZES, repeat=5, max_ticks=MAX_TICKS, seed=0, names=None):
+    """모든 벤치마크를 실행해 결과 리스트 반환
+    Args:
+        sizes: 음절 수 목록
+        repeat (int): 호출 벤치마크 라운드 수
+        max_ticks (int): 틱 벤치마크 최대 틱 수
+        seed (int): 문자열 생성 seed
+        names: 실행할 벤치마크 이름 목록 (None이면 전부)
+    Returns:
+        list: [{"name", "syllables", ...측정값}, ...]
+    """
+    install_isaac_stubs()
+    import puzzle
+    import korean
+    import new_korean
+    from modules.stroke.stroke_plan import compile_stroke_plan, clear_plan_cache
+    from modules.stroke.hangul_codec import decompose
+    from modules.robot_control.fr3_kinematics import tcp_position
+
+    def wanted(name):
+        return names is None or name in names
+
+    results = []
+
+    def record(name, syllables, measured):
+        entry = {"name": name, "syllables": syllables}
+        entry.update(measured)
+        results.append(entry)
+        print(format_row(entry), flush=True)
+
+    for count in sizes:
+        text = sample_text(count, seed)
+        joints = np.random.default_rng(seed).uniform(-2.0, 2.0, size=(count, 7))
+        calls = {
+            "split_character": lambda: [puzzle.splitCharacter(a) for a in text],
+            "hangul_decompose": lambda: decompose(text),
+            "make_strokes": lambda: [puzzle.makeStrokes(a) for a in text],
+            "make_strings": lambda: puzzle.makeStrings(text),
+            "compile_stroke_plan": lambda: (clear_plan_cache(), compile_stroke_plan(text)),
+            "fr3_tcp_position": lambda: tcp_position(joints),
+        }
+        for name, fn in calls.items():
+            if wanted(name):
+                measured = measure_call(fn, repeat)
+                measured["ns_per_syllable"] = measured["ns_per_call"] / count
+                measured.update(_allocations(fn))
+                record(name, count, measured)
+        for name, module in (("korean.tick", korean), ("new_korean.tick", new_korean)):
+            if wanted(name):
+                record(name, count, measure_ticks(_korean_step(module, text), max_ticks))
+        if wanted("korean.timed_tick"):
+            record("korean.timed_tick", count, measure_ticks(_timed_step(korean, text), max_ticks))
+    clear_plan_cache()
+
+    # 문자열 길이와 관계없는 틱 벤치마크
+    if wanted("korean_llm.tick"):
+        record("korean_llm.tick", None, measure_ticks(_korean_llm_step(), max_ticks))
+    if wanted("trajectory_drawer.tick"):
+        record("trajectory_drawer.tick", None, measure_ticks(_drawer_step(), max_ticks))
+    return results
+
+
+def format_row(entry) -> str:
+    syllables = "-" if entry["syllables"] is None else entry["syllables"]
+    if "ns_per_tick" in entry:
+        timing = f"{entry['ns_per_tick']:12.0f} ns/tick  p99 {entry['ns_per_tick_p99']:10.0f}  ({entry['ticks']} ticks)"
+    else:
+        timing = f"{entry['ns_per_call']:12.0f} ns/call  {entry['ns_per_syllable']:10.0f} ns/syllable"
+    return f"{entry['name']:24s} {syllables!s:>6}  {timing}  peak {entry['peak_bytes'] / 1024:9.1f} KiB"
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results, path=None, args=None) -> str:
+    """결과를 JSON으로 저장하고 경로 반환 (path가 없으면 results/<시각>-<커밋>.json)"""
+    commit = _git_commit()
+    now = datetime.datetime.now()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{now:%Y%m%d-%H%M%S}-{commit}.json")
+    payload = {
+        "meta": {
+            "commit": commit,
+            "timestamp": now.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "args": args or {},
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare_results(results, baseline_path, threshold=1.2) -> int:
+    """이전 결과 파일과 비교해 표를 출력하고, threshold배 이상 느려진 항목 수 반환"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(e["name"], e["syllables"]): e for e in baseline["results"]}
+    print(f"\ncompared with {baseline_path} (commit {baseline['meta'].get('commit')})")
+    regressions = 0
+    for entry in results:
+        previous = old.get((entry["name"], entry["syllables"]))
+        if previous is None:
+            continue
+        key = "ns_per_tick" if "ns_per_tick" in entry else "ns_per_call"
+        if not previous.get(key):
+            continue
+        ratio = entry[key] / previous[key]
+        flag = ""
+        if ratio >= threshold:
+            flag = "  << slower"
+            regressions += 1
+        elif ratio <= 1.0 / threshold:
+            flag = "  faster"
+        syllables = "-" if entry["syllables"] is None else entry["syllables"]
+        print(f"{entry['name']:24s} {syllables!s:>6}  {previous[key]:12.0f} -> {entry[key]:12.0f} {key}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="음절 수 목록")
+    parser.add_argument("--repeat", type=int, default=5, help="호출 벤치마크 라운드 수")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="틱 벤치마크 최대 틱 수")
+    parser.add_argument("--seed", type=int, default=0, help="임의 문자열 seed")
+    parser.add_argument("--only", nargs="+", default=None, help="실행할 벤치마크 이름")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.2, help="느려졌다고 볼 배율")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.max_ticks, args.seed, args.only)
+    path = save_results(results, args.output, vars(args))
+    print(f"\nsaved {path}")
+    if args.compare:
+        return 1 if compare_results(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
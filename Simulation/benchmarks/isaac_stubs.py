@@ -0,0 +1,77 @@
+"""Isaac Sim이 없는 환경에서 시뮬레이션 모듈을 import하기 위한 가짜 패키지
+
+isaacsim, omni, pxr, carb 아래 어떤 이름을 import해도 아무 일도 하지 않는
+클래스/함수를 돌려준다. 순수 Python 부분(궤적 생성, 디버그 그리기 버퍼 등)의
+비용만 측정하기 위한 용도이며, 실제 Isaac Sim이 설치되어 있으면 설치하지 않는다.
+"""
+import sys
+import types
+import importlib.abc
+import importlib.machinery
+import importlib.util
+
+STUB_ROOTS = ("isaacsim", "omni", "pxr", "carb")
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+class _StubMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _stub_class(name)
+
+
+class _Stub(metaclass=_StubMeta):
+    """상속, 생성, 속성 조회, 메서드 호출이 모두 되는 빈 객체"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _noop
+
+
+def _stub_class(name):
+    return _StubMeta(name, (_Stub,), {})
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = _stub_class(name)
+        setattr(self, name, value)
+        return value
+
+
+class _StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.split(".")[0] not in STUB_ROOTS:
+            return None
+        return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+
+    def create_module(self, spec):
+        module = _StubModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+def install_isaac_stubs() -> bool:
+    """Isaac Sim이 없으면 가짜 패키지를 등록하는 함수
+    Returns:
+        bool: 가짜 패키지를 등록했으면 True, 실제 Isaac Sim을 쓰면 False
+    """
+    if any(isinstance(f, _StubFinder) for f in sys.meta_path):
+        return True
+    if importlib.util.find_spec("isaacsim") is not None:
+        return False
+    sys.meta_path.append(_StubFinder())
+    return True
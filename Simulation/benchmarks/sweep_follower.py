@@ -0,0 +1,323 @@
+"""TrajectoryFollower의 draw_scale과 상태 전환 거리(approach / start / end tolerance) 매개변수 탐색
+
+매개변수 조합마다 follower를 kinematic_backend의 FR3 모델(resolved-rate IK + 1차 관절 지연)과
+함께 끝까지 돌리고, 아래 값을 기록한다.
+
+    ticks           모든 획을 그릴 때까지 걸린 틱 수 (max_ticks 안에 못 끝내면 finished=False)
+    pen_up_seconds  펜이 종이 위(PEN_DOWN_HEIGHT 이상)에 떠 있던 시간
+    deviation_p95   펜이 닿은 샘플에서 가장 가까운 획 선분까지 거리의 95% / 최대값 (m)
+
+조합은 격자(--search grid) 혹은 가우시안 과정 + expected improvement 베이지안 탐색
+(--search bayes)으로 고르고, 프로세스 풀에서 병렬로 평가한다. 끝나면 (틱 수, 펜 업 시간,
+경로 편차)의 파레토 프런트와 편차 허용치 안에서 가장 빠른 조합을 출력한다.
+
+사용법 (Simulation/ 에서):
+    python -m benchmarks.sweep_follower --workers 4
+    python -m benchmarks.sweep_follower --search bayes --iterations 40 --tolerance 0.004
+"""
+import os
+import sys
+import math
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.bench_hot_paths import save_results
+from modules.robot_control.sim_rates import PEN_DOWN_HEIGHT
+
+PARAMETERS = ("draw_scale", "approach_tolerance", "start_tolerance", "end_tolerance")
+# 지금 main.py / new_main.py / TrajectoryFollower에서 쓰는 값
+BASELINE = {"draw_scale": 1.5, "approach_tolerance": 0.05, "start_tolerance": 0.01, "end_tolerance": 0.02}
+DEFAULT_GRID = {
+    "draw_scale": (1.0, 1.5, 2.0, 3.0),
+    "approach_tolerance": (0.03, 0.05, 0.08),
+    "start_tolerance": (0.005, 0.01, 0.02),
+    "end_tolerance": (0.01, 0.02, 0.03),
+}
+# 베이지안 탐색 범위
+BOUNDS = {
+    "draw_scale": (1.0, 4.0),
+    "approach_tolerance": (0.02, 0.1),
+    "start_tolerance": (0.002, 0.03),
+    "end_tolerance": (0.005, 0.04),
+}
+
+TEXT = "융합프로젝트공모전"
+ORIGINAL_POSITION = (0.5, 0.0, 0.2)
+# 경로 편차 허용치 (m): 이 안에서 가장 빠른 조합을 고른다 (BASELINE은 기구학 모델에서 p95 약 6 mm)
+DEVIATION_TOLERANCE = 0.008
+MAX_TICKS = 30000
+# 편차를 계산할 때 한 번에 비교하는 샘플 수
+DEVIATION_CHUNK = 4096
+OBJECTIVES = ("ticks", "pen_up_seconds", "deviation_p95")
+
+
+def segment_distance(points, starts, ends) -> np.ndarray:
+    """점마다 가장 가까운 선분까지 거리
+    Args:
+        points (np.array): (N, 3) 점
+        starts, ends (np.array): (S, 3) 선분 시작점, 끝점
+    Returns:
+        np.array: (N,) 거리
+    """
+    delta = ends - starts
+    squared = np.maximum((delta * delta).sum(axis=1), 1e-18)
+    distance = np.empty(len(points))
+    for first in range(0, len(points), DEVIATION_CHUNK):
+        chunk = points[first : first + DEVIATION_CHUNK, None, :]
+        t = np.clip(((chunk - starts) * delta).sum(axis=2) / squared, 0.0, 1.0)
+        nearest = starts + t[..., None] * delta
+        distance[first : first + len(chunk)] = np.linalg.norm(chunk - nearest, axis=2).min(axis=1)
+    return distance
+
+
+def simulate(params, text=TEXT, original_position=ORIGINAL_POSITION, mode="segment", max_ticks=MAX_TICKS):
+    """매개변수 한 조합으로 follower와 FR3 모델을 끝까지 돌린 결과
+    Args:
+        params (dict): PARAMETERS 값
+        text (str): 그릴 문자열
+        original_position: 원점 위치
+        mode (str): "segment" 혹은 "polyline"
+        max_ticks (int): 최대 틱 수
+    Returns:
+        dict: params와 ticks, finished, strokes, pen_up_seconds, drawing_seconds,
+            deviation_p95, deviation_max, wall_seconds
+    """
+    from modules.robot_control.fr3_kinematics import tcp_position
+    from modules.robot_control.kinematic_backend import (
+        TARGET_ORIENTATION,
+        KinematicFR3,
+        ResolvedRateController,
+    )
+    from modules.robot_control.sim_rates import PHYSICS_DT
+    from modules.robot_control.trajectory_follower import TrajectoryFollower
+    from modules.stroke.stroke_plan import compile_stroke_plan
+
+    started = time.perf_counter()
+    plan = compile_stroke_plan(text)
+    follower = TrajectoryFollower.from_plan(plan, np.asarray(original_position), mode=mode, **params)
+    robot = KinematicFR3()
+    controller = ResolvedRateController("sweep", robot, PHYSICS_DT)
+
+    path = np.empty((max_ticks, 3))
+    current_stroke = 0
+    ticks = 0
+    while ticks < max_ticks and current_stroke < follower.stroke_count:
+        ee_pos = tcp_position(robot.get_joint_positions())
+        path[ticks] = ee_pos
+        ticks += 1
+        target, is_stroke_complete = follower.step(ee_pos, current_stroke=current_stroke)
+        if target is not None:
+            robot.apply_action(controller.forward(target, TARGET_ORIENTATION))
+        if is_stroke_complete:
+            current_stroke += 1
+        robot.advance(PHYSICS_DT)
+
+    path = path[:ticks]
+    down = path[:, 2] < PEN_DOWN_HEIGHT
+    deviation = segment_distance(path[down], follower.starts, follower.ends)
+    result = {name: float(params[name]) for name in PARAMETERS}
+    result.update(
+        ticks=ticks,
+        finished=current_stroke >= follower.stroke_count,
+        strokes=current_stroke,
+        pen_up_seconds=float((~down).sum() * PHYSICS_DT),
+        drawing_seconds=float(down.sum() * PHYSICS_DT),
+        deviation_p95=float(np.percentile(deviation, 95)) if len(deviation) else 0.0,
+        deviation_max=float(deviation.max()) if len(deviation) else 0.0,
+        wall_seconds=time.perf_counter() - started,
+    )
+    return result
+
+
+def _simulate(job):
+    params, settings = job
+    return simulate(params, **settings)
+
+
+def evaluate(configs, workers=None, **settings) -> list:
+    """매개변수 조합 목록을 프로세스 풀에서 평가 (workers가 1이면 이 프로세스에서 차례로)"""
+    jobs = [(dict(params), settings) for params in configs]
+    if workers == 1:
+        return [_simulate(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_simulate, jobs))
+
+
+def grid_configs(grid=DEFAULT_GRID) -> list:
+    """격자의 모든 조합 (end_tolerance가 start_tolerance보다 작아도 그대로 둔다)"""
+    names = [name for name in PARAMETERS if name in grid]
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def pareto_front(results, objectives=OBJECTIVES) -> list:
+    """끝까지 그린 결과 중 다른 결과에 모든 목표(작을수록 좋음)에서 지지 않는 것들"""
+    finished = [r for r in results if r["finished"]]
+    if not finished:
+        return []
+    values = np.array([[r[k] for k in objectives] for r in finished], dtype=np.float64)
+    no_worse = (values[:, None, :] <= values[None, :, :]).all(axis=2)
+    better = (values[:, None, :] < values[None, :, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    front = [r for r, d in zip(finished, dominated) if not d]
+    return sorted(front, key=lambda r: r["ticks"])
+
+
+def fastest_within(results, tolerance=DEVIATION_TOLERANCE):
+    """경로 편차(deviation_p95)가 tolerance 이하인 결과 중 틱 수가 가장 적은 것 (없으면 None)"""
+    ok = [r for r in results if r["finished"] and r["deviation_p95"] <= tolerance]
+    return min(ok, key=lambda r: r["ticks"]) if ok else None
+
+
+def _score(result, tolerance, max_ticks):
+    """베이지안 탐색의 단일 목표: 틱 수에 허용치를 넘는 편차 비율만큼 벌점 (못 끝내면 2배)"""
+    if not result["finished"]:
+        return 2.0 * max_ticks
+    excess = max(0.0, result["deviation_p95"] - tolerance) / tolerance
+    return result["ticks"] * (1.0 + excess)
+
+
+def _gp_posterior(x, y, candidates, length_scale=0.2, noise=1e-4):
+    """RBF 커널 가우시안 과정의 후보점 평균과 표준편차 (y는 표준화한 값)"""
+
+    def kernel(a, b):
+        d = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d / (length_scale * length_scale))
+
+    K = kernel(x, x) + noise * np.eye(len(x))
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+    Ks = kernel(candidates, x)
+    mean = Ks @ alpha
+    v = np.linalg.solve(L, Ks.T)
+    std = np.sqrt(np.maximum(1.0 - (v * v).sum(axis=0), 1e-12))
+    return mean, std
+
+
+def _expected_improvement(mean, std, best, xi=0.01):
+    """최소화 문제의 expected improvement"""
+    z = (best - mean - xi) / std
+    cdf = 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+    pdf = np.exp(-0.5 * z * z) / np.sqrt(2.0 * np.pi)
+    return (best - mean - xi) * cdf + std * pdf
+
+
+def bayesian_search(
+    bounds=BOUNDS,
+    iterations=32,
+    batch=4,
+    initial=8,
+    tolerance=DEVIATION_TOLERANCE,
+    seed=0,
+    workers=None,
+    candidates=2048,
+    **settings,
+) -> list:
+    """가우시안 과정 + expected improvement로 조합을 batch개씩 골라 평가
+
+    한 번에 여러 조합을 고를 때는 고른 점의 점수를 GP 평균으로 가정하고(constant liar) 다음 점을 고른다.
+
+    Args:
+        bounds (dict): 매개변수별 (최소, 최대)
+        iterations (int): 전체 평가 수 (초기 임의 조합 포함)
+        batch (int): 한 번에 병렬로 평가할 조합 수
+        initial (int): 처음 임의로 평가할 조합 수 (BASELINE 포함)
+        tolerance (float): 경로 편차 허용치
+        seed (int): 난수 seed
+        workers (int): 프로세스 수
+        candidates (int): EI를 계산할 임의 후보 수
+        **settings: simulate 인자 (text, mode, max_ticks 등)
+    Returns:
+        list: 평가한 순서대로의 결과
+    """
+    rng = np.random.default_rng(seed)
+    names = [name for name in PARAMETERS if name in bounds]
+    low = np.array([bounds[n][0] for n in names])
+    high = np.array([bounds[n][1] for n in names])
+    max_ticks = settings.get("max_ticks", MAX_TICKS)
+
+    def to_params(unit):
+        return dict(zip(names, (low + unit * (high - low)).round(6).tolist()))
+
+    baseline = np.clip((np.array([BASELINE[n] for n in names]) - low) / (high - low), 0.0, 1.0)
+    units = [baseline] + list(rng.random((max(initial, 1) - 1, len(names))))
+    results = evaluate([to_params(u) for u in units], workers, **settings)
+
+    while len(results) < iterations:
+        x = np.array(units)
+        scores = np.array([_score(r, tolerance, max_ticks) for r in results])
+        offset, scale = scores.mean(), scores.std() or 1.0
+        y = (scores - offset) / scale
+        pool = rng.random((candidates, len(names)))
+        chosen = []
+        for _ in range(min(batch, iterations - len(results))):
+            mean, std = _gp_posterior(x, y, pool)
+            k = int(np.argmax(_expected_improvement(mean, std, y.min())))
+            chosen.append(pool[k])
+            # constant liar: 고른 점의 결과를 평균으로 가정
+            x = np.vstack([x, pool[k]])
+            y = np.append(y, mean[k])
+            pool = np.delete(pool, k, axis=0)
+        units.extend(chosen)
+        results.extend(evaluate([to_params(u) for u in chosen], workers, **settings))
+    return results
+
+
+def format_result(result) -> str:
+    params = "  ".join(f"{name}={result[name]:<6g}" for name in PARAMETERS)
+    status = "" if result["finished"] else f"  (unfinished, {result['strokes']} strokes)"
+    return (
+        f"{params}  {result['ticks']:6d} ticks  pen up {result['pen_up_seconds']:6.1f} s  "
+        f"deviation p95 {result['deviation_p95'] * 1000:5.2f} mm  max {result['deviation_max'] * 1000:5.2f} mm"
+        f"{status}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search", choices=("grid", "bayes"), default="grid")
+    parser.add_argument("--text", default=TEXT, help="그릴 문자열")
+    parser.add_argument("--mode", choices=("segment", "polyline"), default="segment")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수")
+    parser.add_argument("--iterations", type=int, default=32, help="bayes 평가 수")
+    parser.add_argument("--tolerance", type=float, default=DEVIATION_TOLERANCE, help="경로 편차 허용치 (m)")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="조합마다 최대 틱 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    settings = {"text": args.text, "mode": args.mode, "max_ticks": args.max_ticks}
+    started = time.perf_counter()
+    if args.search == "grid":
+        results = evaluate(grid_configs(), args.workers, **settings)
+    else:
+        results = bayesian_search(
+            iterations=args.iterations,
+            batch=max(args.workers or 1, 1),
+            tolerance=args.tolerance,
+            seed=args.seed,
+            workers=args.workers,
+            **settings,
+        )
+    print(f"{len(results)} configurations in {time.perf_counter() - started:.1f} s\n")
+
+    print("baseline")
+    print(format_result(simulate(BASELINE, **settings)))
+    front = pareto_front(results)
+    print(f"\npareto front ({', '.join(OBJECTIVES)})")
+    for result in front:
+        print(format_result(result))
+    best = fastest_within(results, args.tolerance)
+    print(f"\nfastest within {args.tolerance * 1000:.1f} mm")
+    print(format_result(best) if best else "none")
+
+    path = save_results({"all": results, "pareto": front, "best": best}, args.output, vars(args))
+    print(f"\nsaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,383 @@
+"""녹화한 데이터셋(HDF5)을 chunk 단위로 훑어 통계와 이상 여부를 보여 주는 CLI
+
+파일, glob, 디렉터리(안의 *.h5)를 여러 개 받는다. 파일 안에서 action 데이터셋을 가진 그룹을 모두
+에피소드로 본다 (예전 joints_state.h5의 루트, EpisodeRecorder 파일, DatasetStore 샤드의 episodes/<번호>).
+데이터셋은 HDF5 chunk 크기만큼씩 읽으므로 메모리는 파일 크기와 상관없이 일정하다.
+
+    에피소드    개수, 완료 여부, 길이 (최소 / 평균 / 최대, 총 틱)
+    열마다      최소, 최대, 평균, 표준편차, NaN/inf 개수
+                속도(1차 차분 / dt)와 jerk(3차 차분 / dt^3)의 RMS와 최대 절댓값
+    문제        NaN/inf, 끝까지 그리지 않은 에피소드, 데이터셋 길이 불일치, 빈 에피소드
+
+사용 예:
+    python check.py                                  # joints_state.h5
+    python check.py data/*.h5 --json > stats.json
+    python check.py data/ --per-episode --strict     # 문제가 있으면 종료 코드 1
+    python check.py joints_state.h5 --tree           # 예전처럼 그룹 / 데이터셋 구조만
+"""
+import os
+import sys
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import h5py
+import numpy as np
+
+from modules.robot_control.sim_rates import PHYSICS_DT
+
+DEFAULT_KEYS = ("action", "ee_pose")
+# 연속(contiguous) 데이터셋을 한 번에 읽는 행 수
+READ_ROWS = 4096
+COLUMN_NAMES = {
+    "action": ["joint1", "joint2", "joint3", "joint4", "joint5", "joint6", "joint7", "finger"],
+    "ee_pose": ["x", "y", "z"],
+    "target": ["x", "y", "z"],
+}
+STAT_FIELDS = ("min", "max", "mean", "std", "nan", "vel_rms", "vel_max", "jerk_rms", "jerk_max")
+
 
 def explore_hdf5_group(group, indent=0):
     """ Recursively explore groups and datasets in the HDF5 file """
-    indent_str = '    ' * indent  
+    indent_str = '    ' * indent
+    for key in group:
+        item = group[key]
+        print(f"{indent_str}{key}: {item}")
+        if isinstance(item, h5py.Dataset):
+            print(f"{indent_str}  - Shape: {item.shape}, Type: {item.dtype}")
+        elif isinstance(item, h5py.Group):
+            explore_hdf5_group(item, indent + 1)
+
+
+class RunningStats:
+    """열마다 개수, 평균, 제곱 편차 합, 최소, 최대를 블록 단위로 합치는 통계 (NaN/inf는 따로 센다)
+
+    Args:
+        width (int): 열 수
+    """
+
+    def __init__(self, width):
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.nan = np.zeros(width, dtype=np.int64)
+
+    def update(self, block):
+        """(N, width) 블록 추가"""
+        block = np.asarray(block, dtype=np.float64)
+        finite = np.isfinite(block)
+        if finite.all():
+            # 대부분의 블록은 NaN이 없으므로 마스크 없이 한 번씩만 훑는다
+            count = np.full(block.shape[1], len(block))
+            mean = block.mean(axis=0)
+            m2 = ((block - mean) ** 2).sum(axis=0)
+            self.min = np.minimum(self.min, block.min(axis=0))
+            self.max = np.maximum(self.max, block.max(axis=0))
+            self._combine(count, mean, m2)
+            return
+        count = finite.sum(axis=0)
+        self.nan += len(block) - count
+        if not count.any():
+            return
+        mean = np.where(finite, block, 0.0).sum(axis=0) / np.maximum(count, 1)
+        m2 = (np.where(finite, block - mean, 0.0) ** 2).sum(axis=0)
+        self.min = np.minimum(self.min, np.where(finite, block, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(finite, block, -np.inf).max(axis=0))
+        self._combine(count, mean, m2)
+
+    def merge(self, other):
+        """다른 RunningStats 합치기 (파일별 결과를 모을 때)"""
+        self.nan += other.nan
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count, mean, m2):
+        # Chan 등의 병렬 분산 합치기
+        total = self.count + count
+        safe = np.maximum(total, 1)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / safe
+        self.m2 = self.m2 + m2 + delta**2 * self.count * count / safe
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / np.maximum(self.count, 1))
+
+    @property
+    def rms(self):
+        return np.sqrt(self.std**2 + self.mean**2)
+
+    @property
+    def abs_max(self):
+        return np.maximum(np.abs(self.min), np.abs(self.max))
+
+
+class ColumnStats:
+    """데이터셋 하나의 값, 속도, jerk 통계 (에피소드 경계를 넘어 차분하지 않는다)"""
+
+    def __init__(self, width):
+        self.values = RunningStats(width)
+        self.velocity = RunningStats(width)
+        self.jerk = RunningStats(width)
+        self._tail = None
+
+    def start_episode(self):
+        self._tail = None
+
+    def update(self, block, dt):
+        """에피소드의 다음 블록 추가 (이전 블록의 마지막 3행을 이어 붙여 차분)"""
+        self.values.update(block)
+        rows = block if self._tail is None else np.concatenate([self._tail, block])
+        # 새 행에서 끝나는 차분만 센다
+        for stats, order in ((self.velocity, 1), (self.jerk, 3)):
+            new = min(len(rows) - order, len(block))
+            if new > 0:
+                stats.update(np.diff(rows[-(new + order) :], n=order, axis=0) / dt**order)
+        self._tail = rows[-3:]
+
+    def merge(self, other):
+        self.values.merge(other.values)
+        self.velocity.merge(other.velocity)
+        self.jerk.merge(other.jerk)
+
+    def rows(self) -> list:
+        """열마다 STAT_FIELDS 값"""
+        v, d, j = self.values, self.velocity, self.jerk
+        columns = zip(v.min, v.max, v.mean, v.std, v.nan, d.rms, d.abs_max, j.rms, j.abs_max)
+        # 값이 하나도 없는 열(전부 NaN, 3틱보다 짧은 jerk 등)은 None
+        rows = [
+            dict(zip(STAT_FIELDS, (float(x) if np.isfinite(x) else None for x in column)))
+            for column in columns
+        ]
+        for row in rows:
+            row["nan"] = int(row["nan"])
+        return rows
+
+
+def expand_paths(patterns) -> list:
+    """파일, glob, 디렉터리를 HDF5 파일 목록으로 (순서 유지, 중복 제거)"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "**", "*.h5"), recursive=True))
+        else:
+            matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def find_episodes(group) -> list:
+    """그룹(파일) 아래에서 action 데이터셋을 가진 그룹 (자기 자신 포함, 데이터셋은 열지 않는다)"""
+    groups = [group] if group.get("action", getclass=True) is h5py.Dataset else []
+    for name in group:
+        if group.get(name, getclass=True) is h5py.Group:
+            groups.extend(find_episodes(group[name]))
+    return groups
+
+
+def scan_episode(group, keys, stats) -> dict:
+    """에피소드 하나를 chunk 단위로 훑어 stats에 더하고 에피소드 요약을 반환"""
+    datasets = {key: group[key] for key in keys if key in group}
+    lengths = {key: len(dataset) for key, dataset in datasets.items()}
+    length = min(lengths.values(), default=0)
+    dt = float(group.attrs.get("physics_dt", PHYSICS_DT))
+    text = group.attrs.get("text", "")
+    complete = group.attrs.get("complete")
+    summary = {
+        "file": group.file.filename,
+        "group": group.name,
+        "text": text.decode("utf-8") if isinstance(text, bytes) else str(text),
+        "length": length,
+        "complete": None if complete is None else bool(complete),
+        "nan": 0,
+        "problems": [],
+    }
+
+    step = READ_ROWS
+    for dataset in datasets.values():
+        if dataset.chunks:
+            step = dataset.chunks[0]
+            break
+    for key, dataset in datasets.items():
+        if key not in stats:
+            stats[key] = ColumnStats(dataset.shape[1] if dataset.ndim > 1 else 1)
+        stats[key].start_episode()
+    nan_before = sum(stats[key].values.nan.sum() for key in datasets)
+    for first in range(0, length, step):
+        last = min(first + step, length)
+        for key, dataset in datasets.items():
+            block = dataset[first:last]
+            stats[key].update(block.reshape(len(block), -1), dt)
+    summary["nan"] = int(sum(stats[key].values.nan.sum() for key in datasets) - nan_before)
+
+    missing = [key for key in keys if key not in datasets]
+    if missing:
+        summary["problems"].append(f"missing {', '.join(missing)}")
+    if len(set(lengths.values())) > 1:
+        summary["problems"].append(f"length mismatch {lengths}")
+    if "length" in group.attrs and int(group.attrs["length"]) != length:
+        summary["problems"].append(f"length attr {int(group.attrs['length'])} != {length}")
+    if not length:
+        summary["problems"].append("empty")
+    if summary["nan"]:
+        summary["problems"].append(f"{summary['nan']} NaN/inf values")
+    if complete is not None and not complete:
+        summary["problems"].append("incomplete")
+    return summary
+
+
+def scan_file(path, keys=DEFAULT_KEYS):
+    """파일 하나의 모든 에피소드 훑기
+    Returns:
+        tuple: (에피소드 요약 리스트, {데이터셋 이름: ColumnStats})
+    """
+    stats = {}
     try:
-        for key in group:
-            item = group[key]
-            print(f"{indent_str}{key}: {item}")
-            if isinstance(item, h5py.Dataset):
-                
-                print(f"{indent_str}  - Shape: {item.shape}, Type: {item.dtype}")
-                
-                #print(f"{indent_str}  Data: {item[...]}") to see the data
-            elif isinstance(item, h5py.Group):
-                explore_hdf5_group(item, indent + 1)
-    except AttributeError:
-        print(f"{indent_str}Error: Object {group} is not a group or dataset")
-
-# Open the HDF5 file
-file_path = 'joints_state.h5'
-with h5py.File(file_path, 'r') as file:
-    print("Contents of the HDF5 file:")
-    explore_hdf5_group(file)
\ No newline at end of file
+        with h5py.File(path, "r") as f:
+            episodes = [scan_episode(group, keys, stats) for group in find_episodes(f)]
+    except OSError as e:
+        return [_file_problem(path, f"unreadable: {e}")], {}
+    if not episodes:
+        episodes = [_file_problem(path, "no episodes (no action dataset)")]
+    return episodes, stats
+
+
+def _file_problem(path, problem):
+    """에피소드를 찾지 못한 파일의 요약 (group이 빈 문자열)"""
+    return {
+        "file": path, "group": "", "text": "", "length": 0, "complete": None, "nan": 0, "problems": [problem]
+    }
+
+
+def scan(paths, keys=DEFAULT_KEYS, jobs=1) -> dict:
+    """여러 파일을 (jobs > 1이면 프로세스 여러 개로) 훑어 보고서 만들기
+    Returns:
+        dict: files, episodes (요약), columns (데이터셋 이름: 열마다 STAT_FIELDS), problems
+    """
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(scan_file, paths, [keys] * len(paths)))
+    else:
+        results = [scan_file(path, keys) for path in paths]
+
+    episodes, stats = [], {}
+    for file_episodes, file_stats in results:
+        episodes.extend(file_episodes)
+        for key, column_stats in file_stats.items():
+            if key in stats:
+                stats[key].merge(column_stats)
+            else:
+                stats[key] = column_stats
+
+    lengths = np.array([episode["length"] for episode in episodes if episode["group"]], dtype=np.int64)
+    columns = {}
+    for key in keys:
+        if key in stats:
+            rows = stats[key].rows()
+            names = COLUMN_NAMES.get(key, [])
+            for i, row in enumerate(rows):
+                row["column"] = names[i] if len(names) == len(rows) else str(i)
+            columns[key] = rows
+    return {
+        "files": len(paths),
+        "episodes": {
+            "count": len(lengths),
+            "complete": sum(episode["complete"] is True for episode in episodes),
+            "incomplete": sum(episode["complete"] is False for episode in episodes),
+            "total_ticks": int(lengths.sum()),
+            "length_min": int(lengths.min()) if len(lengths) else 0,
+            "length_mean": float(lengths.mean()) if len(lengths) else 0.0,
+            "length_max": int(lengths.max()) if len(lengths) else 0,
+        },
+        "columns": columns,
+        "problems": [
+            {"file": episode["file"], "group": episode["group"], "problems": episode["problems"]}
+            for episode in episodes
+            if episode["problems"]
+        ],
+        "per_episode": episodes,
+    }
+
+
+def _format_cell(field, value):
+    if value is None:
+        return f"{'-':>10}"
+    return f"{int(value):>10d}" if field == "nan" else f"{value:>10.4g}"
+
+
+def _location(episode):
+    return f"{episode['file']}:{episode['group']}" if episode["group"] else episode["file"]
+
+
+def format_report(report, per_episode=False) -> str:
+    """보고서를 표로"""
+    e = report["episodes"]
+    lines = [
+        f"{report['files']} files, {e['count']} episodes ({e['complete']} complete, "
+        f"{e['incomplete']} incomplete), {e['total_ticks']} ticks, "
+        f"length min/mean/max {e['length_min']}/{e['length_mean']:.0f}/{e['length_max']}"
+    ]
+    header = f"{'column':>8} " + " ".join(f"{field:>10}" for field in STAT_FIELDS)
+    for key, rows in report["columns"].items():
+        lines += ["", key, header]
+        for row in rows:
+            cells = (_format_cell(field, row[field]) for field in STAT_FIELDS)
+            lines.append(f"{row['column']:>8} " + " ".join(cells))
+    if per_episode:
+        lines += ["", f"{'length':>7} {'complete':>8} {'nan':>5}  episode"]
+        for episode in report["per_episode"]:
+            complete = "-" if episode["complete"] is None else str(episode["complete"])
+            lines.append(
+                f"{episode['length']:>7d} {complete:>8} {episode['nan']:>5d}  "
+                f"{_location(episode)} {episode['text']}"
+            )
+    lines += ["", f"{len(report['problems'])} episodes with problems"]
+    for problem in report["problems"]:
+        lines.append(f"  {_location(problem)}: {'; '.join(problem['problems'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream statistics and sanity checks over recorded datasets")
+    parser.add_argument("paths", nargs="*", default=["joints_state.h5"], help="HDF5 파일, glob, 디렉터리")
+    parser.add_argument("--keys", nargs="+", default=list(DEFAULT_KEYS), help="통계를 낼 데이터셋")
+    parser.add_argument("--json", action="store_true", help="표 대신 JSON으로 출력")
+    parser.add_argument("--per-episode", action="store_true", help="에피소드마다 한 줄씩 출력")
+    parser.add_argument("--jobs", type=int, default=1, help="파일을 나눠 훑는 프로세스 수")
+    parser.add_argument("--strict", action="store_true", help="문제가 있는 에피소드가 있으면 종료 코드 1")
+    parser.add_argument("--tree", action="store_true", help="통계 없이 그룹 / 데이터셋 구조만 출력")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.paths)
+    if args.tree:
+        unreadable = 0
+        for path in paths:
+            # 없는 파일, 맞는 파일이 없는 glob 등은 scan_file처럼 문제로 보고하고 넘어간다
+            try:
+                file = h5py.File(path, "r")
+            except OSError as e:
+                print(f"{path}: unreadable: {e}")
+                unreadable += 1
+                continue
+            with file:
+                print(f"Contents of {path}:")
+                explore_hdf5_group(file)
+        return 1 if args.strict and unreadable else 0
+
+    report = scan(paths, tuple(args.keys), args.jobs)
+    if args.json:
+        if not args.per_episode:
+            del report["per_episode"]
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report, args.per_episode))
+    return 1 if args.strict and report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ class RMPFlowController(mg.MotionPolicyController):
     Args:
         name (str): [description]
         robot_articulation (SingleArticulation): [description]
-        physics_dt (float, optional): [description]. Defaults to 1.0/60.0.
+        physics_dt (float, optional): interval between forward() calls (SimulationRates.control_dt). Defaults to 1.0/60.0.
     """
 
     def __init__(
@@ -1,117 +1,147 @@
-import os
-import json
-import numpy as np
-from puzzle import makeStrings
+from modules.stroke.stroke_plan import compile_stroke_plan, iter_stroke_plans
+from modules.robot_control.trajectory_follower import StreamingFollower, TrajectoryFollower
+from modules.robot_control.timed_trajectory import DEFAULT_LIMITS, timed_trajectory_from_plan
+from modules.stroke.corner_blending import BLEND_TOLERANCE
+from modules.robot_control.sim_rates import PHYSICS_DT
+from modules.robot_control.ik_compiler import compile_joint_trajectory
+from modules.robot_control.fr3_kinematics import REST_POSITIONS
 
-script_path = os.path.abspath(__file__)
-json_path = os.path.dirname(script_path)
-json_path += "/asset/korean.json"
-with open(json_path, encoding="utf-8") as f:
-    data = json.load(f)
-    character_path = data["characters"]
 
-# 전역 상태 변수 추가
-current_state = 0
-last_stroke = -1  # 마지막으로 처리한 획 번호 추적
-
-
-
-
-def convert_coordinate(approach_point):
-    """로봇 좌표계로 변환하는 함수
+def create_follower(
+    character_list,
+    original_position,
+    draw_scale=2.0,
+    mode="segment",
+    stroke_order=None,
+    allow_reverse=False,
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    verbose=False,
+    stream=False,
+):
+    """한글 문자열을 그리는 TrajectoryFollower 생성
     Args:
-        approach_point (np.array): 변환할 3D 좌표점 [x, y, z]
+        character_list (list): 그릴 한글 문자열
+        original_position (np.array): 원점 위치 [x, y, z]
+        draw_scale (float): 그리기 스케일
+        mode (str): "segment"는 선분마다 펜을 들고, "polyline"은 맞닿은 선분을
+            하나의 획으로 합쳐 꼭짓점 사이에서 펜을 들지 않는다.
+            polyline 모드에서는 획 번호가 polyline 번호다.
+        stroke_order (str): 펜 업 이동 최적화 제약 단계 ("strict" / "syllable" / "free"),
+            None이면 JSON 순서 그대로
+        allow_reverse (bool): 최적화할 때 획 방향 뒤집기 허용 여부
+        blend_radius (float): polyline 모드에서 꼭짓점을 이 거리까지 포물선으로 깎아
+            멈추지 않고 지나가게 한다 (0이면 블렌딩하지 않음)
+        blend_tolerance (float): 블렌딩한 경로가 원래 꼭짓점에서 벗어나도 되는 최대 거리 (m)
+        verbose (bool): 틱마다 상태와 거리 출력
+        stream (bool): True면 전체 획 계획을 컴파일하지 않고 한 줄씩 컴파일하면서 그린다
+            (StreamingFollower, 순서 최적화도 줄마다 따로 한다). character_list는 다시 읽을 수
+            있어야 한다 (reset()하면 처음부터 다시 배치).
     Returns:
-        np.array: 변환된 좌표 [x', y', z']
+        TrajectoryFollower: step(ee_pos, current_stroke)가 (trajectory, is_stroke_complete)를 돌려준다
     """
-    x, y, z = approach_point
-    return np.array([-z, y, x])
-
-
-def generate_korean_character(
+    if stream:
+        return StreamingFollower(
+            lambda: iter_stroke_plans(character_list, order=stroke_order, allow_reverse=allow_reverse),
+            original_position,
+            mode=mode,
+            blend_radius=blend_radius,
+            blend_tolerance=blend_tolerance,
+            draw_scale=draw_scale,
+            verbose=verbose,
+        )
+    # 컴파일된 획 계획 가져오기 (작업마다 한 번만 컴파일되고 이후에는 캐시 조회)
+    character_path = compile_stroke_plan(
+        character_list, order=stroke_order, allow_reverse=allow_reverse
+    )
+    return TrajectoryFollower.from_plan(
+        character_path,
+        original_position,
+        mode=mode,
+        blend_radius=blend_radius,
+        blend_tolerance=blend_tolerance,
+        draw_scale=draw_scale,
+        verbose=verbose,
+    )
+
+
+def create_timed_trajectory(
     character_list,
-    current_stroke=0,
-    draw_scale=2.0,
-    ee_pos=None,
-    original_position=None,
+    original_position,
+    limits=None,
+    mode="segment",
+    stroke_order=None,
+    allow_reverse=False,
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    initial_position=None,
+    physics_dt=PHYSICS_DT,
 ):
-    """한글 문자열 궤적 생성
+    """한글 문자열 전체를 미리 시간 매개변수화한 TimedTrajectory 생성
     Args:
         character_list (list): 그릴 한글 문자열
-        current_stroke (int): 현재 획 번호
-        draw_scale (float): 그리기 스케일
-        ee_pos (np.array): 현재 엔드 이펙터 위치
         original_position (np.array): 원점 위치 [x, y, z]
+        limits (MotionLimits): 축별 속도/가속도 제한과 프로파일 ("trapezoid" / "s_curve"),
+            None이면 DEFAULT_LIMITS
+        mode (str): "segment" 혹은 "polyline" (create_follower와 같음)
+        stroke_order (str): 펜 업 이동 최적화 제약 단계, None이면 JSON 순서 그대로
+        allow_reverse (bool): 최적화할 때 획 방향 뒤집기 허용 여부
+        blend_radius, blend_tolerance (float): polyline 꼭짓점 블렌딩 (create_follower와 같음)
+        initial_position (np.array): 시작할 때 엔드 이펙터 위치
+        physics_dt (float): 틱 간격 (s), 목표를 물리 스텝보다 드물게 받으면 SimulationRates.target_dt
     Returns:
-        tuple: (trajectory, is_stroke_complete)
-            - trajectory: 다음 위치 좌표 (획이 완료되면 None)
-            - is_stroke_complete: 현재 획이 완료되었는지 여부
+        TimedTrajectory: step()을 부를 때마다 한 틱씩 재생한다 (TrajectoryFollower와 같은 인터페이스)
     """
-    global current_state, last_stroke
-
-    # korean.json에서 문자 경로 가져오기
-    character_path =  makeStrings(character_list)
-    if not character_path or current_stroke >= len(character_path):
-        current_state = 0
-        last_stroke = -1
-
-        return None, True
-
-    # 새로운 획으로 넘어갈 때 상태 초기화
-    if current_stroke != last_stroke:
-        current_state = 0
-        last_stroke = current_stroke
-
-    # 현재 획의 시작점과 끝점
-    current_path = character_path[current_stroke]
-    start_point = np.array(current_path["start"])
-    end_point = np.array(current_path["end"])
-
-    # 현재 엔드 이펙터 위치 가져오기
-    # ee_pos = ee_pos
-    if ee_pos is None:
-        return None, False, len(character_path)
-
-    # 시작점으로부터의 거리 계산
-    _start_point = (
-        convert_coordinate(start_point) + original_position
-    )  # 로봇 좌표계로 변환하고 원점 더하기
-    _end_point = (
-        convert_coordinate(end_point) + original_position
-    )  # 로봇 좌표계로 변환하고 원점 더하기
-    distance_to_start = np.linalg.norm(ee_pos - _start_point)
-    distance_to_end = np.linalg.norm(ee_pos - _end_point)
-
-    if current_state == 0:
-        print(f"다가가기: {distance_to_start}")
-        approach_point = start_point.copy()
-        approach_point[0] += 0.05  # x값에 5cm 더하기
-        if distance_to_start <= 0.05:
-            current_state = 1
-        return convert_coordinate(approach_point) + original_position, False
-
-    elif current_state == 1:
-        print(f"그리기 준비: {distance_to_start}")
-        if distance_to_start <= 0.01:
-            current_state = 2
-        return convert_coordinate(start_point) + original_position, False
-
-    elif current_state == 2:
-        # 시작점과 끝점 사이의 진행률 계산
-        total_distance = np.linalg.norm(_end_point - _start_point)
-        current_distance = np.linalg.norm(ee_pos - _start_point)
-        # draw_scale을 사용하여 진행률 계산 속도 조절
-        progress = min(1.0, (current_distance / total_distance) * draw_scale)
-        print(f"그리기: {progress*100} %")
+    character_path = compile_stroke_plan(
+        character_list, order=stroke_order, allow_reverse=allow_reverse
+    )
+    return timed_trajectory_from_plan(
+        character_path,
+        original_position,
+        mode=mode,
+        blend_radius=blend_radius,
+        blend_tolerance=blend_tolerance,
+        limits=limits or DEFAULT_LIMITS,
+        initial_position=initial_position,
+        physics_dt=physics_dt,
+    )
+
+
+def create_joint_trajectory(
+    character_list,
+    original_position,
+    limits=None,
+    mode="segment",
+    stroke_order=None,
+    allow_reverse=False,
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    initial_joints=None,
+    physics_dt=PHYSICS_DT,
+):
+    """create_timed_trajectory의 궤적을 오프라인 IK로 틱별 관절 목표까지 풀어 둔 JointTrajectory 생성
 
-        # 시작점과 끝점 사이를 보간
-        approach_point = start_point + (end_point - start_point) * progress
-        if distance_to_end <= 0.02:
-            current_state = 3
-            return convert_coordinate(approach_point) + original_position, True
-        return convert_coordinate(approach_point) + original_position, False
+    같은 문자열과 설정은 asset/ik_cache/에 저장한 결과를 다시 읽는다.
 
-    # elif current_state == 3:
-    #     # 질질 끌지 않도록. 획이 확실하게 분리될때만 동작해야함.
-    #     # print(f"멀어지기: {distance_to_end}")
-    #     return None, False
\ No newline at end of file
+    Args:
+        character_list (list): 그릴 한글 문자열
+        original_position (np.array): 원점 위치 [x, y, z]
+        limits, mode, stroke_order, allow_reverse, blend_radius, blend_tolerance:
+            create_timed_trajectory와 같음
+        initial_joints (np.array): 시작 관절 각도 (None이면 기본 자세)
+        physics_dt (float): 틱 간격 (s) (create_timed_trajectory와 같음)
+    Returns:
+        JointTrajectory: step()은 TimedTrajectory와 같고, 같은 틱의 관절 목표는 joint_target에 있다
+    """
+    return compile_joint_trajectory(
+        character_list,
+        original_position,
+        mode=mode,
+        stroke_order=stroke_order,
+        allow_reverse=allow_reverse,
+        blend_radius=blend_radius,
+        blend_tolerance=blend_tolerance,
+        limits=limits or DEFAULT_LIMITS,
+        initial_joints=REST_POSITIONS if initial_joints is None else initial_joints,
+        physics_dt=physics_dt,
+    )
@@ -1,40 +1,48 @@
-from isaacsim import SimulationApp
-
-simulation_app = SimulationApp({"headless": False})
-
-from isaacsim.core.api import World
-from isaacsim.core.utils.prims import get_prim_at_path
-from isaacsim.core.utils.viewports import set_camera_view
-from isaacsim.core.utils.stage import get_current_stage
-from pxr import UsdGeom
-
-from controllers.rmpflow_controller import RMPFlowController
-from modules.visualization.trajectory_drawer import TrajectoryDrawer
-from modules.robot_control.fr3_follow import FR3Follow
-from korean import generate_korean_character
+from modules.data.async_writer import BackgroundWriter, CsvSink
+from modules.data.telemetry import TelemetryRecorder, read_telemetry
+from modules.robot_control.fr3_kinematics import JOINT_COUNT, tcp_position
+from modules.robot_control.ik_compiler import CACHE_STATS
+from modules.robot_control.preflight import preflight
+from modules.robot_control.sim_backend import BACKENDS, get_backend
+from modules.robot_control.sim_rates import (
+    DEFAULT_RATES,
+    PEN_DOWN_HEIGHT,
+    SimulationClock,
+    TargetInterpolator,
+)
+from modules.stroke.stroke_plan import compile_stroke_plan
+from korean import create_follower, create_joint_trajectory, create_timed_trajectory
 
 import numpy as np
 
 import matplotlib.pyplot as plt
-import csv, datetime
+import argparse
+import datetime
 
 
 # End Effector 위치 추적 함수
-def get_end_effector_position():
-    """FR3 로봇의 엔드 이펙터 위치 가져오기"""
-    stage = get_current_stage()
-    ee_prim = get_prim_at_path("/World/FR3/fr3_hand_tcp")
-    if ee_prim:
-        xform = UsdGeom.Xformable(ee_prim)
-        world_transform = xform.ComputeLocalToWorldTransform(0)
-        return world_transform.ExtractTranslation()
-    return None
+def get_end_effector_position(joint_positions):
+    """FR3 로봇의 엔드 이펙터(fr3_hand_tcp) 위치 가져오기
+
+    USD prim 변환을 조회하지 않고 이미 읽은 관절 값으로 정기구학을 계산한다.
+
+    Args:
+        joint_positions (np.array): 관절 각도 (앞 7개가 팔 관절, 손가락 관절은 무시)
+    Returns:
+        np.array: 엔드 이펙터 월드 위치 [x, y, z]
+    """
+    return tcp_position(joint_positions)
 
 
 # 메인 스크립트 실행
-def main():
-    # 월드 생성
-    my_world = World(stage_units_in_meters=1.0)
+def main(backend):
+    """backend(SimulationBackend)의 월드에서 글자를 그리며 CSV와 그래프를 남긴다"""
+    simulation_app = backend.app
+    # 물리/컨트롤러/궤적 목표/렌더링 주기 (헤드리스 데이터 생성은 HEADLESS_RATES 등)
+    rates = DEFAULT_RATES
+
+    # 월드 생성 (루프 한 번 = 물리 스텝 한 번, 렌더링 여부는 루프에서 고른다)
+    my_world = backend.create_world(rates)
     # 그래프의 y-axis 뒤집기
     plt.gca().invert_yaxis()
 
@@ -42,7 +50,7 @@ def main():
     eye_position = [1.0, 0.0, 0.8]
     target_position = [0.0, 0.0, 0.0]
     camera_prim_path = "/OmniverseKit_Persp"
-    set_camera_view(
+    backend.set_camera_view(
         eye=eye_position, target=target_position, camera_prim_path=camera_prim_path
     )
 
@@ -50,7 +58,11 @@ def main():
     character_list = ["융", "합", "프", "로", "젝", "트", "공", "모", "전"]
     original_position = [0.5, 0, 0.2]  # 시작 위치
     draw_scale = 1.5  # 그리기 속도 조절 (1.0보다 크면 빠르게, 작으면 느리게)
-    cnt_js, cnt_ee = 0, 0
+    stroke_mode = "segment"  # "polyline"이면 이어진 선분 사이에서 펜을 들지 않음
+    blend_radius = 0.0  # polyline 모드에서 꼭짓점을 포물선으로 깎는 최대 거리 (m), 0이면 그대로
+    stroke_order = None  # 펜 업 이동 최적화: None / "strict" / "syllable" / "free"
+    timing = "reactive"  # "timed"이면 미리 시간 매개변수화한 궤적을 틱마다 재생, "ik"이면 관절 목표까지 미리 풀어 재생
+    cnt_js = 0
 
     joints_name = [
         'base', 'fp3_joint1', 'fp3_joint2', 
@@ -59,27 +71,29 @@ def main():
     ]
     dt = datetime.datetime.now()
     dt_str = f"{dt.year}_{dt.month}_{dt.day}_{dt.hour}_{dt.minute}_{dt.microsecond}"
-    f0 = open(f"endeffector_data_{dt_str}.csv", "w")
-    writer0 = csv.DictWriter(f0, fieldnames=['no', 'x', 'y', 'z'])
-    writer0.writeheader()
+    # 엔드 이펙터 샘플은 틱마다 한 번씩 모았다가 한꺼번에 쓴다 (tick, time, stroke, phase, pen_down, x, y, z)
+    telemetry = TelemetryRecorder(f"endeffector_data_{dt_str}.csv", physics_dt=rates.physics_dt)
 
-    f1 = open(f"joints_state_data_{dt_str}.csv", "w")
     fieldnames = ['no']
     for i in joints_name:
         fieldnames.extend([i + "_positions", i + "_velocities"])
-    writer1 = csv.DictWriter(f1, fieldnames=fieldnames)
-    writer1.writeheader()
+    # 관절 상태도 고정 길이 레코드로 채우기만 하고 파일 쓰기는 백그라운드 스레드가 한다
+    joints_writer = BackgroundWriter(
+        CsvSink(
+            f"joints_state_data_{dt_str}.csv",
+            fieldnames,
+            ("%d",) + ("%.9g",) * (len(fieldnames) - 1),
+        )
+    )
 
     graph_name = f"ee_pos_{dt_str}"
 
-    my_task = FR3Follow(name="drawing_task", target_position=original_position)
+    my_task = backend.create_task("drawing_task", original_position)
     my_world.add_task(my_task)
     my_world.reset()
 
-    ee_drawer = TrajectoryDrawer()
-    ee_drawer.initialize()
-    paper_drawer = TrajectoryDrawer()
-    paper_drawer.initialize()
+    ee_drawer = backend.create_drawer()
+    paper_drawer = backend.create_drawer()
 
     # Task 파라미터 가져오기
     task_params = my_world.get_task("drawing_task").get_params()
@@ -94,17 +108,68 @@ def main():
     my_franka.set_joints_default_state(positions=joints_default_positions)
 
     # 컨트롤러 설정
-    my_controller = RMPFlowController(
-        name="target_follower_controller", robot_articulation=my_franka
+    my_controller = backend.create_controller(
+        "target_follower_controller", my_franka, rates.control_dt
     )
     articulation_controller = my_franka.get_articulation_controller()
 
+    # 획 궤적 추종 상태 기계 (획 좌표는 여기서 한 번만 로봇 좌표로 변환된다)
+    if timing == "ik":
+        follower = create_joint_trajectory(
+            character_list,
+            np.array(original_position),
+            mode=stroke_mode,
+            stroke_order=stroke_order,
+            blend_radius=blend_radius,
+            physics_dt=rates.target_dt,
+        )
+        print(f"[JOINT TRAJECTORY] {follower.summary()}")
+        print(f"[JOINT TRAJECTORY] {CACHE_STATS.summary()}")
+    elif timing == "timed":
+        follower = create_timed_trajectory(
+            character_list,
+            np.array(original_position),
+            mode=stroke_mode,
+            stroke_order=stroke_order,
+            blend_radius=blend_radius,
+            physics_dt=rates.target_dt,
+        )
+        print(f"[TIMED TRAJECTORY] {follower.summary()}")
+    else:
+        follower = create_follower(
+            character_list,
+            np.array(original_position),
+            draw_scale=draw_scale,  # 그리기 속도 전달
+            mode=stroke_mode,
+            stroke_order=stroke_order,
+            blend_radius=blend_radius,
+        )
+
+    # 펜 업 이동 최적화 결과 (캐시된 획 계획이므로 다시 컴파일하지 않는다)
+    plan = compile_stroke_plan(character_list, order=stroke_order)
+    if plan.travel_report is not None:
+        print(f"[STROKE ORDER] {plan.travel_report.summary()}")
+
+    # 그리기 전에 모든 경유점의 도달 가능 여부와 조작성(특이점 근처 칸) 확인
+    report = preflight(
+        character_list,
+        np.array(original_position),
+        stroke_order=stroke_order,
+        mode=stroke_mode,
+        blend_radius=blend_radius,
+    )
+    print(f"[PREFLIGHT] {report.summary()}")
+
     # 메인 시뮬레이션 루프
+    clock = SimulationClock(rates)
+    # 궤적 목표 사이를 컨트롤러 주기로 보간 (ik 모드는 관절 목표를 보간)
+    command = TargetInterpolator(JOINT_COUNT if timing == "ik" else 3)
     reset_needed = False
     tick = 0
     current_stroke = 0
     while simulation_app.is_running():
-        my_world.step(render=True)
+        # 멈춰 있을 때는 UI가 돌도록 항상 렌더링
+        my_world.step(render=clock.render_due or not my_world.is_playing())
 
         if my_world.is_stopped() and not reset_needed:
             reset_needed = True
@@ -115,6 +180,9 @@ def main():
                 my_controller.reset()
                 reset_needed = False
                 current_stroke = 0
+                follower.reset()
+                clock.reset()
+                command.reset()
                 tick = 0  # 새로운 획을 위해 tick 초기화
 
             observations = my_world.get_observations()
@@ -122,77 +190,84 @@ def main():
 
             # 현재 엔드 이펙터 위치 가져오기
             _joints_state = my_franka.get_joints_state()
-            joints_state_list = [_joints_state.positions, _joints_state.velocities]
-            joints_state_list = np.swapaxes(joints_state_list, 0, 1)
-            joints_state = np.array(joints_state_list).flatten()
             
-            ee_pos = get_end_effector_position()
+            ee_pos = get_end_effector_position(_joints_state.positions)
             if ee_pos is not None:
+                telemetry.record(clock.step_index, ee_pos, current_stroke, follower.state)
                 ee_drawer.update_drawing(ee_pos)
-                if ee_pos[2] < 0.205:
+                if ee_pos[2] < PEN_DOWN_HEIGHT:
                     paper_drawer.update_drawing(ee_pos)
 
-                # 한글 문자 궤적 생성
-                trajectory, is_stroke_complete = generate_korean_character(
-                    character_list,
-                    current_stroke=current_stroke,
-                    draw_scale=draw_scale,  # 그리기 속도 전달
-                    ee_pos=ee_pos,
-                    original_position=np.array(original_position),
-                )
-                if trajectory is not None:
-                    # 타겟 위치 설정
-                    my_task.set_cube_pose(trajectory)
-
-                    # 로봇 컨트롤러 업데이트
-                    actions = my_controller.forward(
-                        target_end_effector_position=trajectory,
-                        target_end_effector_orientation=observations[target_name][
-                            "orientation"
-                        ],
+                # 한글 문자 궤적 생성 (target_decimation 컨트롤러 갱신마다 한 번)
+                if clock.target_due:
+                    trajectory, is_stroke_complete = follower.step(
+                        np.asarray(ee_pos), current_stroke=current_stroke
                     )
+                    if trajectory is not None:
+                        # 타겟 위치 설정
+                        my_task.set_cube_pose(trajectory)
+                        if timing == "ik":
+                            trajectory = follower.joint_target
+                    command.push(trajectory)
+
+                    # 현재 획이 완료되었는지 확인
+                    if is_stroke_complete:
+                        current_stroke += 1
+                        print(f"[STROKE UPDATE] current_stroke: {current_stroke}")
+                        tick = 0  # 새로운 획을 위해 tick 초기화
+
+                # 로봇 컨트롤러 업데이트 (control_decimation 물리 스텝마다, 목표 사이는 보간)
+                # ik 모드는 미리 풀어 둔 관절 목표를 그대로 보낸다
+                if clock.control_due and command.active:
+                    target = command.sample(clock.target_phase)
+                    if timing == "ik":
+                        actions = backend.joint_action(target, np.arange(JOINT_COUNT))
+                    else:
+                        actions = my_controller.forward(
+                            target_end_effector_position=target,
+                            target_end_effector_orientation=observations[target_name][
+                                "orientation"
+                            ],
+                        )
 
                     # 로봇에 액션 적용
                     articulation_controller.apply_action(actions)
+            clock.advance()
 
-                # 현재 획이 완료되었는지 확인
-                if is_stroke_complete:
-                    current_stroke += 1
-                    print(f"[STROKE UPDATE] current_stroke: {current_stroke}")
-                    tick = 0  # 새로운 획을 위해 tick 초기화
-
-            ee_x = []
-            ee_y = []
-
-            # 디버깅 그리기
-            ee_pos = get_end_effector_position()
+            # 디버깅 그리기 (이번 틱에는 물리 스텝이 없어 관절 값이 그대로이므로 위 ee_pos를 다시 쓴다)
             print(f"ee_pos: {ee_pos}")
             if ee_pos is not None:
                 ee_drawer.update_drawing(ee_pos)
             
-            # endeffector_data.csv
-            for i in ee_drawer.point_list:
-                if i[2] < 0.205:
-                    ee_x.append(i[0])
-                    ee_y.append(i[1])
-                    data = {'no': cnt_ee, 'x': i[0], 'y': i[1], 'z': i[2]}
-                    cnt_ee += 1
-                    writer0.writerow(data)
-            
-            # joints_state_data.csv
-            data = {'no': cnt_js}
+            # joints_state_data.csv (관절마다 위치, 속도 순서)
+            row = joints_writer.next_row()
+            if row is not None:
+                row[0] = cnt_js
+                row[1::2] = _joints_state.positions
+                row[2::2] = _joints_state.velocities
             cnt_js += 1
-            for i in range(1, len(fieldnames) - 1):
-                data.update({fieldnames[i]: joints_state[i]})
-            writer1.writerow(data)
-
-        # ee_pos fig
-        plt.scatter(ee_y, ee_x, color = 'blue', s = 10)
-        plt.savefig(graph_name)
-    f0.close()
-    f1.close()
+
+    telemetry.close()
+    joints_writer.close()
+    print(f"[TELEMETRY] {telemetry.summary()}")
+    print(f"[TELEMETRY] {joints_writer.sink.path}: {joints_writer.summary()}")
+
+    # ee_pos fig (펜이 닿은 샘플만, 끝날 때 한 번 저장)
+    samples = read_telemetry(telemetry.path)
+    pen_down = samples["pen_down"] > 0
+    plt.scatter(samples["y"][pen_down], samples["x"][pen_down], color = 'blue', s = 10)
+    plt.savefig(graph_name)
     simulation_app.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Draw Hangul with the FR3 and log CSV")
+    parser.add_argument("--backend", choices=BACKENDS, default="isaac",
+                        help="kinematic: NumPy 기구학 시뮬레이션 (Isaac Sim 없이)")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="kinematic 백엔드에서 이 물리 스텝 수 뒤에 종료")
+    args = parser.parse_args()
+    if args.backend == "isaac":
+        main(get_backend("isaac", headless=False))
+    else:
+        main(get_backend(args.backend, max_steps=args.max_steps))
@@ -0,0 +1,189 @@
+"""시뮬레이션 루프 밖(백그라운드 스레드)에서 고정 크기 레코드를 묶어 쓰는 기록기
+
+루프는 next_row()로 미리 잡아 둔 블록의 다음 행(고정 길이 float64 배열)을 받아 값을 채우기만 한다.
+블록이 차면 크기가 정해진 큐로 백그라운드 스레드에 넘기고, 스레드는 블록을 한 번에 문자열로
+바꿔 파일에 쓴 뒤 빈 블록을 되돌려 준다. 블록 수가 정해져 있으므로 메모리는 늘지 않고,
+파일 쓰기가 잠깐 느려져도 빈 블록이 남아 있는 동안에는 물리 스텝이 기다리지 않는다.
+
+빈 블록이 모두 쓰기를 기다리고 있으면(backpressure)
+    when_full="block"   빈 블록이 생길 때까지 기다린다 (stalls, stall_seconds에 센다)
+    when_full="drop"    그동안의 레코드를 버린다 (next_row()가 None, dropped에 센다)
+"""
+import time
+import queue
+import threading
+
+import numpy as np
+
+BLOCK = "block"
+DROP = "drop"
+# 블록 하나의 행 수와 블록 수 (60 Hz에서 블록 하나가 약 17초)
+BLOCK_ROWS = 1024
+BLOCK_COUNT = 8
+# 한 번의 % 포맷으로 바꾸는 행 수 (스레드가 GIL을 오래 잡지 않도록 나눈다)
+ENCODE_ROWS = 128
+
+
+class CsvSink:
+    """블록을 CSV 행으로 쓰는 출력
+
+    Args:
+        path (str): CSV 경로 (열자마자 머리글을 쓴다)
+        fields: 열 이름
+        formats: 열마다 % 포맷 (None이면 모두 "%.9g")
+    """
+
+    def __init__(self, path, fields, formats=None):
+        self.path = path
+        self.fields = tuple(fields)
+        formats = formats or ("%.9g",) * len(self.fields)
+        if len(formats) != len(self.fields):
+            raise ValueError(f"expected {len(self.fields)} formats, got {len(formats)}")
+        self._line = ",".join(formats) + "\n"
+        self._file = open(path, "w")
+        self._file.write(",".join(self.fields) + "\n")
+
+    @property
+    def width(self) -> int:
+        return len(self.fields)
+
+    def write(self, block):
+        for first in range(0, len(block), ENCODE_ROWS):
+            chunk = block[first : first + ENCODE_ROWS]
+            self._file.write((self._line * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BackgroundWriter:
+    """고정 크기 레코드를 블록 단위로 백그라운드 스레드에서 쓰는 기록기
+
+    Args:
+        sink: write(block), flush(), close()와 width를 가진 출력 (CsvSink 등)
+        block_rows (int): 블록 하나의 행 수
+        block_count (int): 미리 잡아 두는 블록 수 (쓰기를 기다릴 수 있는 블록 수 + 1)
+        when_full (str): 빈 블록이 없을 때 "block"(기다림) 혹은 "drop"(버림)
+    """
+
+    def __init__(self, sink, block_rows=BLOCK_ROWS, block_count=BLOCK_COUNT, when_full=BLOCK):
+        if when_full not in (BLOCK, DROP):
+            raise ValueError(f"when_full must be {BLOCK!r} or {DROP!r}, got {when_full!r}")
+        if block_count < 2:
+            raise ValueError(f"block_count must be >= 2, got {block_count}")
+        self.sink = sink
+        self.when_full = when_full
+        self._free = queue.Queue()
+        for _ in range(block_count - 1):
+            self._free.put(np.empty((block_rows, sink.width)))
+        # 쓰기를 기다리는 (블록, 행 수). 블록 수가 정해져 있으므로 이 큐도 block_count를 넘지 않는다
+        self._filled = queue.Queue(maxsize=block_count)
+        self._block = np.empty((block_rows, sink.width))
+        self._size = 0
+        self._error = None
+
+        # 카운터 (루프 쪽에서만 바꾸는 값과 스레드에서만 바꾸는 값을 나눠 잠금 없이 센다)
+        self.records = 0
+        self.dropped = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.blocks_written = 0
+        self.max_write_seconds = 0.0
+        self.max_pending = 0
+
+        self._thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+        self._thread.start()
+
+    def next_row(self):
+        """다음 레코드를 채울 행 (다음 블록을 넘기기 전까지만 유효, 버려야 하면 None)"""
+        if self._block is None or self._size == len(self._block):
+            if not self._hand_off():
+                self.dropped += 1
+                return None
+        row = self._block[self._size]
+        self._size += 1
+        self.records += 1
+        return row
+
+    def push(self, record):
+        """레코드 하나를 복사해 추가 (버렸으면 False)"""
+        row = self.next_row()
+        if row is None:
+            return False
+        row[:] = record
+        return True
+
+    def _hand_off(self):
+        """찬 블록을 스레드에 넘기고 빈 블록을 받는다 (drop 모드에서 빈 블록이 없으면 False)"""
+        if self._error is not None:
+            raise RuntimeError("background writer failed") from self._error
+        if self._block is not None:
+            self._filled.put((self._block, self._size))
+            self.max_pending = max(self.max_pending, self._filled.qsize())
+            self._block, self._size = None, 0
+        try:
+            self._block = self._free.get_nowait()
+            return True
+        except queue.Empty:
+            pass
+        if self.when_full == DROP:
+            return False
+        started = time.perf_counter()
+        self._block = self._free.get()
+        self.stalls += 1
+        self.stall_seconds += time.perf_counter() - started
+        return True
+
+    def _run(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                self._filled.task_done()
+                return
+            block, size = item
+            try:
+                if self._error is None:
+                    started = time.perf_counter()
+                    self.sink.write(block[:size])
+                    self.sink.flush()
+                    self.max_write_seconds = max(self.max_write_seconds, time.perf_counter() - started)
+                    self.blocks_written += 1
+            except Exception as error:  # 루프 쪽 다음 호출에서 다시 올린다
+                self._error = error
+            finally:
+                self._free.put(block)
+                self._filled.task_done()
+
+    def flush(self):
+        """채우던 블록까지 넘기고 모두 쓸 때까지 기다린다"""
+        if self._size:
+            self._hand_off()
+        self._filled.join()
+        if self._error is not None:
+            raise RuntimeError("background writer failed") from self._error
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._filled.put(None)
+            self._thread.join()
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> str:
+        return (
+            f"{self.records} records in {self.blocks_written} blocks, {self.dropped} dropped, "
+            f"{self.stalls} stalls ({self.stall_seconds * 1000:.1f} ms), "
+            f"max write {self.max_write_seconds * 1000:.1f} ms, max pending {self.max_pending}"
+        )
@@ -0,0 +1,539 @@
+"""여러 에피소드를 샤드 HDF5 파일에 모으는 데이터셋 저장소와 학습용 무작위 구간 로더
+
+new_main.py는 실행마다 joints_state.h5 하나를 덮어썼다. 모방 학습용 에피소드를 수천 개 만들려면
+파일 하나에 여러 에피소드를 넣고, 어떤 문자열을 어떤 설정으로 몇 틱 그렸는지 파일을 열지 않고도
+골라낼 수 있어야 한다.
+
+디렉터리 구성 (root 아래):
+    <prefix>_00000.h5   episodes/<번호>/ 그룹마다 EpisodeRecorder 데이터셋과 attrs
+                        (샤드 파일 하나에 에피소드 episodes_per_shard개)
+    index.jsonl         에피소드마다 한 줄: id, shard, group, length, complete와 에피소드 attrs
+                        (text, stroke_count, draw_scale, timing 등)
+    packed/             pack_memmap()이 풀어 둔 memmap 버퍼 (선택, 빌드마다 하위 디렉터리 + CURRENT)
+
+HDF5 파일은 쓰는 쪽이 하나여야 하므로 여러 프로세스가 동시에 만들 때는 prefix를 다르게 준다.
+index.jsonl은 줄 단위로 붙여 쓰므로 같이 써도 되고, 색인이 샤드와 어긋나면(쓰다가 죽은 경우 등)
+rebuild_index()로 샤드의 attrs에서 다시 만든다.
+
+학습 로더 (파일 전체를 메모리에 올리지 않는다):
+    H5Source       에피소드를 HDF5 chunk 단위로 읽고, 읽은 chunk는 크기를 정한 LRU 캐시에 둔다
+    MemmapSource   pack_memmap()으로 풀어 둔 버퍼를 memmap으로 연다 (압축을 풀지 않으므로 가장 빠르다)
+    WindowLoader   두 소스 중 하나에서 에피소드를 가로질러 길이 window의 무작위 구간을 배치로 뽑는다
+
+사용 예:
+    python -m modules.data.dataset_store DIR                # 색인 요약
+    python -m modules.data.dataset_store DIR --rebuild-index
+    python -m modules.data.dataset_store DIR --pack --sample 64
+"""
+import os
+import glob
+import json
+import uuid
+import shutil
+import argparse
+from collections import Counter, OrderedDict
+
+import h5py
+import numpy as np
+
+from modules.data.episode_recorder import CHUNK_ROWS, COLUMNS, EpisodeRecorder
+from modules.robot_control.sim_rates import PHYSICS_DT
+
+INDEX_NAME = "index.jsonl"
+SHARD_PREFIX = "shard"
+EPISODES_GROUP = "episodes"
+EPISODES_PER_SHARD = 256
+PACKED_DIR = "packed"
+PACK_VERSION = 2
+# packed/ 아래에서 지금 읽을 빌드 디렉터리 이름을 담은 파일
+CURRENT_NAME = "CURRENT"
+# 로더가 기본으로 읽는 데이터셋
+WINDOW_KEYS = ("action", "ee_pose")
+# H5Source가 풀어 둔 chunk를 들고 있는 최대 크기
+CACHE_BYTES = 256 * 2**20
+
+
+def _json_value(value):
+    """h5py 속성 값을 JSON으로 쓸 수 있는 값으로"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def episode_entry(group, shard) -> dict:
+    """에피소드 그룹 하나의 색인 항목 (위치와 attrs 전부)
+    Args:
+        group (h5py.Group): episodes/<번호> 그룹
+        shard (str): root 기준 샤드 파일 이름
+    Returns:
+        dict: id, shard, group, length, complete와 에피소드 attrs
+    """
+    entry = {
+        "id": f"{os.path.splitext(shard)[0]}/{group.name.rsplit('/', 1)[-1]}",
+        "shard": shard,
+        "group": group.name.lstrip("/"),
+    }
+    entry.update({key: _json_value(value) for key, value in group.attrs.items()})
+    entry.setdefault("length", 0)
+    entry["complete"] = bool(entry.get("complete", False))
+    return entry
+
+
+def read_index(root) -> list:
+    """index.jsonl 읽기 (같은 id가 여러 번 있으면 마지막 줄)"""
+    path = os.path.join(root, INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[entry["id"]] = entry
+    return list(entries.values())
+
+
+def rebuild_index(root) -> list:
+    """샤드 파일의 attrs를 모두 읽어 index.jsonl을 다시 쓴다
+    Returns:
+        list: 새 색인
+    """
+    entries = []
+    for path in sorted(glob.glob(os.path.join(root, "*.h5"))):
+        shard = os.path.basename(path)
+        try:
+            with h5py.File(path, "r") as f:
+                episodes = f.get(EPISODES_GROUP, {})
+                entries.extend(episode_entry(episodes[name], shard) for name in sorted(episodes))
+        except OSError as e:
+            print(f"[dataset_store] skipping unreadable shard {shard}: {e}")
+    # 다른 프로세스가 반쯤 쓴 색인을 읽지 않도록 임시 파일에 쓰고 교체
+    path = os.path.join(root, INDEX_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    os.replace(tmp_path, path)
+    return entries
+
+
+def select(entries, complete_only=True, min_length=1, **attrs) -> list:
+    """색인에서 조건에 맞는 에피소드만 고르기
+    Args:
+        entries (list): 색인 항목
+        complete_only (bool): 끝까지 그린 에피소드만
+        min_length (int): 최소 틱 수
+        **attrs: 값이 같은 항목만 (예: text="융합", timing="ik")
+    Returns:
+        list: 고른 항목
+    """
+    return [
+        entry
+        for entry in entries
+        if (entry["complete"] or not complete_only)
+        and entry["length"] >= min_length
+        and all(entry.get(key) == value for key, value in attrs.items())
+    ]
+
+
+class DatasetStore:
+    """샤드 HDF5 파일에 에피소드를 모으는 저장소 (쓰는 쪽)
+
+    Args:
+        root (str): 저장소 디렉터리 (없으면 만든다)
+        prefix (str): 이 객체가 쓰는 샤드 파일 이름 앞부분 (동시에 쓰는 프로세스마다 다르게)
+        episodes_per_shard (int): 샤드 파일 하나에 넣는 에피소드 수
+    """
+
+    def __init__(self, root, prefix=SHARD_PREFIX, episodes_per_shard=EPISODES_PER_SHARD):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.prefix = prefix
+        self.episodes_per_shard = episodes_per_shard
+        self.recorder = None
+        self._shard_name = None
+        self._shard = None
+        self._next = self._next_number()
+
+    @property
+    def index(self) -> list:
+        return read_index(self.root)
+
+    def _shard_path(self, number):
+        return os.path.join(self.root, f"{self.prefix}_{number // self.episodes_per_shard:05d}.h5")
+
+    def _next_number(self):
+        """이 prefix의 마지막 샤드 다음 에피소드 번호 (깨진 샤드는 건너뛴다)"""
+        shards = sorted(glob.glob(os.path.join(self.root, f"{self.prefix}_[0-9]*.h5")))
+        if not shards:
+            return 0
+        last = shards[-1]
+        first = int(os.path.splitext(last)[0].rsplit("_", 1)[-1]) * self.episodes_per_shard
+        try:
+            with h5py.File(last, "r") as f:
+                numbers = [int(name) for name in f.get(EPISODES_GROUP, {})]
+        except OSError:
+            return first + self.episodes_per_shard
+        return max(numbers, default=first - 1) + 1
+
+    def open_episode(self, attrs=None, physics_dt=PHYSICS_DT, **options) -> EpisodeRecorder:
+        """다음 에피소드 그룹을 만들고 기록기를 연다 (닫으면 색인에 한 줄 추가)
+        Args:
+            attrs (dict): 에피소드 설정 (EpisodeRecorder attrs)
+            physics_dt (float): 틱 간격 (s)
+            **options: EpisodeRecorder 인자 (chunk_rows, compression 등)
+        Returns:
+            EpisodeRecorder: 이 저장소의 그룹에 쓰는 기록기
+        """
+        if self.recorder is not None and not self.recorder.closed:
+            raise RuntimeError("the previous episode is still being recorded")
+        number = self._next
+        path = self._shard_path(number)
+        if self._shard_name != os.path.basename(path):
+            self._close_shard()
+            self._shard = h5py.File(path, "a")
+            self._shard_name = os.path.basename(path)
+        group = self._shard.require_group(EPISODES_GROUP).create_group(f"{number:06d}")
+        self._next = number + 1
+        self.recorder = EpisodeRecorder(
+            group, physics_dt=physics_dt, attrs=attrs, on_close=self._append_index, **options
+        )
+        return self.recorder
+
+    def _append_index(self, recorder):
+        entry = episode_entry(recorder.group, self._shard_name)
+        with open(os.path.join(self.root, INDEX_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _close_shard(self):
+        if self._shard is not None:
+            self._shard.close()
+            self._shard = self._shard_name = None
+
+    def close(self):
+        """기록 중인 에피소드를 (complete=False로) 닫고 샤드 파일을 닫는다"""
+        if self.recorder is not None:
+            self.recorder.close(complete=False)
+        self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class H5Source:
+    """색인의 에피소드를 HDF5 chunk 단위로 읽는 로더 소스
+
+    한 구간을 읽을 때 걸치는 chunk만 풀어 LRU 캐시에 둔다. HDF5 자체 chunk 캐시는 데이터셋마다
+    따로 잡히므로 (에피소드 수천 개면 그만큼 커진다) 끄고 이 캐시 하나로 크기를 제한한다.
+
+    Args:
+        root (str): 저장소 디렉터리
+        entries (list): 읽을 색인 항목 (None이면 select(read_index(root)))
+        cache_bytes (int): 풀어 둔 chunk를 들고 있는 최대 크기
+    """
+
+    def __init__(self, root, entries=None, cache_bytes=CACHE_BYTES):
+        self.root = root
+        self.entries = select(read_index(root)) if entries is None else list(entries)
+        self.lengths = np.array([entry["length"] for entry in self.entries], dtype=np.int64)
+        self.cache_bytes = cache_bytes
+        self.hits = 0
+        self.misses = 0
+        self._files = {}
+        self._datasets = {}
+        self._chunks = OrderedDict()
+        self._cached = 0
+
+    def _dataset(self, i, name):
+        dataset = self._datasets.get((i, name))
+        if dataset is None:
+            entry = self.entries[i]
+            f = self._files.get(entry["shard"])
+            if f is None:
+                path = os.path.join(self.root, entry["shard"])
+                f = self._files[entry["shard"]] = h5py.File(path, "r", rdcc_nbytes=0)
+            dataset = self._datasets[i, name] = f[entry["group"]][name]
+        return dataset
+
+    def _chunk(self, i, name, c, rows):
+        key = (i, name, c)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            self.hits += 1
+            return chunk
+        self.misses += 1
+        chunk = self._dataset(i, name)[c * rows : (c + 1) * rows]
+        self._chunks[key] = chunk
+        self._cached += chunk.nbytes
+        while self._cached > self.cache_bytes and len(self._chunks) > 1:
+            _, old = self._chunks.popitem(last=False)
+            self._cached -= old.nbytes
+        return chunk
+
+    def read(self, i, name, start, stop) -> np.ndarray:
+        """에피소드 i의 데이터셋 name에서 [start, stop) 행"""
+        chunks = self._dataset(i, name).chunks
+        rows = chunks[0] if chunks else CHUNK_ROWS
+        first, last = start // rows, (stop - 1) // rows
+        parts = [
+            self._chunk(i, name, c, rows)[max(start - c * rows, 0) : stop - c * rows]
+            for c in range(first, last + 1)
+        ]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def windows(self, name, episodes, starts, window) -> np.ndarray:
+        """(에피소드, 시작) 쌍마다 길이 window 구간을 모은 (B, window, ...) 배열"""
+        width, dtype = COLUMNS[name]
+        out = np.empty((len(episodes), window) + ((width,) if width else ()), dtype=dtype)
+        # 같은 에피소드, 가까운 구간끼리 이어서 읽어 캐시를 덜 흔든다
+        for k in np.lexsort((starts, episodes)):
+            out[k] = self.read(episodes[k], name, starts[k], starts[k] + window)
+        return out
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        self._datasets.clear()
+        self._chunks.clear()
+        self._cached = 0
+
+
+def _packed_paths(path, keys):
+    return [os.path.join(path, f"{name}.bin") for name in keys] + [
+        os.path.join(path, "offsets.bin"),
+        os.path.join(path, "packed.json"),
+    ]
+
+
+def current_pack(path) -> str:
+    """packed/ 디렉터리에서 지금 공개된 빌드 디렉터리 (CURRENT가 없으면 path 자체를 빌드로 본다)"""
+    try:
+        with open(os.path.join(path, CURRENT_NAME), encoding="utf-8") as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+
+def pack_memmap(root, entries=None, keys=WINDOW_KEYS, path=None) -> dict:
+    """색인의 에피소드를 이어 붙인 memmap 버퍼로 풀어 쓰기 (chunk 단위로 읽고 써서 메모리는 일정)
+
+    파일 구성 (path, 기본 root/packed/ 아래):
+        CURRENT                 지금 읽을 빌드 디렉터리 이름
+        <빌드>/<name>.bin       데이터셋마다 (총 틱 수, 열 수) 버퍼
+        <빌드>/offsets.bin      int64 (에피소드 수, 2) 에피소드별 [offset, length]
+        <빌드>/packed.json      형식 버전, 데이터셋 dtype / 열 수, 에피소드 색인 항목
+
+    빌드마다 새 디렉터리에 다 쓴 뒤 CURRENT 한 파일을 원자적으로 바꾸므로, 읽는 쪽은 항상 한 빌드의
+    파일만 본다 (이전 빌드의 버퍼와 새 offsets가 섞이지 않는다).
+
+    Args:
+        root (str): 저장소 디렉터리
+        entries (list): 풀어 쓸 색인 항목 (None이면 select(read_index(root)))
+        keys: 풀어 쓸 데이터셋 이름
+        path (str): 출력 디렉터리
+    Returns:
+        dict: 기록한 메타 정보 (build는 빌드 디렉터리 이름)
+    """
+    entries = select(read_index(root)) if entries is None else list(entries)
+    path = path or os.path.join(root, PACKED_DIR)
+    build = uuid.uuid4().hex
+    build_path = os.path.join(path, build)
+    os.makedirs(build_path)
+    offsets = np.zeros((len(entries), 2), dtype=np.int64)
+    paths = _packed_paths(build_path, keys)
+    outputs = [open(p, "wb") for p in paths[: len(keys)]]
+    total = 0
+    files = {}
+    written = False
+    try:
+        for i, entry in enumerate(entries):
+            f = files.get(entry["shard"])
+            if f is None:
+                f = files[entry["shard"]] = h5py.File(os.path.join(root, entry["shard"]), "r")
+            group = f[entry["group"]]
+            offsets[i] = total, entry["length"]
+            for name, output in zip(keys, outputs):
+                dataset = group[name]
+                step = dataset.chunks[0] if dataset.chunks else CHUNK_ROWS
+                for first in range(0, entry["length"], step):
+                    dataset[first : min(first + step, entry["length"])].tofile(output)
+            total += entry["length"]
+        written = True
+    finally:
+        for output in outputs:
+            output.close()
+        for f in files.values():
+            f.close()
+        if not written:
+            shutil.rmtree(build_path, ignore_errors=True)
+
+    meta = {
+        "version": PACK_VERSION,
+        "build": build,
+        "total_rows": int(total),
+        "columns": {name: [COLUMNS[name][0], np.dtype(COLUMNS[name][1]).str] for name in keys},
+        "episodes": entries,
+    }
+    offsets.tofile(paths[-2])
+    with open(paths[-1], "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # 빌드 디렉터리가 다 쓰인 뒤에 CURRENT를 바꿔 공개
+    previous = current_pack(path)
+    pointer = os.path.join(path, CURRENT_NAME)
+    tmp_path = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(build)
+    os.replace(tmp_path, pointer)
+
+    # 방금 가린 빌드는 이미 열어 둔 로더가 있을 수 있으므로 남기고, 그보다 오래된 빌드는 지운다
+    keep = {build, os.path.basename(previous)}
+    for name in os.listdir(path):
+        if name not in keep and os.path.isfile(os.path.join(path, name, "packed.json")):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    return meta
+
+
+class MemmapSource:
+    """pack_memmap()으로 풀어 둔 버퍼를 memmap으로 연 로더 소스 (읽기 전용)"""
+
+    def __init__(self, path):
+        # packed/ 디렉터리를 주면 CURRENT가 가리키는 빌드 하나만 연다
+        path = current_pack(path)
+        with open(os.path.join(path, "packed.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != PACK_VERSION:
+            raise ValueError(f"{path}: packed format {self.meta.get('version')}, expected {PACK_VERSION}")
+        self.entries = self.meta["episodes"]
+        offsets = np.fromfile(os.path.join(path, "offsets.bin"), dtype=np.int64).reshape(-1, 2)
+        self.offsets, self.lengths = offsets[:, 0], offsets[:, 1]
+        total = self.meta["total_rows"]
+        self.buffers = {}
+        for name, (width, dtype) in self.meta["columns"].items():
+            shape = (total, width) if width else (total,)
+            # 틱이 하나도 없으면 크기 0 memmap을 만들 수 없으므로 빈 배열 사용
+            self.buffers[name] = (
+                np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=shape)
+                if total
+                else np.empty(shape, dtype=dtype)
+            )
+
+    def read(self, i, name, start, stop) -> np.ndarray:
+        """에피소드 i의 데이터셋 name에서 [start, stop) 행 (복사 없이 memmap을 자른 view)"""
+        offset = self.offsets[i]
+        return self.buffers[name][offset + start : offset + stop]
+
+    def windows(self, name, episodes, starts, window) -> np.ndarray:
+        """(에피소드, 시작) 쌍마다 길이 window 구간을 모은 (B, window, ...) 배열 (한 번의 gather)"""
+        rows = (self.offsets[episodes] + starts)[:, None] + np.arange(window)
+        return self.buffers[name][rows]
+
+    def close(self):
+        self.buffers.clear()
+
+
+class WindowLoader:
+    """여러 에피소드를 가로질러 길이 window의 무작위 구간을 배치로 뽑는 로더
+
+    가능한 모든 구간(에피소드마다 length - window + 1개) 중에서 고르게 뽑으므로 긴 에피소드일수록
+    자주 나오고, window보다 짧은 에피소드는 빠진다.
+
+    Args:
+        source: H5Source 혹은 MemmapSource
+        window (int): 구간 길이 (틱)
+        keys: 읽을 데이터셋 이름
+        batch_size (int): 배치 하나의 구간 수
+        seed (int): 난수 시드
+    """
+
+    def __init__(self, source, window, keys=WINDOW_KEYS, batch_size=32, seed=None):
+        self.source = source
+        self.window = window
+        self.keys = tuple(keys)
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self._counts = np.maximum(source.lengths - window + 1, 0)
+        self._cumulative = np.cumsum(self._counts)
+        if not len(self._cumulative) or not self._cumulative[-1]:
+            raise ValueError(f"no episode has at least {window} ticks")
+
+    def __len__(self):
+        """뽑을 수 있는 구간 수"""
+        return int(self._cumulative[-1])
+
+    def locate(self, flat):
+        """전체 구간 번호를 (에피소드, 시작 틱)으로"""
+        episodes = np.searchsorted(self._cumulative, flat, side="right")
+        starts = flat - (self._cumulative[episodes] - self._counts[episodes])
+        return episodes, starts
+
+    def sample(self, batch_size=None) -> dict:
+        """무작위 구간 배치 하나
+        Returns:
+            dict: keys마다 (B, window, ...) 배열, 그리고 episode / start (B,) 위치
+        """
+        flat = self.rng.integers(len(self), size=batch_size or self.batch_size)
+        episodes, starts = self.locate(flat)
+        batch = {"episode": episodes, "start": starts}
+        for name in self.keys:
+            batch[name] = self.source.windows(name, episodes, starts, self.window)
+        return batch
+
+    def __iter__(self):
+        while True:
+            yield self.sample()
+
+
+def summarize(entries) -> str:
+    """색인 요약 (에피소드 수, 틱 수, 문자열별 개수)"""
+    lengths = np.array([entry["length"] for entry in entries], dtype=np.int64)
+    complete = sum(entry["complete"] for entry in entries)
+    lines = [
+        f"{len(entries)} episodes ({complete} complete), {lengths.sum()} ticks"
+        + (f", length {lengths.min()}..{lengths.max()}" if len(lengths) else "")
+    ]
+    for text, count in Counter(entry.get("text", "") for entry in entries).most_common(10):
+        lines.append(f"  {text or '(no text)'}: {count}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Inspect, index and pack a drawing dataset store")
+    parser.add_argument("root", help="저장소 디렉터리")
+    parser.add_argument("--rebuild-index", action="store_true", help="샤드 attrs에서 색인 다시 만들기")
+    parser.add_argument("--pack", action="store_true", help="완료된 에피소드를 memmap 버퍼로 풀어 쓰기")
+    parser.add_argument("--sample", type=int, metavar="WINDOW", help="무작위 구간 읽기 속도 측정")
+    parser.add_argument("--batches", type=int, default=100)
+    args = parser.parse_args()
+
+    entries = rebuild_index(args.root) if args.rebuild_index else read_index(args.root)
+    print(summarize(entries))
+    if args.pack:
+        meta = pack_memmap(args.root)
+        print(f"Packed {len(meta['episodes'])} episodes, {meta['total_rows']} ticks")
+    if args.sample:
+        packed = os.path.join(args.root, PACKED_DIR)
+        sources = [("h5", H5Source(args.root))]
+        if os.path.exists(os.path.join(packed, CURRENT_NAME)):
+            sources.append(("memmap", MemmapSource(packed)))
+        for label, source in sources:
+            loader = WindowLoader(source, args.sample, seed=0)
+            started = time.perf_counter()
+            for _ in range(args.batches):
+                loader.sample()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label}: {args.batches} batches x {loader.batch_size} windows of {args.sample} ticks, "
+                f"{elapsed / args.batches * 1000:.2f} ms/batch"
+            )
+            source.close()
@@ -0,0 +1,179 @@
+"""그리기 한 번(에피소드)을 HDF5에 조금씩 늘려 쓰는 기록기
+
+예전 DrawingApp은 틱마다 관절 값과 엔드 이펙터 위치를 파이썬 리스트에 쌓았다가 끝날 때 한 번에
+joints_state.h5로 썼으므로 메모리가 계속 늘고, 중간에 죽으면 에피소드 전체를 잃었다.
+EpisodeRecorder는 chunk_rows 틱 분량의 버퍼만 미리 잡아 두고, 버퍼가 차면 크기를 늘릴 수 있는
+(chunked, 압축) 데이터셋 끝에 붙여 쓰고 파일을 flush한다. 메모리는 실행 길이와 상관없이 일정하고,
+죽더라도 마지막 flush까지의 틱은 남는다.
+
+    action    (N, 8) 관절 값 (손가락 관절 하나를 뺀 qpos, 예전 joints_state.h5와 같음)
+    ee_pose   (N, 3) 엔드 이펙터 위치
+    target    (N, 3) 그 틱의 궤적 목표 위치 (아직 없으면 NaN)
+    stroke    (N,) 획 번호
+    phase     (N,) follower 단계 (APPROACH / LOWER / DRAW)
+    tick      (N,) 물리 스텝 번호
+    time      (N,) 시뮬레이션 시간 (s)
+
+에피소드 설정(문자열, 원점, draw_scale 등)은 속성(attrs)으로, 끝나면 length와 complete도 남긴다.
+"""
+import datetime
+
+import h5py
+import numpy as np
+
+from modules.robot_control.sim_rates import PHYSICS_DT
+
+# 데이터셋 이름: (열 수, dtype), 열 수가 0이면 1차원
+COLUMNS = {
+    "action": (8, np.float64),
+    "ee_pose": (3, np.float64),
+    "target": (3, np.float64),
+    "stroke": (0, np.int32),
+    "phase": (0, np.int8),
+    "tick": (0, np.int64),
+    "time": (0, np.float64),
+}
+# 버퍼 / HDF5 chunk 행 수 (60 Hz에서 약 17초)
+CHUNK_ROWS = 1024
+COMPRESSION = "gzip"
+COMPRESSION_LEVEL = 4
+
+
+def _attr_value(value):
+    """h5py 속성으로 쓸 수 있는 값으로 (None은 빈 문자열, 리스트는 배열)"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value)
+    return value
+
+
+class EpisodeRecorder:
+    """에피소드 하나를 chunk 단위로 붙여 쓰는 HDF5 기록기
+
+    Args:
+        target: HDF5 파일 경로(새로 만든다) 혹은 이미 열린 h5py.Group (그룹 안에 데이터셋을 만든다)
+        physics_dt (float): 틱 간격 (s)
+        attrs (dict): 에피소드 설정 (문자열, 원점, draw_scale 등)
+        chunk_rows (int): 버퍼 크기이자 HDF5 chunk 행 수
+        compression (str): HDF5 압축 필터 (None이면 압축하지 않음)
+        compression_level (int): gzip 압축 수준
+        on_close: 닫을 때 (파일을 닫기 전에) recorder를 받아 부르는 함수 (DatasetStore의 색인 기록 등)
+    """
+
+    def __init__(
+        self,
+        target,
+        physics_dt=PHYSICS_DT,
+        attrs=None,
+        chunk_rows=CHUNK_ROWS,
+        compression=COMPRESSION,
+        compression_level=COMPRESSION_LEVEL,
+        on_close=None,
+    ):
+        if isinstance(target, h5py.Group):
+            self._file = None
+            self.group = target
+        else:
+            self._file = h5py.File(target, "w")
+            self.group = self._file
+        self.physics_dt = physics_dt
+        self.on_close = on_close
+        self.length = 0
+        options = {}
+        if compression:
+            options = {"compression": compression, "shuffle": True}
+            if compression == "gzip":
+                options["compression_opts"] = compression_level
+
+        self.datasets = {}
+        self._buffers = {}
+        for name, (width, dtype) in COLUMNS.items():
+            shape = (chunk_rows, width) if width else (chunk_rows,)
+            self.datasets[name] = self.group.create_dataset(
+                name,
+                shape=(0,) + shape[1:],
+                maxshape=(None,) + shape[1:],
+                chunks=shape,
+                dtype=dtype,
+                **options,
+            )
+            self._buffers[name] = np.empty(shape, dtype=dtype)
+        self._size = 0
+
+        self.group.attrs["physics_dt"] = physics_dt
+        self.group.attrs["created"] = datetime.datetime.now().isoformat(timespec="seconds")
+        self.group.attrs["complete"] = False
+        for key, value in (attrs or {}).items():
+            self.group.attrs[key] = _attr_value(value)
+
+    @property
+    def chunk_rows(self) -> int:
+        return len(self._buffers["tick"])
+
+    @property
+    def closed(self) -> bool:
+        return self.group is None
+
+    def record(self, tick, action, ee_pose, target, stroke, phase):
+        """이번 틱 한 줄 추가 (버퍼가 차면 파일에 붙여 쓴다)
+        Args:
+            tick (int): 물리 스텝 번호
+            action (np.array): (8,) 관절 값
+            ee_pose (np.array): (3,) 엔드 이펙터 위치
+            target (np.array): (3,) 궤적 목표 위치 (None이면 NaN)
+            stroke (int): 획 번호
+            phase (int): follower 단계
+        """
+        i = self._size
+        buffers = self._buffers
+        buffers["action"][i] = action
+        buffers["ee_pose"][i] = ee_pose
+        buffers["target"][i] = np.nan if target is None else target
+        buffers["stroke"][i] = stroke
+        buffers["phase"][i] = phase
+        buffers["tick"][i] = tick
+        buffers["time"][i] = tick * self.physics_dt
+        self._size = i + 1
+        if self._size == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """버퍼를 데이터셋 끝에 붙여 쓰고 파일을 flush"""
+        size = self._size
+        if size:
+            end = self.length + size
+            for name, dataset in self.datasets.items():
+                dataset.resize(end, axis=0)
+                dataset[self.length : end] = self._buffers[name][:size]
+            self.length = end
+            self._size = 0
+            self.group.attrs["length"] = self.length
+        self.group.file.flush()
+
+    def close(self, complete=True, attrs=None):
+        """남은 버퍼를 쓰고 (경로로 열었으면) 파일을 닫는다
+        Args:
+            complete (bool): 에피소드를 끝까지 그렸는지 (attrs["complete"])
+            attrs (dict): 끝나야 알 수 있는 에피소드 설정 (스트리밍으로 그린 전체 획 수 등)
+        """
+        if self.closed:
+            return
+        self.flush()
+        self.group.attrs["complete"] = complete
+        for key, value in (attrs or {}).items():
+            self.group.attrs[key] = _attr_value(value)
+        if self.on_close is not None:
+            self.on_close(self)
+        if self._file is not None:
+            self._file.close()
+        self.group = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(complete=exc_type is None)
+
+    def summary(self) -> str:
+        return f"{self.length + self._size} ticks"
@@ -0,0 +1,92 @@
+"""틱마다 엔드 이펙터 샘플을 한 번씩 받아 모았다가 한꺼번에 CSV로 쓰는 기록기
+
+예전 루프는 틱마다 ee_drawer.point_list(최근 점 최대 70개) 전체 중 펜이 닿은 점을 다시 썼으므로
+같은 샘플이 파일에 최대 70번 들어갔다. TelemetryRecorder는 샘플 하나를 한 번만 받아
+미리 잡아 둔 블록의 행에 채우고, 블록이 차면 BackgroundWriter 스레드가 한꺼번에 쓴다.
+
+    tick      물리 스텝 번호 (SimulationClock.step_index)
+    time      시뮬레이션 시간 (s) = tick * physics_dt
+    stroke    그리는 중인 획 번호
+    phase     follower 단계 (trajectory_follower의 APPROACH / LOWER / DRAW)
+    pen_down  펜이 종이에 닿았는지 (z < pen_down_height)
+    x, y, z   엔드 이펙터 위치 (m)
+"""
+import numpy as np
+
+from modules.data.async_writer import BLOCK, BLOCK_COUNT, BackgroundWriter, CsvSink
+from modules.robot_control.sim_rates import PEN_DOWN_HEIGHT, PHYSICS_DT
+
+FIELDS = ("tick", "time", "stroke", "phase", "pen_down", "x", "y", "z")
+FORMATS = ("%d", "%.6f", "%d", "%d", "%d", "%.9g", "%.9g", "%.9g")
+# 블록 하나에 모아 쓰는 샘플 수 (60 Hz에서 약 17초)
+TELEMETRY_CAPACITY = 1024
+
+
+class TelemetryRecorder:
+    """엔드 이펙터 샘플 기록기
+
+    Args:
+        path (str): 쓸 CSV 경로 (열자마자 머리글을 쓴다)
+        physics_dt (float): 틱 간격 (s)
+        capacity (int): 블록 하나에 모았다가 한 번에 쓰는 샘플 수
+        pen_down_height (float): 이보다 낮으면 펜이 닿은 샘플
+        block_count (int): 미리 잡아 두는 블록 수
+        when_full (str): 쓰기가 밀렸을 때 "block"(기다림) 혹은 "drop"(버림), BackgroundWriter 참고
+    """
+
+    def __init__(
+        self,
+        path,
+        physics_dt=PHYSICS_DT,
+        capacity=TELEMETRY_CAPACITY,
+        pen_down_height=PEN_DOWN_HEIGHT,
+        block_count=BLOCK_COUNT,
+        when_full=BLOCK,
+    ):
+        self.path = path
+        self.physics_dt = physics_dt
+        self.pen_down_height = pen_down_height
+        self.writer = BackgroundWriter(CsvSink(path, FIELDS, FORMATS), capacity, block_count, when_full)
+
+    @property
+    def samples(self) -> int:
+        return self.writer.records
+
+    def record(self, tick, ee_pos, stroke, phase):
+        """이번 틱 샘플 하나 추가
+        Args:
+            tick (int): 물리 스텝 번호
+            ee_pos (np.array): 엔드 이펙터 위치 [x, y, z]
+            stroke (int): 획 번호
+            phase (int): follower 단계
+        """
+        row = self.writer.next_row()
+        if row is None:
+            return
+        row[0] = tick
+        row[1] = tick * self.physics_dt
+        row[2] = stroke
+        row[3] = phase
+        row[4] = ee_pos[2] < self.pen_down_height
+        row[5:8] = ee_pos
+
+    def flush(self):
+        """모아 둔 샘플을 모두 쓸 때까지 기다린다"""
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> str:
+        return f"{self.path}: {self.writer.summary()}"
+
+
+def read_telemetry(path) -> np.ndarray:
+    """TelemetryRecorder CSV를 열 이름으로 읽는 구조화 배열로 읽기"""
+    return np.atleast_1d(np.genfromtxt(path, delimiter=",", names=True))
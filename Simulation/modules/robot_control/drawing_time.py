@@ -0,0 +1,442 @@
+"""시뮬레이션 없이 획 계획만으로 반응형 그리기(TrajectoryFollower)에 걸리는 시간을 추정
+
+TrajectoryFollower는 엔드 이펙터가 거리 기준에 들어올 때까지 기다리므로 걸리는 시간이
+팔이 목표를 따라가는 방식에 달려 있다. 여기서는 팔을 "속도 제한 speed + 시정수 time_constant의
+1차 수렴"으로 보고 단계마다 닫힌 식으로 시간을 계산한다.
+
+    다가가기    이전 획 끝점에서 다가가기 지점으로 직선 이동, 시작점까지 approach_tolerance 안에 들면 끝
+    펜 내리기   그 지점에서 시작점으로, start_tolerance 안에 들면 끝
+    그리기      목표가 (시작점에서 간 거리 x draw_scale)만큼 앞서므로 처음에는 지수적으로 빨라지고
+                (속도 제한까지), 목표가 끝점에 닿은 뒤에는 끝점으로 수렴해 end_tolerance 안에 들면 끝
+
+단계마다 상태 전환에 드는 틱 수(overhead)를 더한다. 계산은 선분 배열 전체에 한 번에 하므로
+9글자 문구 하나에 수백 us 정도 걸린다. 상수는 calibrate()로 기록된 실행(joints_state.h5의 ee_pose,
+endeffector_data_*.csv)에서 맞출 수 있다: 기록된 엔드 이펙터 위치를 같은 follower에 다시 넣으면
+틱마다 어느 획의 어느 단계였는지 그대로 재현되므로 단계별 실제 틱 수와 추정값의 차이를 최소화한다.
+
+timing이 "timed" / "ik"인 미리 계산한 궤적은 TimedTrajectory.duration이 곧 정확한 시간이다.
+
+    python -m modules.robot_control.drawing_time 융합프로젝트공모전 --calibrate joints_state.h5
+"""
+import csv
+import math
+import time
+import argparse
+import dataclasses
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from modules.robot_control.fr3_kinematics import REST_POSITIONS, tcp_position
+from modules.robot_control.sim_rates import PEN_DOWN_HEIGHT, PHYSICS_DT
+from modules.robot_control.trajectory_follower import APPROACH, DRAW, LOWER, TrajectoryFollower
+from modules.stroke.stroke_plan import compile_stroke_plan
+
+PHASES = ("approach", "lower", "draw")
+# 그리기 단계 시작 진행 거리의 하한 (0이면 지수 증가가 시작되지 않는다)
+MIN_PROGRESS = 1e-4
+
+
+@dataclass(frozen=True)
+class FollowerTiming:
+    """팔이 TrajectoryFollower 목표를 따라가는 방식을 요약한 상수
+
+    Args:
+        speed: 엔드 이펙터 최대 속도 (m/s)
+        time_constant: 다가가기/펜 내리기에서 목표와의 거리가 줄어드는 1차 수렴 시정수 (s)
+        draw_time_constant: 그리기 단계 시정수 (s)
+        draw_start: 그리기를 시작할 때의 실질 진행 거리 (m). 펜 내리기가 끝난 직후의 거리는 대부분
+            높이 차이고 그것이 먼저 줄어들므로 start_tolerance보다 훨씬 작다.
+        overhead: 단계(다가가기, 펜 내리기, 그리기)마다 더하는 틱 수
+    """
+
+    speed: float = 0.5
+    time_constant: float = 0.1
+    draw_time_constant: float = 0.15
+    draw_start: float = 5e-4
+    overhead: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+
+
+# kinematic_backend 실행(draw_scale 1.5, 3.0)에서 보정한 값
+KINEMATIC_TIMING = FollowerTiming(
+    speed=0.2111, time_constant=0.2091, draw_time_constant=0.0858, draw_start=4.6e-06,
+    overhead=(0.483, 6.561, 3.192),
+)
+# Isaac Sim RMPFlow 기록(joints_state.h5, draw_scale 1.5, 재현되는 앞 96획)에서 보정한 값
+# (123획 전체 7954틱 추정, 기록은 7935틱)
+ISAAC_TIMING = FollowerTiming(
+    speed=0.2142, time_constant=0.0062, draw_time_constant=0.2179, draw_start=0.00315,
+    overhead=(2.223, 12.223, 5.403),
+)
+DEFAULT_TIMING = ISAAC_TIMING
+
+
+def settle_time(distance, tolerance, speed, time_constant) -> np.ndarray:
+    """목표에서 distance 떨어진 팔이 tolerance 안에 들어올 때까지 걸리는 시간 (원소별)
+
+    거리가 speed * time_constant보다 멀면 speed로 다가가고, 그 안에서는 지수적으로 수렴한다.
+    tolerance가 0 이하이면 (거리가 0이 아닌 한) 들어오지 못하므로 inf.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), distance.shape)
+    knee = speed * time_constant
+    saturated = np.maximum(distance - np.maximum(tolerance, knee), 0.0) / speed
+    inner = np.minimum(distance, knee)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        linear = np.where(inner > tolerance, time_constant * np.log(inner / tolerance), 0.0)
+    return np.where(distance > tolerance, saturated + linear, 0.0)
+
+
+def _approach_gap(previous, starts, height, tolerance):
+    """previous에서 다가가기 지점(시작점 위 height)으로 직선으로 갈 때 시작점까지 tolerance 안에
+    처음 들어오는 곳과 다가가기 지점 사이 거리 (들어오지 못하면 -1)"""
+    offset = previous - starts
+    offset[:, 2] -= height
+    travel = np.linalg.norm(offset, axis=1)
+    u_z = np.divide(offset[:, 2], travel, out=np.zeros_like(travel), where=travel > 0)
+    # |A + s u - S|^2 = h^2 + 2 s h u_z + s^2 = r^2 의 큰 근
+    disc = (height * u_z) ** 2 - height * height + tolerance * tolerance
+    gap = -height * u_z + np.sqrt(np.maximum(disc, 0.0))
+    return travel, np.where((disc >= 0) & (gap > 0), gap, -1.0)
+
+
+def _draw_time(lengths, progress, draw_scale, end_tolerance, speed, time_constant):
+    """그리기 단계 시간 (선분별): 목표가 진행 거리의 draw_scale배 앞서는 동안은 (k - 1) x / tau
+    속도로 빨라지고 (speed 제한), 목표가 끝점에 닿은 뒤에는 끝점으로 수렴한다"""
+    k = draw_scale
+    finish = lengths - end_tolerance  # 끝점까지 end_tolerance 안에 드는 진행 거리
+    x0 = np.minimum(np.maximum(progress, MIN_PROGRESS), np.maximum(finish, MIN_PROGRESS))
+    if k <= 1.0:
+        return np.where(finish <= x0, 0.0, np.inf)
+    x1 = np.minimum(lengths / k, finish)
+    knee = speed * time_constant / (k - 1.0)
+    grow = np.minimum(x1, knee)
+    with np.errstate(invalid="ignore"):
+        growing = np.where(grow > x0, time_constant / (k - 1.0) * np.log(grow / x0), 0.0)
+    cruising = np.maximum(x1 - np.maximum(x0, knee), 0.0) / speed
+    converging = settle_time(
+        np.where(finish > x1, lengths - np.maximum(x0, x1), 0.0), end_tolerance, speed, time_constant
+    )
+    return np.where(finish <= x0, 0.0, growing + cruising + converging)
+
+
+class DrawingTimeEstimate:
+    """획마다 단계별 추정 시간과 합계
+
+    Args:
+        phase_seconds (np.array): (S, 3) 획마다 다가가기, 펜 내리기, 그리기 시간 (s)
+        physics_dt (float): 틱 간격 (s)
+    """
+
+    def __init__(self, phase_seconds, physics_dt=PHYSICS_DT):
+        self.phase_seconds = phase_seconds
+        self.physics_dt = physics_dt
+
+    @property
+    def stroke_seconds(self) -> np.ndarray:
+        return self.phase_seconds.sum(axis=1)
+
+    @property
+    def pen_up_seconds(self) -> float:
+        """펜을 들고 움직이는 시간 (다가가기 + 펜 내리기)"""
+        return float(self.phase_seconds[:, :DRAW].sum())
+
+    @property
+    def pen_down_seconds(self) -> float:
+        return float(self.phase_seconds[:, DRAW].sum())
+
+    @property
+    def total_seconds(self) -> float:
+        return float(self.phase_seconds.sum())
+
+    @property
+    def ticks(self) -> float:
+        return self.total_seconds / self.physics_dt
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.phase_seconds)} strokes, {self.ticks:.0f} ticks ({self.total_seconds:.2f} s), "
+            f"pen up {self.pen_up_seconds:.2f} s, pen down {self.pen_down_seconds:.2f} s"
+        )
+
+
+def _phase_seconds(follower, timing, initial_position):
+    """획별 단계 시간 (S, 3), overhead 제외"""
+    speed, tau = timing.speed, timing.time_constant
+    first = follower.stroke_offsets[:-1]
+    last = follower.stroke_offsets[1:] - 1
+    # 다가가기는 이전 획 끝점(첫 획은 initial_position)에서 출발
+    previous = np.empty_like(follower.starts[first])
+    previous[0] = initial_position
+    previous[1:] = follower.ends[last[:-1]]
+    height = follower.approaches[first, 2] - follower.starts[first, 2]
+    travel, gap = _approach_gap(previous, follower.starts[first], height, follower.approach_tolerance)
+    inside = np.linalg.norm(previous - follower.starts[first], axis=1) <= follower.approach_tolerance
+    approach = np.where(
+        inside, 0.0, np.where(gap >= 0, settle_time(travel, np.maximum(gap, 0.0), speed, tau), np.inf)
+    )
+    # 펜 내리기는 시작점에서 approach_tolerance 떨어진 곳(이미 안이면 출발점)에서 시작
+    lowering_from = np.minimum(
+        np.linalg.norm(previous - follower.starts[first], axis=1), follower.approach_tolerance
+    )
+    lower = settle_time(lowering_from, follower.start_tolerance, speed, tau)
+
+    # 획의 첫 선분은 draw_start, 이어지는 선분은 end_tolerance 떨어진 곳에서 그리기 시작
+    progress = np.full(len(follower.lengths), follower.end_tolerance)
+    progress[first] = timing.draw_start
+    draw = _draw_time(
+        follower.lengths,
+        progress,
+        follower.draw_scale,
+        follower.end_tolerance,
+        speed,
+        timing.draw_time_constant,
+    )
+    draw = np.add.reduceat(draw, first) if len(draw) else draw
+    return np.stack([approach, lower, draw], axis=1)
+
+
+def default_initial_position() -> np.ndarray:
+    """기본 관절 자세의 TCP 위치 (첫 획의 다가가기 출발점)"""
+    return tcp_position(REST_POSITIONS)
+
+
+def estimate_drawing_time(
+    follower, timing=DEFAULT_TIMING, initial_position=None, physics_dt=PHYSICS_DT
+) -> DrawingTimeEstimate:
+    """TrajectoryFollower(획 계획 + draw_scale + 전환 거리)로 그리는 시간 추정
+    Args:
+        follower (TrajectoryFollower): 그릴 follower (상태는 바꾸지 않는다)
+        timing (FollowerTiming): 팔 추종 상수
+        initial_position (np.array): 첫 획을 시작할 때 엔드 이펙터 위치 (None이면 기본 자세)
+        physics_dt (float): 틱 간격 (s)
+    Returns:
+        DrawingTimeEstimate: 획별 단계 시간과 합계 (획에 들어갈 수 없으면 inf)
+    """
+    if initial_position is None:
+        initial_position = default_initial_position()
+    seconds = _phase_seconds(follower, timing, np.asarray(initial_position, dtype=np.float64))
+    seconds += np.asarray(timing.overhead) * physics_dt
+    return DrawingTimeEstimate(seconds, physics_dt)
+
+
+def estimate_text(
+    character_list,
+    original_position,
+    draw_scale=1.5,
+    mode="segment",
+    stroke_order=None,
+    allow_reverse=False,
+    timing=DEFAULT_TIMING,
+    physics_dt=PHYSICS_DT,
+    **kwargs,
+) -> DrawingTimeEstimate:
+    """한글 문자열을 그리는 시간 추정 (create_follower와 같은 인자, kwargs는 전환 거리 등)"""
+    plan = compile_stroke_plan(character_list, order=stroke_order, allow_reverse=allow_reverse)
+    follower = TrajectoryFollower.from_plan(
+        plan, np.asarray(original_position, dtype=np.float64), mode=mode, draw_scale=draw_scale, **kwargs
+    )
+    return estimate_drawing_time(follower, timing, physics_dt=physics_dt)
+
+
+def load_trace(path) -> np.ndarray:
+    """기록된 실행에서 틱마다 엔드 이펙터 위치 (N, 3) 읽기
+
+    .h5는 ee_pose (없으면 action 관절 값으로 계산), .csv는 x, y, z 열을 읽는다.
+    TelemetryRecorder CSV(tick 열이 있음)는 틱마다 한 줄이므로 그대로 읽는다. 그 전의
+    endeffector_data_*.csv는 틱마다 최근 점 목록 전체를 다시 썼으므로 같은 점이 반복되는데,
+    처음 나온 순서대로 한 번씩만 남긴다 (이 파일에는 펜을 내린 틱만 있다).
+    """
+    if str(path).endswith((".h5", ".hdf5")):
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            if "ee_pose" in f:
+                return np.asarray(f["ee_pose"][:], dtype=np.float64)
+            return tcp_position(np.asarray(f["action"][:], dtype=np.float64))
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        rows = [(row["x"], row["y"], row["z"]) for row in reader]
+        per_tick = "tick" in reader.fieldnames
+    points = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    if per_tick:
+        return points
+    _, index = np.unique(points, axis=0, return_index=True)
+    return points[np.sort(index)]
+
+
+def replay_phases(follower, positions) -> np.ndarray:
+    """기록된 엔드 이펙터 위치를 follower에 다시 넣어 획마다 단계별 틱 수를 세는 함수
+
+    follower는 위치만 보고 상태를 바꾸므로 같은 설정이면 기록할 때의 전환이 그대로 재현된다.
+    기록이 끝나거나 설정이 달라 더 진행하지 못하면 끝까지 완료한 획까지만 돌려준다.
+
+    Args:
+        follower (TrajectoryFollower): 기록할 때와 같은 설정의 follower (처음부터 다시 시작한다)
+        positions (np.array): (N, 3) 틱마다 엔드 이펙터 위치
+    Returns:
+        np.array: (완료한 획 수, 3) 다가가기, 펜 내리기, 그리기 틱 수
+    """
+    ticks = np.zeros((follower.stroke_count, len(PHASES)), dtype=np.int64)
+    follower.reset()
+    stroke = 0
+    for ee_pos in positions:
+        ticks[stroke, follower.state] += 1
+        _, is_stroke_complete = follower.step(ee_pos, current_stroke=stroke)
+        if is_stroke_complete:
+            stroke += 1
+            if stroke >= follower.stroke_count:
+                break
+    follower.reset()
+    return ticks[:stroke]
+
+
+def _fit(runs, phases, candidates, physics_dt):
+    """candidates 중 phases 틱 수 잔차가 가장 작은 FollowerTiming (overhead는 잔차 평균으로 채운다)
+
+    runs는 (follower, 출발점, 관측 틱 수) 목록이다.
+    """
+    best = (np.inf, None)
+    for candidate in candidates:
+        residual = []
+        for follower, start, observed in runs:
+            predicted = _phase_seconds(follower, candidate, start)[: len(observed), phases]
+            residual.append(observed[:, phases] - predicted / physics_dt)
+        residual = np.concatenate(residual)
+        if not np.isfinite(residual).all():
+            continue
+        overhead = residual.mean(axis=0)
+        error = float(((residual - overhead) ** 2).mean())
+        if error < best[0]:
+            fitted = list(candidate.overhead)
+            for phase, value in zip(phases, overhead):
+                fitted[phase] = round(float(value), 3)
+            best = (error, dataclasses.replace(candidate, overhead=tuple(fitted)))
+    return best
+
+
+def _zoom(values, center, grid):
+    """로그 격자를 center 주변 (양쪽 두 격자 간격)으로 좁힌다"""
+    step = (values[1] / values[0]) ** 2
+    return np.geomspace(center / step, center * step, grid)
+
+
+def calibrate(
+    runs,
+    phases=(APPROACH, LOWER, DRAW),
+    timing=DEFAULT_TIMING,
+    physics_dt=PHYSICS_DT,
+    grid=24,
+    rounds=3,
+):
+    """기록된 실행에 맞춰 FollowerTiming 상수를 고르는 함수
+
+    먼저 다가가기/펜 내리기 틱 수로 speed와 time_constant를, 그다음 그리기 틱 수로
+    draw_time_constant와 draw_start를 로그 격자에서 고른다 (rounds번 범위를 좁혀 다시). 각 격자점에서
+    단계별 overhead는 틱 수 잔차의 평균(최소제곱 해)으로 정한다. draw_scale이 다른 실행을 함께 넣으면
+    상수가 draw_scale에 덜 치우친다. 펜을 내린 틱만 기록된 경우처럼 일부 단계만 믿을 수 있으면
+    phases로 그 단계만 맞추고 나머지는 timing 값을 쓴다.
+
+    Args:
+        runs: (follower, positions) 목록. follower는 기록할 때와 같은 설정의 TrajectoryFollower,
+            positions는 (N, 3) 틱마다 엔드 이펙터 위치 (첫 값이 첫 획의 출발점)
+        phases: 맞출 단계 (APPROACH, LOWER, DRAW)
+        timing (FollowerTiming): 시작값
+        physics_dt (float): 기록한 틱 간격 (s)
+        grid (int): 축마다 격자점 수
+        rounds (int): 범위를 좁혀 다시 찾는 횟수
+    Returns:
+        tuple: (FollowerTiming, 재현한 획 수, 맞춘 단계의 틱 수 RMS 오차)
+    """
+    replayed = []
+    for follower, positions in runs:
+        positions = np.asarray(positions, dtype=np.float64)
+        observed = replay_phases(follower, positions)
+        if len(observed):
+            replayed.append((follower, positions[0], observed))
+    if not replayed:
+        raise ValueError("the recorded traces do not complete a single stroke with these followers")
+    errors = []
+
+    moving = [phase for phase in (APPROACH, LOWER) if phase in phases]
+    if moving:
+        speeds, taus = np.geomspace(0.05, 2.0, grid), np.geomspace(0.01, 1.0, grid)
+        for _ in range(rounds):
+            candidates = (
+                dataclasses.replace(timing, speed=float(v), time_constant=float(tau))
+                for v in speeds
+                for tau in taus
+            )
+            error, timing = _fit(replayed, moving, candidates, physics_dt)
+            speeds = _zoom(speeds, timing.speed, grid)
+            taus = _zoom(taus, timing.time_constant, grid)
+        errors.append(error * len(moving))
+
+    if DRAW in phases:
+        taus, starts = np.geomspace(0.02, 2.0, grid), np.geomspace(1e-5, 0.02, grid)
+        for _ in range(rounds):
+            candidates = (
+                dataclasses.replace(timing, draw_time_constant=float(tau), draw_start=float(x0))
+                for tau in taus
+                for x0 in starts
+            )
+            error, timing = _fit(replayed, [DRAW], candidates, physics_dt)
+            taus = _zoom(taus, timing.draw_time_constant, grid)
+            starts = _zoom(starts, timing.draw_start, grid)
+        errors.append(error)
+
+    timing = dataclasses.replace(
+        timing,
+        speed=round(timing.speed, 4),
+        time_constant=round(timing.time_constant, 4),
+        draw_time_constant=round(timing.draw_time_constant, 4),
+        draw_start=float(f"{timing.draw_start:.3g}"),
+    )
+    strokes = sum(len(observed) for _, _, observed in replayed)
+    return timing, strokes, math.sqrt(sum(errors) / len(phases))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate the drawing time of a phrase without simulating")
+    parser.add_argument("text", help="그릴 한글 문자열")
+    parser.add_argument("--origin", type=float, nargs=3, default=[0.5, 0.0, 0.2], help="original_position")
+    parser.add_argument("--draw-scale", type=float, default=1.5)
+    parser.add_argument("--mode", choices=("segment", "polyline"), default="segment")
+    parser.add_argument("--timing", choices=("isaac", "kinematic"), default="isaac", help="보정 상수")
+    parser.add_argument(
+        "--calibrate",
+        metavar="PATH",
+        nargs="+",
+        help="같은 설정으로 기록한 실행(joints_state.h5, endeffector_data_*.csv)으로 보정",
+    )
+    args = parser.parse_args(argv)
+
+    timing = ISAAC_TIMING if args.timing == "isaac" else KINEMATIC_TIMING
+    plan = compile_stroke_plan(args.text)
+    follower = TrajectoryFollower.from_plan(
+        plan, np.asarray(args.origin), mode=args.mode, draw_scale=args.draw_scale
+    )
+    initial_position = None
+    if args.calibrate:
+        traces = [load_trace(path) for path in args.calibrate]
+        # 펜을 내린 틱만 있는 기록이면 그리기 단계만 맞춘다
+        pen_down_only = all((positions[:, 2] < PEN_DOWN_HEIGHT).all() for positions in traces)
+        phases = (DRAW,) if pen_down_only else (APPROACH, LOWER, DRAW)
+        runs = [(follower, positions) for positions in traces]
+        timing, strokes, rms = calibrate(runs, phases, timing)
+        initial_position = traces[0][0]
+        print(
+            f"[drawing time] calibrated on {strokes}/{follower.stroke_count * len(traces)} strokes "
+            f"({', '.join(PHASES[p] for p in phases)}), rms {rms:.2f} ticks per phase: {timing}"
+        )
+
+    started = time.perf_counter()
+    estimate = estimate_drawing_time(follower, timing, initial_position)
+    elapsed = time.perf_counter() - started
+    print(f"[drawing time] {estimate.summary()} (estimated in {elapsed * 1e6:.0f} us)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+"""FR3 정기구학 (NumPy, 여러 관절 벡터를 한 번에)
+
+Franka 문서의 수정 DH(Craig) 파라미터와 fr3_hand_tcp 오프셋으로 베이스 좌표계의
+TCP 자세를 계산한다. 시뮬레이션 루프에서는 get_joints_state로 이미 읽은 관절 값으로
+USD prim 조회(ComputeLocalToWorldTransform) 없이 엔드 이펙터 위치를 구하고,
+녹화한 joints_state.h5 전체의 엔드 이펙터 경로도 한 번에 구할 수 있다.
+
+    >>> tcp_position([0.0, -0.3, 0.0, -1.8, 0.0, 1.5, 0.7]).round(4)  # 기본 자세
+    array([ 0.4506, -0.    ,  0.5583])
+"""
+import math
+
+import h5py
+import numpy as np
+
+JOINT_COUNT = 7
+
+# 수정 DH 파라미터: T_i = RotX(alpha_i) * TransX(a_i) * RotZ(q_i) * TransZ(d_i)
+DH_A = np.array([0.0, 0.0, 0.0, 0.0825, -0.0825, 0.0, 0.088])
+DH_D = np.array([0.333, 0.0, 0.316, 0.0, 0.384, 0.0, 0.0])
+DH_ALPHA = np.array([0.0, -np.pi / 2, np.pi / 2, np.pi / 2, -np.pi / 2, np.pi / 2, np.pi / 2])
+
+# 관절 범위 (rad, FR3 데이터시트)
+JOINT_LOWER = np.array([-2.7437, -1.7837, -2.9007, -3.0421, -2.8065, 0.5445, -3.0159])
+JOINT_UPPER = np.array([2.7437, 1.7837, 2.9007, -0.1518, 2.8065, 4.5169, 3.0159])
+JOINT_VELOCITY_LIMIT = np.array([2.62, 2.62, 2.62, 2.62, 5.26, 4.18, 5.26])  # rad/s
+# 시뮬레이션 시작 자세 (main.py의 joints_default_positions에서 손가락 관절을 뺀 것)
+REST_POSITIONS = np.array([0.0, -0.3, 0.0, -1.8, 0.0, 1.5, 0.7])
+
+# 7번 관절 -> 플랜지 -> 손 -> fr3_hand_tcp (손은 플랜지에 대해 z축으로 -45도 돌아 있다)
+FLANGE_LENGTH = 0.107
+TCP_LENGTH = 0.1034
+HAND_YAW = -np.pi / 4
+
+# 데이터셋에서 한 번에 읽어 변환할 행 수
+READ_CHUNK = 1 << 16
+
+_COS_ALPHA = np.cos(DH_ALPHA)
+_SIN_ALPHA = np.sin(DH_ALPHA)
+
+# 관절 각도와 관계없는 성분 (각도에 따라 바뀌는 왼쪽 위 3x2 성분은 0)
+_CONSTANT_PART = np.zeros((JOINT_COUNT, 4, 4))
+_CONSTANT_PART[:, 0, 3] = DH_A
+_CONSTANT_PART[:, 1, 2] = -_SIN_ALPHA
+_CONSTANT_PART[:, 1, 3] = -_SIN_ALPHA * DH_D
+_CONSTANT_PART[:, 2, 2] = _COS_ALPHA
+_CONSTANT_PART[:, 2, 3] = _COS_ALPHA * DH_D
+_CONSTANT_PART[:, 3, 3] = 1.0
+
+
+def _flange_to_tcp():
+    transform = np.eye(4)
+    c, s = np.cos(HAND_YAW), np.sin(HAND_YAW)
+    transform[:2, :2] = [[c, -s], [s, c]]
+    transform[2, 3] = FLANGE_LENGTH + TCP_LENGTH
+    return transform
+
+
+FLANGE_TO_TCP = _flange_to_tcp()
+FLANGE_TO_TCP.setflags(write=False)
+
+# 점 변환용 float 상수
+_A, _D = DH_A.tolist(), DH_D.tolist()
+_COS, _SIN = _COS_ALPHA.tolist(), _SIN_ALPHA.tolist()
+_TCP_POINT = FLANGE_TO_TCP[:3, 3].tolist()
+
+
+def joint_transforms(joint_positions) -> np.ndarray:
+    """관절마다 이전 링크 -> 다음 링크 변환 행렬
+    Args:
+        joint_positions (np.array): (..., 7) 관절 각도 (rad)
+    Returns:
+        np.array: (..., 7, 4, 4) 변환 행렬
+    """
+    q = np.asarray(joint_positions, dtype=np.float64)
+    ct, st = np.cos(q), np.sin(q)
+    transforms = np.empty(q.shape + (4, 4))
+    transforms[...] = _CONSTANT_PART
+    transforms[..., 0, 0] = ct
+    transforms[..., 0, 1] = -st
+    transforms[..., 1, 0] = st * _COS_ALPHA
+    transforms[..., 1, 1] = ct * _COS_ALPHA
+    transforms[..., 2, 0] = st * _SIN_ALPHA
+    transforms[..., 2, 1] = ct * _SIN_ALPHA
+    return transforms
+
+
+def link_frames(joint_positions, base_position=None) -> np.ndarray:
+    """관절 1 ~ 7 좌표계와 fr3_hand_tcp의 월드 자세
+    Args:
+        joint_positions (np.array): (..., >= 7) 관절 각도, 앞 7개만 쓴다 (손가락 관절은 무시)
+        base_position (np.array): 로봇 베이스 위치 [x, y, z] (None이면 원점)
+    Returns:
+        np.array: (..., 8, 4, 4) 관절 i 좌표계 (z축이 회전축)와 마지막에 TCP 자세
+    """
+    q = np.asarray(joint_positions, dtype=np.float64)[..., :JOINT_COUNT]
+    transforms = joint_transforms(q)
+    frames = np.empty(q.shape[:-1] + (JOINT_COUNT + 1, 4, 4))
+    frames[..., 0, :, :] = transforms[..., 0, :, :]
+    for i in range(1, JOINT_COUNT):
+        np.matmul(frames[..., i - 1, :, :], transforms[..., i, :, :], out=frames[..., i, :, :])
+    np.matmul(frames[..., JOINT_COUNT - 1, :, :], FLANGE_TO_TCP, out=frames[..., JOINT_COUNT, :, :])
+    if base_position is not None:
+        frames[..., :3, 3] += np.asarray(base_position, dtype=np.float64)
+    return frames
+
+
+def forward_kinematics(joint_positions, base_position=None) -> np.ndarray:
+    """관절 각도로 fr3_hand_tcp의 월드 자세 계산
+    Args:
+        joint_positions (np.array): (..., >= 7) 관절 각도, 앞 7개만 쓴다 (손가락 관절은 무시)
+        base_position (np.array): 로봇 베이스 위치 [x, y, z] (None이면 원점)
+    Returns:
+        np.array: (..., 4, 4) TCP 자세 (동차 변환 행렬)
+    """
+    return link_frames(joint_positions, base_position)[..., JOINT_COUNT, :, :]
+
+
+def jacobian(joint_positions, frames=None) -> np.ndarray:
+    """fr3_hand_tcp의 기하 야코비안 (베이스 좌표계)
+    Args:
+        joint_positions (np.array): (..., >= 7) 관절 각도
+        frames (np.array): 이미 계산한 link_frames 결과 (None이면 새로 계산)
+    Returns:
+        np.array: (..., 6, 7) [선속도; 각속도] = J @ 관절 속도
+    """
+    if frames is None:
+        frames = link_frames(joint_positions)
+    axes = frames[..., :JOINT_COUNT, :3, 2]
+    origins = frames[..., :JOINT_COUNT, :3, 3]
+    tcp = frames[..., JOINT_COUNT, None, :3, 3]
+    linear = np.cross(axes, tcp - origins)
+    return np.concatenate([np.swapaxes(linear, -1, -2), np.swapaxes(axes, -1, -2)], axis=-2)
+
+
+def manipulability(joint_positions, frames=None) -> np.ndarray:
+    """Yoshikawa 조작성 지수 w = sqrt(det(J J^T)) (특이점에서 0)
+    Args:
+        joint_positions (np.array): (..., >= 7) 관절 각도
+        frames (np.array): 이미 계산한 link_frames 결과 (None이면 새로 계산)
+    Returns:
+        np.array: (...,) 조작성 지수
+    """
+    J = jacobian(joint_positions, frames)
+    return np.sqrt(np.maximum(np.linalg.det(J @ np.swapaxes(J, -1, -2)), 0.0))
+
+
+def _transform_point(x, y, z, cos_q, sin_q):
+    """TCP 점을 7번 링크부터 베이스까지 관절 변환으로 옮기기 (float 혹은 (N,) 배열)
+
+    행렬을 곱하지 않고 점 하나에 T_i를 바로 적용하므로 위치만 필요할 때 빠르다.
+    """
+    for i in range(JOINT_COUNT - 1, -1, -1):
+        c, s = cos_q[i], sin_q[i]
+        u = s * x + c * y
+        x, y, z = (
+            c * x - s * y + _A[i],
+            _COS[i] * u - _SIN[i] * (z + _D[i]),
+            _SIN[i] * u + _COS[i] * (z + _D[i]),
+        )
+    return x, y, z
+
+
+def tcp_position(joint_positions, base_position=None) -> np.ndarray:
+    """관절 각도로 fr3_hand_tcp의 월드 위치 계산
+    Args:
+        joint_positions (np.array): (..., >= 7) 관절 각도, 앞 7개만 쓴다 (손가락 관절은 무시)
+        base_position (np.array): 로봇 베이스 위치 [x, y, z] (None이면 원점)
+    Returns:
+        np.array: (..., 3) TCP 위치
+    """
+    q = np.asarray(joint_positions, dtype=np.float64)
+    if q.ndim == 1:
+        # 시뮬레이션 루프에서 틱마다 부르는 경우: 작은 배열 연산보다 float 계산이 빠르다
+        angles = q[:JOINT_COUNT].tolist()
+        point = _transform_point(
+            *_TCP_POINT, [math.cos(v) for v in angles], [math.sin(v) for v in angles]
+        )
+        position = np.array(point)
+    else:
+        angles = q[..., :JOINT_COUNT]
+        cos_q = np.moveaxis(np.cos(angles), -1, 0)
+        sin_q = np.moveaxis(np.sin(angles), -1, 0)
+        position = np.stack(_transform_point(*_TCP_POINT, cos_q, sin_q), axis=-1)
+    if base_position is not None:
+        position += np.asarray(base_position, dtype=np.float64)
+    return position
+
+
+def tcp_path_from_dataset(filename, key="action", base_position=None) -> np.ndarray:
+    """녹화한 데이터셋(joints_state.h5)의 관절 기록 전체를 엔드 이펙터 경로로 변환
+    Args:
+        filename (str): h5 파일 경로
+        key (str): (N, >= 7) 관절 각도 데이터셋 이름 (DrawingApp은 "action")
+        base_position (np.array): 로봇 베이스 위치 (None이면 원점)
+    Returns:
+        np.array: (N, 3) TCP 위치
+    """
+    with h5py.File(filename, "r") as f:
+        dataset = f[key]
+        path = np.empty((len(dataset), 3))
+        for first in range(0, len(dataset), READ_CHUNK):
+            rows = dataset[first:first + READ_CHUNK]
+            path[first:first + len(rows)] = tcp_position(rows, base_position)
+    return path
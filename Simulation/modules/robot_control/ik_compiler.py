@@ -0,0 +1,412 @@
+"""획 계획을 관절 공간 궤적으로 미리 풀어 두는 오프라인 IK 컴파일러
+
+TimedTrajectory의 틱별 목표 위치를 FR3 정기구학(fr3_kinematics) 위에서
+감쇠 최소제곱(DLS) IK로 풀어 틱별 관절 각도로 만든다. 펜 자세는 FR3Follow의
+목표 큐브 자세(x축 180도 회전, 펜이 -z를 향함)로 고정한다.
+
+    1. KEYFRAME_STRIDE 틱마다 하나씩 이전 해에서 출발해(warm start) 차례로 푼다.
+    2. 모든 틱을 이웃한 키프레임 해를 보간한 값에서 출발해 한 번에(배치) 다듬는다.
+
+결과는 문자열, 배치, original_position 등 결과에 영향을 주는 값의 해시를 이름으로
+asset/ik_cache/ 아래에 저장하므로, 같은 문구를 다시 그릴 때는 풀지 않고 읽기만 한다.
+시뮬레이션이나 실제 팔에서는 틱마다 관절 목표를 그대로 재생하면 된다.
+"""
+import os
+import time
+import hashlib
+
+import numpy as np
+
+from puzzle import DEFAULT_LAYOUT, DEFAULT_SCALE
+from modules.robot_control.fr3_kinematics import (
+    JOINT_COUNT,
+    JOINT_LOWER,
+    JOINT_UPPER,
+    REST_POSITIONS,
+    jacobian,
+    link_frames,
+    tcp_position,
+)
+from modules.robot_control.sim_rates import PHYSICS_DT
+from modules.robot_control.timed_trajectory import (
+    DEFAULT_LIMITS,
+    TimedTrajectory,
+    timed_trajectory_from_plan,
+)
+from modules.stroke.corner_blending import BLEND_TOLERANCE
+from modules.stroke.glyph_repository import DEFAULT_GLYPH_PATH
+from modules.stroke.layout import as_layout
+from modules.stroke.stroke_atlas import source_hash
+from modules.stroke.stroke_plan import compile_stroke_plan
+
+IK_VERSION = 1
+IK_CACHE_DIR = os.path.join(os.path.dirname(DEFAULT_GLYPH_PATH), "ik_cache")
+
+# 그릴 때 TCP 자세: FR3Follow 목표 큐브와 같은 x축 180도 회전
+DRAW_ORIENTATION = np.diag([1.0, -1.0, -1.0])
+
+# DLS 설정
+DAMPING = 0.05  # 감쇠 계수 lambda (특이점 근처에서 관절 속도가 튀지 않도록)
+NULLSPACE_GAIN = 0.1  # 남는 자유도로 REST_POSITIONS 쪽으로 당기는 정도
+_REGULARIZATION = 1e-9  # 영공간 투영 행렬을 풀 때 특이점에서만 효과가 있는 작은 값
+MAX_STEP = 0.2  # 반복 한 번에 움직이는 최대 관절 각도 (rad)
+MAX_ITERATIONS = 100
+POSITION_TOLERANCE = 1e-5  # m
+ORIENTATION_TOLERANCE = 1e-4  # rad
+
+# 차례로 푸는 키프레임 간격 (틱)
+KEYFRAME_STRIDE = 8
+# 배치로 다듬을 때 한 번에 푸는 틱 수
+IK_CHUNK = 4096
+
+
+class CacheStats:
+    """프로세스 동안의 IK 캐시 적중률과 푸는 데 쓴 시간"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.solve_seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"ik cache {self.hits} hits / {self.misses} misses ({self.hit_rate*100:.0f} %), "
+            f"solved in {self.solve_seconds:.2f} s"
+        )
+
+
+CACHE_STATS = CacheStats()
+
+
+def orientation_error(rotations, target):
+    """현재 자세 (..., 3, 3)에서 목표 자세까지 회전 벡터 (작은 각도 근사 sin(theta) * 축)"""
+    error = target @ np.swapaxes(rotations, -1, -2)
+    return 0.5 * np.stack(
+        [
+            error[..., 2, 1] - error[..., 1, 2],
+            error[..., 0, 2] - error[..., 2, 0],
+            error[..., 1, 0] - error[..., 0, 1],
+        ],
+        axis=-1,
+    )
+
+
+def _pose_error(q, targets, orientation):
+    """(N, 7) 관절 각도에서 목표까지 [위치 오차, 자세 오차] (N, 6)와 link_frames 결과"""
+    frames = link_frames(q)
+    tcp = frames[:, JOINT_COUNT]
+    error = np.concatenate(
+        [targets - tcp[:, :3, 3], orientation_error(tcp[:, :3, :3], orientation)], axis=1
+    )
+    return error, frames
+
+
+def dls_step(q, targets, orientation=DRAW_ORIENTATION, damping=DAMPING, rest=REST_POSITIONS):
+    """감쇠 최소제곱 IK 한 번 (행마다 독립)
+
+    dq = J^T (J J^T + lambda^2 I)^-1 e 에 영공간으로 투영한 rest 자세 쪽 항을 더하고,
+    한 번에 MAX_STEP 이상 움직이지 않게 줄인 뒤 관절 범위로 자른다.
+
+    Args:
+        q (np.array): (N, 7) 현재 관절 각도
+        targets (np.array): (N, 3) 목표 TCP 위치
+        orientation (np.array): (3, 3) 목표 TCP 자세
+        damping (float): 감쇠 계수
+        rest (np.array): (7,) 영공간에서 당길 자세
+    Returns:
+        tuple: (다음 관절 각도 (N, 7), 이번 단계 전 위치 오차 (N,), 자세 오차 (N,))
+    """
+    error, frames = _pose_error(q, targets, orientation)
+    J = jacobian(q, frames)
+    Jt = np.swapaxes(J, -1, -2)
+    damped = J @ Jt + (damping * damping) * np.eye(6)
+    step = (Jt @ np.linalg.solve(damped, error[..., None]))[..., 0]
+    # 영공간 항: z - J^T (J J^T)^-1 J z (감쇠 없는 투영이어야 TCP 오차로 새지 않는다)
+    pull = NULLSPACE_GAIN * (rest - q)
+    exact = J @ Jt + _REGULARIZATION * np.eye(6)
+    step += pull - (Jt @ np.linalg.solve(exact, (J @ pull[..., None])))[..., 0]
+    largest = np.abs(step).max(axis=1, keepdims=True)
+    step *= np.minimum(1.0, MAX_STEP / np.maximum(largest, 1e-12))
+    q = np.clip(q + step, JOINT_LOWER, JOINT_UPPER)
+    return q, np.linalg.norm(error[:, :3], axis=1), np.linalg.norm(error[:, 3:], axis=1)
+
+
+def _refine(q, targets, orientation, max_iterations):
+    """수렴하지 않은 행만 골라 DLS를 반복 (q를 제자리에서 고친다)"""
+    active = np.arange(len(q))
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        q[active], position_error, orientation_error = dls_step(
+            q[active], targets[active], orientation
+        )
+        converged = (position_error <= POSITION_TOLERANCE) & (
+            orientation_error <= ORIENTATION_TOLERANCE
+        )
+        active = active[~converged]
+    return q
+
+
+def solve_ik(
+    targets,
+    initial=REST_POSITIONS,
+    orientation=DRAW_ORIENTATION,
+    stride=KEYFRAME_STRIDE,
+    max_iterations=MAX_ITERATIONS,
+):
+    """연속한 TCP 목표 위치를 관절 각도로 푸는 함수
+    Args:
+        targets (np.array): (K, 3) 틱별 목표 TCP 위치 (로봇 좌표)
+        initial (np.array): (7,) 첫 키프레임을 풀기 시작할 관절 각도
+        orientation (np.array): (3, 3) 목표 TCP 자세
+        stride (int): 키프레임 간격 (틱)
+        max_iterations (int): 틱마다 최대 DLS 반복 수
+    Returns:
+        tuple:
+            - joint_positions: (K, 7) 관절 각도
+            - position_error: (K,) 남은 TCP 위치 오차 (m)
+            - orientation_error: (K,) 남은 TCP 자세 오차 (rad)
+    """
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+    count = len(targets)
+    if count == 0:
+        return np.empty((0, JOINT_COUNT)), np.empty(0), np.empty(0)
+
+    # 1. 키프레임을 이전 해에서 출발해 차례로 풀기
+    keys = np.unique(np.append(np.arange(0, count, stride), count - 1))
+    key_solutions = np.empty((len(keys), JOINT_COUNT))
+    previous = np.asarray(initial, dtype=np.float64)[:JOINT_COUNT]
+    for i, k in enumerate(keys):
+        q = previous[None].copy()
+        previous = _refine(q, targets[k : k + 1], orientation, max_iterations)[0]
+        key_solutions[i] = previous
+
+    # 2. 키프레임 해를 틱 번호로 보간한 값에서 출발해 모든 틱을 배치로 다듬기
+    ticks = np.arange(count)
+    q = np.empty((count, JOINT_COUNT))
+    for j in range(JOINT_COUNT):
+        q[:, j] = np.interp(ticks, keys, key_solutions[:, j])
+    return solve_ik_batch(targets, q, orientation, max_iterations)
+
+
+def solve_ik_batch(
+    targets, initial=REST_POSITIONS, orientation=DRAW_ORIENTATION, max_iterations=MAX_ITERATIONS
+):
+    """서로 독립인 TCP 목표 위치를 한 번에 푸는 함수 (이웃한 해를 이어 쓰지 않는다)
+    Args:
+        targets (np.array): (K, 3) 목표 TCP 위치 (로봇 좌표)
+        initial (np.array): (7,) 모든 목표에 같은 시작 관절 각도 혹은 (K, 7) 목표별 시작 각도
+        orientation (np.array): (3, 3) 목표 TCP 자세
+        max_iterations (int): 목표마다 최대 DLS 반복 수
+    Returns:
+        tuple: (관절 각도 (K, 7), 남은 위치 오차 (K,), 남은 자세 오차 (K,)) (solve_ik와 같음)
+    """
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+    count = len(targets)
+    initial = np.asarray(initial, dtype=np.float64)[..., :JOINT_COUNT]
+    q = np.array(np.broadcast_to(initial, (count, JOINT_COUNT)))
+    for first in range(0, count, IK_CHUNK):
+        chunk = slice(first, first + IK_CHUNK)
+        q[chunk] = _refine(q[chunk], targets[chunk], orientation, max_iterations)
+
+    error, _ = _pose_error(q, targets, orientation)
+    return q, np.linalg.norm(error[:, :3], axis=1), np.linalg.norm(error[:, 3:], axis=1)
+
+
+class JointTrajectory(TimedTrajectory):
+    """틱별 관절 목표를 함께 가진 TimedTrajectory
+
+    step()은 TimedTrajectory처럼 (TCP 목표 위치, 획 완료 여부)를 돌려주고,
+    같은 틱의 관절 목표는 joint_target 버퍼에 담는다.
+
+    Args:
+        joint_positions (np.array): (K, 7) 틱별 관절 목표
+        positions, pen_down, stroke_complete, stroke_count, physics_dt: TimedTrajectory 참고
+        position_error (np.array): (K,) IK가 남긴 TCP 위치 오차 (m)
+        solve_seconds (float): IK를 푸는 데 걸린 시간 (s)
+        cache_hit (bool): 디스크 캐시에서 읽었는지
+    """
+
+    def __init__(
+        self,
+        joint_positions,
+        positions,
+        pen_down,
+        stroke_complete,
+        stroke_count,
+        physics_dt=PHYSICS_DT,
+        position_error=None,
+        solve_seconds=0.0,
+        cache_hit=False,
+    ):
+        self.joint_positions = joint_positions
+        self.joint_positions.setflags(write=False)
+        if position_error is None:
+            position_error = np.zeros(len(joint_positions))
+        self.position_error = position_error
+        self.solve_seconds = solve_seconds
+        self.cache_hit = cache_hit
+        self._joint_target = np.empty(JOINT_COUNT)
+        super().__init__(positions, pen_down, stroke_complete, stroke_count, physics_dt)
+
+    @property
+    def joint_target(self) -> np.ndarray:
+        """마지막 step()이 내보낸 관절 목표 (다음 step()에서 덮어쓰는 버퍼)"""
+        return self._joint_target
+
+    def step(self, ee_pos=None, current_stroke=None):
+        tick = self._tick
+        trajectory, is_stroke_complete = super().step(ee_pos, current_stroke)
+        if trajectory is not None:
+            np.copyto(self._joint_target, self.joint_positions[tick])
+        return trajectory, is_stroke_complete
+
+    def summary(self) -> str:
+        worst = float(self.position_error.max()) * 1000 if len(self.position_error) else 0.0
+        source = "cache" if self.cache_hit else f"solved in {self.solve_seconds:.2f} s"
+        return f"{super().summary()}, max ik error {worst:.3f} mm ({source})"
+
+    def save(self, path):
+        """npz 파일로 저장 (다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 교체)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            joint_positions=self.joint_positions,
+            positions=self.positions,
+            pen_down=self.pen_down,
+            stroke_complete=self.stroke_complete,
+            stroke_count=self.stroke_count,
+            physics_dt=self.physics_dt,
+            position_error=self.position_error,
+            solve_seconds=self.solve_seconds,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, cache_hit=True):
+        with np.load(path) as data:
+            return cls(
+                data["joint_positions"],
+                data["positions"],
+                data["pen_down"],
+                data["stroke_complete"],
+                int(data["stroke_count"]),
+                float(data["physics_dt"]),
+                data["position_error"],
+                float(data["solve_seconds"]),
+                cache_hit,
+            )
+
+
+def cache_key(text, original_position, layout=DEFAULT_LAYOUT, **settings) -> str:
+    """결과에 영향을 주는 모든 값(문자열, 배치, 원점, 궤적/IK 설정, 자모 원본)의 sha256"""
+    h = hashlib.sha256()
+    h.update(source_hash().encode())
+    key = (
+        IK_VERSION,
+        text,
+        as_layout(layout),
+        np.round(np.asarray(original_position, dtype=np.float64), 9).tolist(),
+        sorted(settings.items()),
+        (DAMPING, NULLSPACE_GAIN, MAX_STEP, MAX_ITERATIONS, POSITION_TOLERANCE),
+        (ORIENTATION_TOLERANCE, KEYFRAME_STRIDE, DRAW_ORIENTATION.tolist()),
+    )
+    h.update(repr(key).encode())
+    return h.hexdigest()
+
+
+def compile_joint_trajectory(
+    character_list,
+    original_position,
+    layout=DEFAULT_LAYOUT,
+    size=DEFAULT_SCALE,
+    mode="segment",
+    stroke_order=None,
+    allow_reverse=False,
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    limits=DEFAULT_LIMITS,
+    physics_dt=PHYSICS_DT,
+    initial_joints=REST_POSITIONS,
+    cache_dir=IK_CACHE_DIR,
+) -> JointTrajectory:
+    """문자열을 틱별 관절 궤적으로 컴파일 (디스크 캐시가 있으면 읽기만 한다)
+    Args:
+        character_list: 그릴 한글 문자열 (str 혹은 글자 리스트)
+        original_position (np.array): 원점 위치 [x, y, z]
+        layout, size: 글자 배치와 전체 스케일 (compile_stroke_plan 참고)
+        mode, stroke_order, allow_reverse, blend_radius, blend_tolerance: 획 계획 설정
+            (korean.create_timed_trajectory 참고)
+        limits (MotionLimits): 직교 좌표 속도/가속도 제한
+        physics_dt (float): 틱 간격 (s)
+        initial_joints (np.array): (7,) 시작 관절 각도 (궤적은 이 자세의 TCP에서 출발)
+        cache_dir (str): 캐시 디렉터리, None이면 캐시를 쓰지 않는다
+    Returns:
+        JointTrajectory: 틱별 관절 목표와 TCP 목표
+    """
+    text = character_list if isinstance(character_list, str) else "".join(character_list)
+    initial_joints = np.asarray(initial_joints, dtype=np.float64)[:JOINT_COUNT]
+    path = None
+    if cache_dir is not None:
+        key = cache_key(
+            text,
+            original_position,
+            layout,
+            size=tuple(size),
+            mode=mode,
+            stroke_order=stroke_order,
+            allow_reverse=allow_reverse,
+            blend_radius=blend_radius,
+            blend_tolerance=blend_tolerance,
+            limits=limits,
+            physics_dt=physics_dt,
+            initial_joints=initial_joints.tolist(),
+        )
+        path = os.path.join(cache_dir, key + ".npz")
+        if os.path.exists(path):
+            try:
+                trajectory = JointTrajectory.load(path)
+                CACHE_STATS.hits += 1
+                return trajectory
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[ik_compiler] ignoring unreadable cache entry {path}: {e}")
+
+    plan = compile_stroke_plan(text, layout, size, stroke_order, allow_reverse)
+    timed = timed_trajectory_from_plan(
+        plan,
+        original_position,
+        mode=mode,
+        blend_radius=blend_radius,
+        blend_tolerance=blend_tolerance,
+        limits=limits,
+        physics_dt=physics_dt,
+        initial_position=tcp_position(initial_joints),
+    )
+    started = time.perf_counter()
+    joint_positions, position_error, _ = solve_ik(timed.positions, initial_joints)
+    solve_seconds = time.perf_counter() - started
+    CACHE_STATS.misses += 1
+    CACHE_STATS.solve_seconds += solve_seconds
+
+    trajectory = JointTrajectory(
+        joint_positions,
+        timed.positions,
+        timed.pen_down,
+        timed.stroke_complete,
+        timed.stroke_count,
+        physics_dt,
+        position_error,
+        solve_seconds,
+    )
+    if path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            trajectory.save(path)
+        except OSError as e:
+            print(f"[ik_compiler] could not write cache entry {path}: {e}")
+    return trajectory
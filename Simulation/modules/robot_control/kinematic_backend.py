@@ -0,0 +1,363 @@
+"""Isaac Sim 없이 그리기 루프를 돌리는 NumPy 기구학 시뮬레이션 백엔드
+
+    로봇        FR3 팔 7축 + 손가락 2축. 관절 위치 목표를 1차 지연(JOINT_TIME_CONSTANT)과
+                관절 속도 제한(JOINT_VELOCITY_LIMIT)으로 따라간다.
+    컨트롤러    RMPFlowController 대신 resolved-rate IK: TCP 위치/자세 오차에 이득을 곱한
+                속도를 감쇠 최소제곱으로 관절 속도로 바꿔 한 컨트롤러 주기만큼 적분한 관절 목표를 낸다.
+    월드/Task   step()마다 physics_dt만큼 로봇을 적분하고, 목표 큐브는 위치만 기억한다.
+
+충돌, 종이와의 접촉, 동역학은 없다. 상태 기계, 배치, 로깅을 GPU 없이 빠르게 확인하기 위한 것이며
+수치는 Isaac Sim 결과와 같지 않다. DrawingApp에 KinematicBackend()를 넘기면 같은 CSV/HDF5를 만든다.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from modules.robot_control.fr3_kinematics import (
+    JOINT_COUNT,
+    JOINT_LOWER,
+    JOINT_UPPER,
+    JOINT_VELOCITY_LIMIT,
+    REST_POSITIONS,
+    jacobian,
+    link_frames,
+)
+from modules.robot_control.ik_compiler import DAMPING, DRAW_ORIENTATION, orientation_error
+from modules.robot_control.sim_backend import SimulationBackend
+from modules.robot_control.sim_rates import DEFAULT_RATES, PHYSICS_DT
+from modules.visualization.trajectory_drawer import TrajectoryDrawer
+
+# 손가락 관절 기본값 (열림)
+FINGER_POSITIONS = np.array([0.04, 0.04])
+DEFAULT_JOINT_POSITIONS = np.concatenate([REST_POSITIONS, FINGER_POSITIONS])
+
+# 관절 위치 목표를 따라가는 1차 지연 시간 상수 (s)
+JOINT_TIME_CONSTANT = 0.03
+# resolved-rate 이득 (1/s)과 최대 TCP 속도
+POSITION_GAIN = 10.0
+ORIENTATION_GAIN = 10.0
+MAX_LINEAR_SPEED = 0.5  # m/s
+MAX_ANGULAR_SPEED = 2.0  # rad/s
+
+# FR3Follow 목표 큐브 자세 [w, x, y, z] (x축 180도 회전)
+TARGET_ORIENTATION = np.array([0.0, 1.0, 0.0, 0.0])
+
+
+def quaternion_to_matrix(quaternion) -> np.ndarray:
+    """쿼터니언 [w, x, y, z] -> 3x3 회전 행렬"""
+    w, x, y, z = np.asarray(quaternion, dtype=np.float64) / np.linalg.norm(quaternion)
+    return np.array(
+        [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+            [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+            [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+        ]
+    )
+
+
+class JointsState(NamedTuple):
+    positions: np.ndarray
+    velocities: np.ndarray
+
+
+class JointAction:
+    """ArticulationAction처럼 관절 위치 목표와 적용할 관절 번호를 담는 액션"""
+
+    def __init__(self, joint_positions=None, joint_velocities=None, joint_indices=None):
+        self.joint_positions = joint_positions
+        self.joint_velocities = joint_velocities
+        self.joint_indices = joint_indices
+
+
+class KinematicApp:
+    """SimulationApp 대신 루프 종료만 관리 (max_steps 물리 스텝 뒤에는 is_running()이 False)"""
+
+    def __init__(self, max_steps=None):
+        self.max_steps = max_steps
+        self.steps = 0
+        self._closed = False
+
+    def is_running(self) -> bool:
+        return not self._closed and (self.max_steps is None or self.steps < self.max_steps)
+
+    def close(self):
+        self._closed = True
+
+
+class KinematicFR3:
+    """관절 위치 목표를 1차 지연으로 따라가는 FR3 (팔 7축 + 손가락 2축)
+
+    Args:
+        name (str): scene 안의 이름
+        default_positions (np.array): (9,) reset 때 돌아갈 관절 각도
+        time_constant (float): 1차 지연 시간 상수 (s)
+    """
+
+    def __init__(
+        self, name="my_fr3", default_positions=DEFAULT_JOINT_POSITIONS, time_constant=JOINT_TIME_CONSTANT
+    ):
+        self.name = name
+        self.time_constant = time_constant
+        self._default = np.array(default_positions, dtype=np.float64)
+        self._positions = self._default.copy()
+        self._velocities = np.zeros_like(self._default)
+        self._targets = self._default.copy()
+        self._velocity_limit = np.concatenate(
+            [JOINT_VELOCITY_LIMIT, np.full(len(self._default) - JOINT_COUNT, np.inf)]
+        )
+        self._lower = np.concatenate([JOINT_LOWER, np.zeros(len(self._default) - JOINT_COUNT)])
+        self._upper = np.concatenate([JOINT_UPPER, np.full(len(self._default) - JOINT_COUNT, 0.04)])
+
+    @property
+    def num_dof(self) -> int:
+        return len(self._positions)
+
+    def set_joints_default_state(self, positions=None, velocities=None):
+        if positions is not None:
+            self._default = np.array(positions, dtype=np.float64)
+
+    def post_reset(self):
+        np.copyto(self._positions, self._default)
+        np.copyto(self._targets, self._default)
+        self._velocities[:] = 0.0
+
+    def get_joint_positions(self) -> np.ndarray:
+        return self._positions.copy()
+
+    def get_joint_velocities(self) -> np.ndarray:
+        return self._velocities.copy()
+
+    def get_joints_state(self) -> JointsState:
+        return JointsState(self.get_joint_positions(), self.get_joint_velocities())
+
+    def get_articulation_controller(self):
+        return self
+
+    def apply_action(self, action):
+        """action.joint_positions를 관절 위치 목표로 (joint_indices가 없으면 앞에서부터)"""
+        if action.joint_positions is None:
+            return
+        positions = np.asarray(action.joint_positions, dtype=np.float64)
+        indices = action.joint_indices
+        if indices is None:
+            indices = np.arange(len(positions))
+        self._targets[indices] = positions
+
+    def advance(self, dt, substeps=1):
+        """dt 동안 관절 위치 목표 쪽으로 1차 지연 + 속도 제한으로 이동"""
+        h = dt / substeps
+        blend = 1.0 - math.exp(-h / self.time_constant)
+        start = self._positions.copy()
+        for _ in range(substeps):
+            step = (self._targets - self._positions) * blend
+            np.clip(step, -self._velocity_limit * h, self._velocity_limit * h, out=step)
+            self._positions += step
+            np.clip(self._positions, self._lower, self._upper, out=self._positions)
+        np.subtract(self._positions, start, out=self._velocities)
+        self._velocities /= dt
+
+
+class KinematicScene:
+    def __init__(self):
+        self._objects = {}
+
+    def add(self, obj):
+        self._objects[obj.name] = obj
+        return obj
+
+    def get_object(self, name):
+        return self._objects.get(name)
+
+    def object_exists(self, name) -> bool:
+        return name in self._objects
+
+
+class KinematicFollowTask:
+    """FR3Follow와 같은 인터페이스의 Task (로봇 하나와 위치만 기억하는 목표 큐브)"""
+
+    def __init__(
+        self, name="fr3_task", target_position=None, target_orientation=None, robot_name="my_fr3"
+    ):
+        self.name = name
+        self._target_name = "target"
+        if target_position is None:
+            target_position = np.zeros(3)
+        if target_orientation is None:
+            target_orientation = TARGET_ORIENTATION
+        self._target_position = np.array(target_position, dtype=np.float64)
+        self._target_orientation = np.array(target_orientation, dtype=np.float64)
+        self._robot_name = robot_name
+        self._robot = None
+
+    def set_up_scene(self, scene):
+        self._robot = scene.add(KinematicFR3(self._robot_name))
+
+    def post_reset(self):
+        self._robot.post_reset()
+
+    def set_cube_pose(self, position, orientation=None):
+        np.copyto(self._target_position, position)
+        if orientation is not None:
+            np.copyto(self._target_orientation, orientation)
+
+    def get_params(self) -> dict:
+        return {
+            "robot_name": {"value": self._robot_name, "modifiable": False},
+            "target_name": {"value": self._target_name, "modifiable": True},
+        }
+
+    def get_observations(self) -> dict:
+        return {
+            self._robot_name: {"joint_positions": self._robot.get_joint_positions()},
+            self._target_name: {
+                "position": self._target_position.copy(),
+                "orientation": self._target_orientation.copy(),
+            },
+        }
+
+    def robots(self):
+        return [self._robot]
+
+
+class KinematicWorld:
+    """World처럼 Task를 올리고 step()마다 physics_dt만큼 로봇을 적분하는 월드
+
+    Args:
+        physics_dt (float): 물리 스텝 간격 (s)
+        app (KinematicApp): 물리 스텝 수를 셀 앱 (max_steps)
+    """
+
+    def __init__(self, physics_dt=PHYSICS_DT, app=None):
+        self.scene = KinematicScene()
+        self.physics_dt = physics_dt
+        self.substeps = 1
+        self.current_time = 0.0
+        self._app = app
+        self._tasks = {}
+        self._playing = False
+        self._set_up = set()
+
+    def get_physics_context(self):
+        return self
+
+    def set_physics_dt(self, dt=PHYSICS_DT, substeps=1):
+        self.physics_dt = dt
+        self.substeps = substeps
+
+    def add_task(self, task):
+        self._tasks[task.name] = task
+
+    def get_task(self, name):
+        return self._tasks[name]
+
+    def reset(self):
+        for name, task in self._tasks.items():
+            if name not in self._set_up:
+                task.set_up_scene(self.scene)
+                self._set_up.add(name)
+            task.post_reset()
+        self.current_time = 0.0
+        self._playing = True
+
+    def step(self, render=True):
+        if not self._playing:
+            return
+        for task in self._tasks.values():
+            for robot in task.robots():
+                robot.advance(self.physics_dt, self.substeps)
+        self.current_time += self.physics_dt
+        if self._app is not None:
+            self._app.steps += 1
+
+    def is_playing(self) -> bool:
+        return self._playing
+
+    def is_stopped(self) -> bool:
+        return not self._playing
+
+    def get_observations(self) -> dict:
+        observations = {}
+        for task in self._tasks.values():
+            observations.update(task.get_observations())
+        return observations
+
+
+class ResolvedRateController:
+    """RMPFlowController 대신 쓰는 resolved-rate IK 추종기
+
+    TCP 오차에 이득을 곱하고 최대 속도로 자른 TCP 속도를 감쇠 최소제곱으로 관절 속도로 바꾸고,
+    관절 속도 제한으로 줄인 뒤 physics_dt(컨트롤러 주기)만큼 적분한 관절 위치 목표를 낸다.
+
+    Args:
+        name (str): 컨트롤러 이름
+        robot_articulation (KinematicFR3): 제어할 로봇
+        physics_dt (float): forward() 호출 간격 (s)
+    """
+
+    def __init__(self, name, robot_articulation, physics_dt=PHYSICS_DT):
+        self.name = name
+        self._robot = robot_articulation
+        self.physics_dt = physics_dt
+        self._indices = np.arange(JOINT_COUNT)
+
+    def reset(self):
+        pass
+
+    def forward(
+        self, target_end_effector_position, target_end_effector_orientation=None
+    ) -> JointAction:
+        q = self._robot.get_joint_positions()[:JOINT_COUNT]
+        frames = link_frames(q)
+        tcp = frames[JOINT_COUNT]
+        if target_end_effector_orientation is None:
+            rotation = DRAW_ORIENTATION
+        else:
+            rotation = quaternion_to_matrix(target_end_effector_orientation)
+
+        target = np.asarray(target_end_effector_position, dtype=np.float64)
+        linear = POSITION_GAIN * (target - tcp[:3, 3])
+        angular = ORIENTATION_GAIN * orientation_error(tcp[:3, :3], rotation)
+        linear *= min(1.0, MAX_LINEAR_SPEED / max(np.linalg.norm(linear), 1e-12))
+        angular *= min(1.0, MAX_ANGULAR_SPEED / max(np.linalg.norm(angular), 1e-12))
+
+        J = jacobian(q, frames)
+        damped = J @ J.T + (DAMPING * DAMPING) * np.eye(6)
+        velocities = J.T @ np.linalg.solve(damped, np.concatenate([linear, angular]))
+        ratio = JOINT_VELOCITY_LIMIT / np.maximum(np.abs(velocities), 1e-12)
+        velocities *= min(1.0, float(ratio.min()))
+        positions = np.clip(q + velocities * self.physics_dt, JOINT_LOWER, JOINT_UPPER)
+        return JointAction(
+            joint_positions=positions, joint_velocities=velocities, joint_indices=self._indices
+        )
+
+
+class KinematicBackend(SimulationBackend):
+    """NumPy 기구학 백엔드
+
+    Args:
+        max_steps (int): 이 물리 스텝 수를 넘기면 app.is_running()이 False (None이면 제한 없음)
+    """
+
+    name = "kinematic"
+
+    def __init__(self, max_steps=None):
+        self.app = KinematicApp(max_steps)
+
+    def create_world(self, rates=DEFAULT_RATES):
+        world = KinematicWorld(rates.physics_dt, self.app)
+        world.set_physics_dt(rates.physics_dt, rates.physics_substeps)
+        return world
+
+    def create_task(self, name, target_position):
+        return KinematicFollowTask(name=name, target_position=target_position)
+
+    def create_controller(self, name, robot_articulation, physics_dt):
+        return ResolvedRateController(name, robot_articulation, physics_dt)
+
+    def create_drawer(self):
+        # initialize()를 부르지 않으면 Debug Draw 없이 point_list만 관리한다
+        return TrajectoryDrawer()
+
+    def joint_action(self, joint_positions, joint_indices):
+        return JointAction(joint_positions=joint_positions, joint_indices=joint_indices)
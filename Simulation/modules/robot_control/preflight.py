@@ -0,0 +1,286 @@
+"""시뮬레이션/실제 팔을 돌리기 전에 배치가 FR3 작업 영역 안에서 그릴 만한지 보는 사전 점검
+
+컴파일된 획 계획의 모든 경유점(획 시작점, 끝점, 다가가기 지점)을 로봇 좌표로 옮겨
+펜 자세(DRAW_ORIENTATION)로 한 번에 IK를 풀고, 그 해에서
+
+    - 도달 가능 여부: IK가 남긴 위치 오차가 REACH_TOLERANCE 이하인지
+    - Yoshikawa 조작성 지수 w = sqrt(det(J J^T)): 0에 가까울수록 특이점에 가깝다
+
+를 계산한다. 글자 칸마다 가장 나쁜 값을 모아 특이점 근처 칸을 표시하고,
+search_placement는 여러 original_position / 배치 이동량 후보 중 가장 나쁜 경유점의
+조작성이 가장 큰 배치를 찾는다.
+
+    python -m modules.robot_control.preflight 융합프로젝트공모전 --search
+"""
+import argparse
+import itertools
+import dataclasses
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from puzzle import DEFAULT_LAYOUT, DEFAULT_SCALE
+from modules.robot_control.fr3_kinematics import REST_POSITIONS, manipulability
+from modules.robot_control.ik_compiler import DRAW_ORIENTATION, solve_ik_batch
+from modules.robot_control.trajectory_follower import plan_segments, to_robot_frame
+from modules.stroke.corner_blending import BLEND_TOLERANCE
+from modules.stroke.layout import LayoutError, as_layout
+from modules.stroke.stroke_plan import compile_stroke_plan
+
+# IK가 이보다 멀리 남으면 도달할 수 없는 경유점 (m)
+REACH_TOLERANCE = 1e-4
+# 이보다 조작성이 작으면 특이점 근처로 표시 (기본 자세 약 0.09, 기본 배치 최소 약 0.03)
+MANIPULABILITY_THRESHOLD = 0.02
+# 다가가기 지점의 펜 높이 (TrajectoryFollower 기본값과 같음)
+APPROACH_HEIGHT = 0.05
+
+# search_placement 기본 후보: original_position x, z 이동량 (m)과 배치 이동량 (글자 좌표 y, z)
+POSITION_OFFSETS = tuple(
+    (dx, 0.0, dz) for dx in (-0.1, -0.05, 0.0, 0.05, 0.1) for dz in (-0.1, -0.05, 0.0, 0.05)
+)
+LAYOUT_OFFSETS = ((0.0, 0.0), (-0.09, 0.0), (0.09, 0.0))
+
+
+def plan_waypoints(
+    plan,
+    original_position,
+    approach_height=APPROACH_HEIGHT,
+    mode="segment",
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+):
+    """획 계획을 follower가 지나갈 경유점으로 펼치는 함수
+    Args:
+        plan (StrokePlan): 컴파일된 획 계획
+        original_position (np.array): 원점 위치 [x, y, z]
+        approach_height (float): 획 시작점 위 다가가기 지점의 높이 (m)
+        mode, blend_radius, blend_tolerance: follower와 같은 선분으로 펼치기 (plan_segments 참고)
+    Returns:
+        tuple:
+            - points: (S + 2N, 3) 획마다 다가가기 지점, 선분마다 시작점과 끝점 로봇 좌표
+            - syllable_index: (S + 2N,) 경유점마다 몇 번째 글자의 획인지
+    """
+    segments, stroke_offsets = plan_segments(plan, mode, blend_radius, blend_tolerance)
+    stroke_syllable = plan.polyline_syllable if mode == "polyline" else plan.syllable_index
+    segment_syllable = np.repeat(stroke_syllable, np.diff(stroke_offsets))
+    starts = to_robot_frame(segments[:, 0], original_position)
+    ends = to_robot_frame(segments[:, 1], original_position)
+    approaches = starts[stroke_offsets[:-1]].copy()
+    approaches[:, 2] += approach_height
+    points = np.concatenate([approaches, starts, ends])
+    syllable_index = np.concatenate([stroke_syllable, segment_syllable, segment_syllable])
+    return points, syllable_index
+
+
+class PreflightReport:
+    """경유점별 IK 해, 도달 여부, 조작성과 글자 칸별 요약
+
+    Args:
+        syllables (str): 점검한 글자 칸의 글자 (StrokePlan.syllables, 줄바꿈 제외)
+        original_position (np.array): 원점 위치
+        points (np.array): (M, 3) 경유점 로봇 좌표
+        syllable_index (np.array): (M,) 경유점마다 글자 번호
+        joint_positions (np.array): (M, 7) 경유점별 IK 해
+        position_error (np.array): (M,) IK가 남긴 위치 오차 (m)
+        threshold (float): 특이점 근처로 볼 조작성
+    """
+
+    def __init__(
+        self,
+        syllables,
+        original_position,
+        points,
+        syllable_index,
+        joint_positions,
+        position_error,
+        threshold=MANIPULABILITY_THRESHOLD,
+    ):
+        self.syllables = syllables
+        self.original_position = np.asarray(original_position, dtype=np.float64)
+        self.points = points
+        self.syllable_index = syllable_index
+        self.joint_positions = joint_positions
+        self.position_error = position_error
+        self.threshold = threshold
+        self.reachable = position_error <= REACH_TOLERANCE
+        self.manipulability = manipulability(joint_positions)
+
+        # 글자 칸마다 가장 나쁜 경유점 (도달할 수 없는 점은 조작성 0으로 본다)
+        score = np.where(self.reachable, self.manipulability, 0.0)
+        self.cell_manipulability = np.full(len(syllables), np.inf)
+        np.minimum.at(self.cell_manipulability, syllable_index, score)
+        self.cell_reachable = np.ones(len(syllables), dtype=bool)
+        np.logical_and.at(self.cell_reachable, syllable_index, self.reachable)
+
+    @property
+    def worst(self) -> float:
+        """가장 나쁜 경유점의 조작성 (도달할 수 없는 점이 있으면 0)"""
+        if not len(self.points):
+            return np.inf
+        return float(np.where(self.reachable, self.manipulability, 0.0).min())
+
+    @property
+    def flagged_cells(self) -> np.ndarray:
+        """도달할 수 없거나 특이점 근처인 경유점이 있는 글자 번호"""
+        return np.flatnonzero(self.cell_manipulability < self.threshold)
+
+    @property
+    def ok(self) -> bool:
+        return not len(self.flagged_cells)
+
+    def summary(self) -> str:
+        unreachable = int((~self.reachable).sum())
+        line = (
+            f"{len(self.points)} waypoints at {np.round(self.original_position, 3).tolist()}, "
+            f"worst manipulability {self.worst:.4f} (threshold {self.threshold}), "
+            f"{unreachable} unreachable"
+        )
+        cells = [
+            f"{i}:{self.syllables[i]} "
+            + (f"{self.cell_manipulability[i]:.4f}" if self.cell_reachable[i] else "unreachable")
+            for i in self.flagged_cells
+        ]
+        if cells:
+            line += ", flagged cells " + ", ".join(cells)
+        return line
+
+
+def _solve(points):
+    joint_positions, position_error, _ = solve_ik_batch(points, REST_POSITIONS, DRAW_ORIENTATION)
+    return joint_positions, position_error
+
+
+def preflight(
+    character_list,
+    original_position,
+    layout=DEFAULT_LAYOUT,
+    size=DEFAULT_SCALE,
+    stroke_order=None,
+    allow_reverse=False,
+    mode="segment",
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    threshold=MANIPULABILITY_THRESHOLD,
+) -> PreflightReport:
+    """문자열 하나를 follower가 그릴 계획 그대로 점검하는 함수
+    Args:
+        character_list: 그릴 한글 문자열 (str 혹은 글자 리스트)
+        original_position (np.array): 원점 위치 [x, y, z]
+        layout, size, stroke_order, allow_reverse: compile_stroke_plan 참고
+        mode, blend_radius, blend_tolerance: follower와 같은 선분 모드와 꼭짓점 블렌딩
+        threshold (float): 특이점 근처로 볼 조작성
+    Returns:
+        PreflightReport: 경유점별 결과와 글자 칸별 요약
+    """
+    plan = compile_stroke_plan(character_list, layout, size, stroke_order, allow_reverse)
+    points, syllable_index = plan_waypoints(
+        plan, original_position, mode=mode, blend_radius=blend_radius, blend_tolerance=blend_tolerance
+    )
+    joint_positions, position_error = _solve(points)
+    return PreflightReport(
+        plan.syllables, original_position, points, syllable_index, joint_positions, position_error, threshold
+    )
+
+
+def shift_layout(layout, offset):
+    """배치 전체를 글자 좌표 (y, z)로 offset만큼 옮긴 Layout (bounds는 그대로)"""
+    layout = as_layout(layout)
+    dy, dz = offset
+    return dataclasses.replace(
+        layout,
+        origin=(layout.origin[0] + dy, layout.origin[1] + dz),
+        cells=tuple((y + dy, z + dz) for y, z in layout.cells),
+    )
+
+
+class Placement(NamedTuple):
+    original_position: Tuple[float, float, float]
+    layout_offset: Tuple[float, float]
+    worst: float  # 가장 나쁜 경유점의 조작성 (도달할 수 없으면 0)
+    flagged: int  # 특이점 근처 글자 수
+
+
+def search_placement(
+    character_list,
+    original_position,
+    layout=DEFAULT_LAYOUT,
+    size=DEFAULT_SCALE,
+    position_offsets=POSITION_OFFSETS,
+    layout_offsets=LAYOUT_OFFSETS,
+    threshold=MANIPULABILITY_THRESHOLD,
+):
+    """original_position / 배치 이동량 후보 전체를 한 번의 배치 IK로 점검해 순위를 매기는 함수
+
+    배치가 bounds를 벗어나는(LayoutError) 후보는 건너뛴다.
+
+    Args:
+        character_list: 그릴 한글 문자열
+        original_position (np.array): 기준 원점 위치 [x, y, z]
+        layout, size: 기준 배치와 스케일
+        position_offsets: 원점에 더해 볼 (dx, dy, dz) 후보
+        layout_offsets: 배치에 더해 볼 글자 좌표 (dy, dz) 후보
+        threshold (float): 특이점 근처로 볼 조작성
+    Returns:
+        list: 가장 나쁜 경유점의 조작성이 큰 순서로 정렬한 Placement
+    """
+    base = np.asarray(original_position, dtype=np.float64)
+    candidates, chunks = [], []
+    for offset in layout_offsets:
+        try:
+            plan = compile_stroke_plan(character_list, shift_layout(layout, offset), size)
+        except LayoutError:
+            continue
+        for delta in position_offsets:
+            position = base + np.asarray(delta, dtype=np.float64)
+            points, syllable_index = plan_waypoints(plan, position)
+            candidates.append((plan.syllables, position, tuple(offset), syllable_index))
+            chunks.append(points)
+    if not candidates:
+        return []
+
+    # 모든 후보의 경유점을 한 번에 푼다
+    points = np.concatenate(chunks)
+    joint_positions, position_error = _solve(points)
+    bounds = np.cumsum([0] + [len(c) for c in chunks])
+
+    placements = []
+    for (syllables, position, offset, syllable_index), first, last in zip(candidates, bounds, bounds[1:]):
+        report = PreflightReport(
+            syllables,
+            position,
+            points[first:last],
+            syllable_index,
+            joint_positions[first:last],
+            position_error[first:last],
+            threshold,
+        )
+        placements.append(
+            Placement(tuple(position.round(6).tolist()), offset, report.worst, len(report.flagged_cells))
+        )
+    placements.sort(key=lambda p: (-p.worst, p.flagged))
+    return placements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FR3 reachability / manipulability pre-flight check")
+    parser.add_argument("text", help="그릴 한글 문자열")
+    parser.add_argument("--origin", type=float, nargs=3, default=[0.5, 0.0, 0.2], help="original_position")
+    parser.add_argument("--threshold", type=float, default=MANIPULABILITY_THRESHOLD)
+    parser.add_argument("--search", action="store_true", help="원점/배치 후보 중 가장 좋은 배치 찾기")
+    parser.add_argument("--top", type=int, default=5, help="--search 결과 출력 수")
+    args = parser.parse_args(argv)
+
+    report = preflight(args.text, args.origin, threshold=args.threshold)
+    print(f"[preflight] {report.summary()}")
+    if args.search:
+        placements = search_placement(args.text, args.origin, threshold=args.threshold)
+        for p in itertools.islice(placements, args.top):
+            print(
+                f"[preflight] original_position {list(p.original_position)}, layout offset "
+                f"{list(p.layout_offset)}: worst manipulability {p.worst:.4f}, {p.flagged} flagged cells"
+            )
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
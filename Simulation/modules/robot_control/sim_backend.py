@@ -0,0 +1,124 @@
+"""DrawingApp이 쓰는 시뮬레이터 객체(World, FR3Follow, RMPFlowController 등)를 만드는 백엔드
+
+    IsaacBackend       Isaac Sim (SimulationApp, PhysX, RMPflow, Debug Draw)
+    KinematicBackend   NumPy 기구학 시뮬레이션 (modules.robot_control.kinematic_backend)
+
+두 백엔드가 돌려주는 객체는 DrawingApp이 쓰는 만큼 같은 메서드를 가진다.
+    world: step(render), reset(), is_playing(), is_stopped(), add_task(), get_task(),
+           get_observations(), scene.get_object()
+    task: get_params(), set_cube_pose(position)
+    robot: set_joints_default_state(), get_joint_positions(), get_joints_state(),
+           get_articulation_controller().apply_action(action)
+    controller: forward(target_end_effector_position, target_end_effector_orientation), reset()
+엔드 이펙터 위치는 두 백엔드 모두 관절 값으로 fr3_kinematics.tcp_position을 계산한다.
+"""
+from abc import ABC, abstractmethod
+
+from modules.robot_control.sim_rates import DEFAULT_RATES
+
+BACKENDS = ("isaac", "kinematic")
+
+
+class SimulationBackend(ABC):
+    """시뮬레이터 객체를 만드는 인터페이스 (추상 메서드를 모두 구현해야 만들 수 있다)
+
+    Attributes:
+        app: is_running(), close()를 가진 앱 객체 (Isaac은 SimulationApp)
+    """
+
+    name = ""
+    app = None
+
+    @abstractmethod
+    def create_world(self, rates=DEFAULT_RATES):
+        """rates(SimulationRates)의 physics_dt와 substeps로 월드 생성 (루프 한 번 = 물리 스텝 한 번)"""
+
+    @abstractmethod
+    def create_task(self, name, target_position):
+        """FR3와 목표 큐브를 올리는 FR3Follow (혹은 같은 인터페이스의) Task 생성"""
+
+    @abstractmethod
+    def create_controller(self, name, robot_articulation, physics_dt):
+        """목표 TCP 자세를 관절 액션으로 바꾸는 컨트롤러 생성 (physics_dt는 forward() 호출 간격)"""
+
+    @abstractmethod
+    def create_drawer(self):
+        """엔드 이펙터 경로를 모으는 (그릴 수 있으면 그리는) TrajectoryDrawer 생성"""
+
+    @abstractmethod
+    def joint_action(self, joint_positions, joint_indices):
+        """관절 위치 목표 액션 (ArticulationAction) 생성"""
+
+    def set_camera_view(self, eye, target, camera_prim_path):
+        """뷰포트 카메라 설정 (렌더링하지 않는 백엔드는 무시)"""
+
+
+class IsaacBackend(SimulationBackend):
+    """Isaac Sim 백엔드 (SimulationApp을 먼저 만들어야 isaacsim 모듈을 import할 수 있다)
+
+    Args:
+        headless (bool): 창 없이 실행
+    """
+
+    name = "isaac"
+
+    def __init__(self, headless=False):
+        from isaacsim import SimulationApp
+
+        self.app = SimulationApp({"headless": headless})
+
+    def create_world(self, rates=DEFAULT_RATES):
+        from isaacsim.core.api import World
+
+        # 렌더링 간격도 physics_dt로 두고 렌더링 여부는 루프에서 고른다
+        world = World(
+            stage_units_in_meters=1.0, physics_dt=rates.physics_dt, rendering_dt=rates.physics_dt
+        )
+        world.get_physics_context().set_physics_dt(rates.physics_dt, rates.physics_substeps)
+        return world
+
+    def create_task(self, name, target_position):
+        from modules.robot_control.fr3_follow import FR3Follow
+
+        return FR3Follow(name=name, target_position=target_position)
+
+    def create_controller(self, name, robot_articulation, physics_dt):
+        from controllers.rmpflow_controller import RMPFlowController
+
+        return RMPFlowController(
+            name=name, robot_articulation=robot_articulation, physics_dt=physics_dt
+        )
+
+    def create_drawer(self):
+        from modules.visualization.trajectory_drawer import TrajectoryDrawer
+
+        drawer = TrajectoryDrawer()
+        drawer.initialize()
+        return drawer
+
+    def joint_action(self, joint_positions, joint_indices):
+        from isaacsim.core.utils.types import ArticulationAction
+
+        return ArticulationAction(joint_positions=joint_positions, joint_indices=joint_indices)
+
+    def set_camera_view(self, eye, target, camera_prim_path):
+        from isaacsim.core.utils.viewports import set_camera_view
+
+        set_camera_view(eye=eye, target=target, camera_prim_path=camera_prim_path)
+
+
+def get_backend(name="isaac", **kwargs) -> SimulationBackend:
+    """이름으로 백엔드 생성
+    Args:
+        name (str): "isaac" 혹은 "kinematic"
+        **kwargs: 백엔드 생성 인자 (IsaacBackend: headless, KinematicBackend: max_steps 등)
+    Returns:
+        SimulationBackend
+    """
+    if name == "isaac":
+        return IsaacBackend(**kwargs)
+    if name == "kinematic":
+        from modules.robot_control.kinematic_backend import KinematicBackend
+
+        return KinematicBackend(**kwargs)
+    raise ValueError(f"unknown backend {name!r}, expected one of {BACKENDS}")
@@ -0,0 +1,146 @@
+"""물리, 컨트롤러, 궤적 목표, 렌더링 주기를 따로 정하는 시뮬레이션 루프 설정
+
+루프 한 번이 물리 스텝 한 번(physics_dt)이고, 나머지 주기는 물리 스텝의 배수로 정한다.
+
+    물리        physics_dt마다 (PhysX는 그 안에서 physics_substeps번 나눠 적분)
+    컨트롤러    control_decimation 물리 스텝마다 RMPFlow/관절 목표 갱신
+    궤적 목표   target_decimation 컨트롤러 갱신마다 follower.step() 한 번,
+                그 사이에는 이전 목표 -> 새 목표를 선형 보간해 컨트롤러에 넘긴다
+    렌더링      render_decimation 물리 스텝마다 한 번 (0이면 하지 않음)
+
+기본값(모두 1, physics_dt = 1/60)은 예전 루프(step(render=True) 한 번에 목표와 액션 한 번)와 같다.
+헤드리스로 데이터를 만들 때는 렌더링을 끄거나(render_decimation=0) 목표 주기를 늘려
+(HEADLESS_RATES) 실제 시간보다 빠르게 돌릴 수 있다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# 기본 물리 스텝 간격 (s)
+PHYSICS_DT = 1.0 / 60.0
+# 펜을 들고 이동할 때의 대략적인 엔드 이펙터 속도 (m/s), 펜 업 이동 시간 추정용
+PEN_UP_SPEED = 0.25
+# 펜이 종이에 닿았다고 보는 엔드 이펙터 높이 (m), main.py / new_main.py의 paper_drawer 기준
+PEN_DOWN_HEIGHT = 0.205
+
+
+@dataclass(frozen=True)
+class SimulationRates:
+    """시뮬레이션 루프 주기 설정
+
+    Args:
+        physics_dt: 물리 스텝 간격 (s)
+        physics_substeps: 물리 스텝 하나를 PhysX가 나눠 적분하는 횟수
+        control_decimation: 컨트롤러를 갱신하는 물리 스텝 간격
+        target_decimation: 새 궤적 목표를 받는 컨트롤러 갱신 간격
+        render_decimation: 렌더링하는 물리 스텝 간격 (0이면 렌더링하지 않음)
+    """
+
+    physics_dt: float = PHYSICS_DT
+    physics_substeps: int = 1
+    control_decimation: int = 1
+    target_decimation: int = 1
+    render_decimation: int = 1
+
+    def __post_init__(self):
+        if not self.physics_dt > 0:
+            raise ValueError(f"physics_dt must be positive, got {self.physics_dt}")
+        for name in ("physics_substeps", "control_decimation", "target_decimation"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be >= 1, got {getattr(self, name)}")
+        if self.render_decimation < 0:
+            raise ValueError(f"render_decimation must be >= 0, got {self.render_decimation}")
+
+    @property
+    def control_dt(self) -> float:
+        """컨트롤러 갱신 간격 (s), RMPFlowController의 physics_dt로 넘긴다"""
+        return self.physics_dt * self.control_decimation
+
+    @property
+    def target_dt(self) -> float:
+        """궤적 목표 간격 (s), TimedTrajectory를 이 간격으로 샘플링해야 재생 속도가 맞다"""
+        return self.control_dt * self.target_decimation
+
+
+DEFAULT_RATES = SimulationRates()
+# 헤드리스 데이터 생성용: 렌더링 없이 궤적 목표를 30 Hz로 받아 컨트롤러 주기(60 Hz)에서 보간
+HEADLESS_RATES = SimulationRates(target_decimation=2, render_decimation=0)
+
+
+class SimulationClock:
+    """물리 스텝 번호로 이번 스텝에 렌더링/컨트롤러 갱신/새 목표가 필요한지 알려 주는 카운터
+
+    루프에서 world.step() 전에 render_due를 보고, 스텝 처리가 끝나면 advance()를 부른다.
+    """
+
+    def __init__(self, rates=DEFAULT_RATES):
+        self.rates = rates
+        self.reset()
+
+    def reset(self):
+        self.step_index = 0
+
+    def advance(self):
+        self.step_index += 1
+
+    @property
+    def render_due(self) -> bool:
+        every = self.rates.render_decimation
+        return every > 0 and self.step_index % every == 0
+
+    @property
+    def control_due(self) -> bool:
+        return self.step_index % self.rates.control_decimation == 0
+
+    @property
+    def target_due(self) -> bool:
+        control_index = self.step_index // self.rates.control_decimation
+        return self.control_due and control_index % self.rates.target_decimation == 0
+
+    @property
+    def target_phase(self) -> float:
+        """이번 컨트롤러 갱신이 이전 목표 -> 새 목표 구간에서 어디쯤인지 (0 < phase <= 1)"""
+        control_index = self.step_index // self.rates.control_decimation
+        decimation = self.rates.target_decimation
+        return (control_index % decimation + 1) / decimation
+
+
+class TargetInterpolator:
+    """궤적 목표 사이를 컨트롤러 주기로 선형 보간하는 버퍼
+
+    새 목표가 들어오면 직전에 내보낸 값에서 새 목표까지 target_decimation번에 나눠 가므로
+    목표가 바뀔 때 컨트롤러 입력이 튀지 않는다. sample()은 고정 버퍼를 돌려준다.
+
+    Args:
+        size (int): 목표 벡터 길이 (TCP 위치 3, 관절 목표 7)
+    """
+
+    def __init__(self, size=3):
+        self._previous = np.empty(size)
+        self._next = np.empty(size)
+        self._output = np.empty(size)
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self._started = False
+
+    def push(self, target):
+        """새 목표 (None이면 follower가 끝났으므로 더 이상 액션을 내보내지 않는다)"""
+        if target is None:
+            self.active = False
+            return
+        np.copyto(self._previous, self._output if self._started else target)
+        np.copyto(self._next, target)
+        self.active = True
+        self._started = True
+
+    def sample(self, phase=1.0) -> np.ndarray:
+        """phase (0 ~ 1) 위치의 보간한 목표 (다음 sample()에서 덮어쓰는 버퍼)"""
+        if phase >= 1.0:
+            np.copyto(self._output, self._next)
+        else:
+            np.subtract(self._next, self._previous, out=self._output)
+            self._output *= phase
+            self._output += self._previous
+        return self._output
@@ -0,0 +1,402 @@
+"""획 계획 전체를 미리 시간 매개변수화한 직교 좌표 궤적
+
+반응형 상태 기계(TrajectoryFollower)는 엔드 이펙터가 거리 기준(0.05 / 0.01 / 0.02 m)에
+들어올 때까지 기다리므로 그리는 시간이 팔이 수렴하는 속도에 따라 달라진다.
+여기서는 모든 이동(다가가기 -> 펜 내리기 -> 그리기 -> 펜 들기 -> 다음 획)을
+축별 속도/가속도 제한을 지키는 사다리꼴 혹은 S-curve 속도 프로파일로 미리 만들고,
+물리 주기마다 샘플링해 틱 번호로 조회한다. 한 획 안에서 이어지는 그리기 이동은
+꼭짓점에서 멈추지 않고 꺾이는 각도가 허용하는 속도로 지나간다.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from modules.robot_control.sim_rates import PHYSICS_DT
+from modules.robot_control.trajectory_follower import APPROACH, DRAW, plan_segments, to_robot_frame
+from modules.stroke.corner_blending import BLEND_TOLERANCE
+
+TRAPEZOID = "trapezoid"
+S_CURVE = "s_curve"
+PROFILES = (TRAPEZOID, S_CURVE)
+
+# 가속 구간 모양별 (최대 가속도 / 평균 가속도) 비율
+# 사다리꼴: 가속도 일정, S-curve: 속도가 3t^2 - 2t^3 모양 (가속도 연속, 최대값 1.5배)
+_PEAK_RATIO = {TRAPEZOID: 1.0, S_CURVE: 1.5}
+
+# 기본 축별 제한 (FR3 직교 좌표 한계 1.7 m/s, 13 m/s^2보다 충분히 낮게)
+MAX_VELOCITY = 0.5
+MAX_ACCELERATION = 2.0
+
+# 획 안에서 멈추지 않고 이어 그릴 때 가속도 제한 중 꼭짓점 방향 전환에 쓰는 몫
+TURN_SHARE = 0.5
+# 멈추지 않고 지나가는 꼭짓점의 최대 꺾임 각도 (도)
+MAX_PASS_ANGLE = 20.0
+
+# 한 번에 샘플링할 틱 수
+SAMPLE_CHUNK = 1 << 16
+
+
+@dataclass(frozen=True)
+class MotionLimits:
+    """시간 매개변수화 제한값 (로봇 좌표계 축별)
+
+    Args:
+        velocity: 축별 최대 속도 (m/s)
+        acceleration: 축별 최대 가속도 (m/s^2)
+        draw_speed: 펜을 내리고 그릴 때의 경로 속도 상한 (m/s), None이면 velocity만 적용
+        profile: "trapezoid" 혹은 "s_curve"
+    """
+
+    velocity: Tuple[float, float, float] = (MAX_VELOCITY, MAX_VELOCITY, MAX_VELOCITY)
+    acceleration: Tuple[float, float, float] = (MAX_ACCELERATION, MAX_ACCELERATION, MAX_ACCELERATION)
+    draw_speed: Optional[float] = None
+    profile: str = TRAPEZOID
+
+
+DEFAULT_LIMITS = MotionLimits()
+
+
+def _path_limit(directions, limits):
+    """단위 방향 (M, 3)으로 움직일 때 축별 제한을 모두 지키는 경로 제한값 (M,)"""
+    limits = np.asarray(limits, dtype=np.float64)
+    magnitude = np.abs(directions)
+    ratio = np.divide(limits, magnitude, out=np.full_like(magnitude, np.inf), where=magnitude > 0)
+    return ratio.min(axis=1)
+
+
+def move_profiles(distances, speeds, accelerations, profile=TRAPEZOID, start_speed=None, end_speed=None):
+    """직선 이동마다 시작/끝 속도를 지키는 속도 프로파일 계산
+
+    start_speed, end_speed를 주지 않으면 정지 -> 정지 대칭 프로파일이다.
+    start_speed, end_speed는 거리 안에서 가속/감속으로 맞출 수 있어야 한다 (vertex_speeds 참고).
+
+    Args:
+        distances (np.array): (M,) 이동 거리
+        speeds, accelerations (np.array): (M,) 경로 속도/가속도 제한
+        profile (str): "trapezoid" 혹은 "s_curve"
+        start_speed, end_speed (np.array): (M,) 시작/끝 경로 속도, None이면 0
+    Returns:
+        tuple: (최고 속도, 가속 시간, 등속 시간, 감속 시간) 각각 (M,)
+    """
+    if profile not in _PEAK_RATIO:
+        raise ValueError(f"unknown profile {profile!r}, expected one of {PROFILES}")
+    k = _PEAK_RATIO[profile]
+    distances = np.asarray(distances, dtype=np.float64)
+    zero = np.zeros_like(distances)
+    start_speed = zero if start_speed is None else np.asarray(start_speed, dtype=np.float64)
+    end_speed = zero if end_speed is None else np.asarray(end_speed, dtype=np.float64)
+    # v0 -> v 가속 구간 거리 = k * (v^2 - v0^2) / (2a) 이므로 거리가 모자라면 최고 속도를 낮춘다
+    # (길이 0인 이동은 방향이 없어 제한이 inf이므로 따로 0으로 둔다)
+    with np.errstate(invalid="ignore"):
+        reachable = np.sqrt(distances * accelerations / k + 0.5 * (start_speed ** 2 + end_speed ** 2))
+        peak = np.maximum(np.minimum(speeds, reachable), np.maximum(start_speed, end_speed))
+    peak = np.where(distances > 0, peak, 0.0)
+    ramp_up = np.divide(k * (peak - start_speed), accelerations, out=np.zeros_like(peak), where=peak > 0)
+    ramp_down = np.divide(k * (peak - end_speed), accelerations, out=np.zeros_like(peak), where=peak > 0)
+    ramp_up, ramp_down = np.maximum(ramp_up, 0.0), np.maximum(ramp_down, 0.0)
+    ramp_length = 0.5 * (start_speed + peak) * ramp_up + 0.5 * (end_speed + peak) * ramp_down
+    cruise = np.divide(distances - ramp_length, peak, out=np.zeros_like(peak), where=peak > 0)
+    return peak, ramp_up, np.maximum(cruise, 0.0), ramp_down
+
+
+def _ramp_distance(tau, profile):
+    """정규화한 가속 구간에서 속도 증가분으로 더 간 거리 / (속도 증가분 * 가속 시간), tau는 0 ~ 1"""
+    if profile == TRAPEZOID:
+        return 0.5 * tau * tau
+    return tau ** 3 - 0.5 * tau ** 4
+
+
+def profile_distance(
+    t, distances, start_speed, end_speed, peak, ramp_up, cruise, ramp_down, profile=TRAPEZOID
+):
+    """이동 시작 후 t초에 지나간 거리 (배열끼리 원소별, 인자는 move_profiles 참고)"""
+    total = ramp_up + cruise + ramp_down
+    t = np.clip(t, 0.0, total)
+    up = np.minimum(t, ramp_up)
+    tau = up / np.where(ramp_up > 0, ramp_up, 1.0)
+    accelerating = start_speed * up + (peak - start_speed) * ramp_up * _ramp_distance(tau, profile)
+    cruising = peak * np.clip(t - ramp_up, 0.0, cruise)
+    # 감속 구간은 끝점에서 시간을 거꾸로 돌린 가속 구간
+    left = np.clip(total - t, 0.0, ramp_down)
+    sigma = left / np.where(ramp_down > 0, ramp_down, 1.0)
+    remaining = end_speed * left + (peak - end_speed) * ramp_down * _ramp_distance(sigma, profile)
+    return np.where(t <= ramp_up + cruise, accelerating + cruising, distances - remaining)
+
+
+def vertex_speeds(
+    directions,
+    distances,
+    speeds,
+    accelerations,
+    joined,
+    turn_acceleration,
+    physics_dt=PHYSICS_DT,
+    profile=TRAPEZOID,
+):
+    """이어지는 이동 사이 경유점을 멈추지 않고 지나갈 수 있는 최대 경로 속도
+
+    경유점에서 방향이 phi만큼 꺾이면 한 틱 안에 속도가 2 v sin(phi / 2)만큼 바뀌므로
+    이것이 turn_acceleration * dt를 넘지 않고, 곡률 phi / l에 대한 구심 가속도 v^2 phi / l도
+    turn_acceleration을 넘지 않게 제한한다. 그다음 멈춰야 하는 경유점까지 가속/감속으로
+    도달할 수 있게 앞으로 한 번, 뒤로 한 번 훑어 낮춘다.
+
+    Args:
+        directions (np.array): (M, 3) 이동별 단위 방향
+        distances, speeds, accelerations (np.array): (M,) 이동 거리와 경로 속도/가속도 제한
+        joined (np.array): (M - 1,) 이동 i와 i + 1 사이를 멈추지 않고 지나가도 되는지
+        turn_acceleration (float): 방향 전환에 쓸 수 있는 가속도 (m/s^2, 모든 축 공통)
+        physics_dt (float): 샘플 간격 (s)
+        profile (str): 가속 구간 모양 (S-curve는 같은 거리에서 더 천천히 가속한다)
+    Returns:
+        np.array: (M + 1,) 경유점마다 지나가는 속도 (처음과 끝, 이어지지 않는 경유점은 0)
+    """
+    m = len(distances)
+    cap = np.zeros(m + 1)
+    k = np.flatnonzero(joined & (distances[:-1] > 0) & (distances[1:] > 0))
+    if len(k):
+        sin_half = np.clip(0.5 * np.linalg.norm(directions[k + 1] - directions[k], axis=1), 0.0, 1.0)
+        phi = 2.0 * np.arcsin(sin_half)
+        shortest = np.minimum(distances[k], distances[k + 1])
+        with np.errstate(divide="ignore"):
+            turning = np.minimum(
+                turn_acceleration * physics_dt / (2.0 * sin_half),
+                np.sqrt(turn_acceleration * shortest / phi),
+            )
+        cap[k + 1] = np.minimum.reduce([speeds[k], speeds[k + 1], turning])
+
+    # 이동 i에서 속도^2를 바꿀 수 있는 양
+    # (길이 0인 이동은 가속도 제한이 inf라 따로 0으로 둔다)
+    reach = np.zeros(m)
+    moving = distances > 0
+    reach[moving] = 2.0 * distances[moving] * accelerations[moving] / _PEAK_RATIO[profile]
+
+    def sweep(limit, gain):
+        # w[i + 1] = min(limit[i + 1], w[i] + gain[i])를 누적 최소로 한 번에 계산
+        before = np.concatenate(([0.0], np.cumsum(gain)))
+        return np.minimum.accumulate(limit - before) + before
+
+    squared = sweep(cap * cap, reach)
+    squared = sweep(squared[::-1], reach[::-1])[::-1]
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+class TimedTrajectory:
+    """틱 번호로 조회하는 미리 계산된 목표 궤적
+
+    TrajectoryFollower와 같은 step(ee_pos, current_stroke) 인터페이스를 가지지만
+    엔드 이펙터 위치를 보지 않고(개루프) 호출할 때마다 한 틱씩 진행한다.
+
+    Args:
+        positions (np.array): (K, 3) 틱마다 목표 위치 (로봇 좌표)
+        pen_down (np.array): (K,) 그리는 중인 틱인지
+        stroke_complete (np.array): (K,) 이 틱에 획 하나가 끝나는지
+        stroke_count (int): 획 수
+        physics_dt (float): 샘플 간격 (s)
+    """
+
+    def __init__(self, positions, pen_down, stroke_complete, stroke_count, physics_dt=PHYSICS_DT):
+        self.positions = positions
+        self.pen_down = pen_down
+        self.stroke_complete = stroke_complete
+        self.physics_dt = physics_dt
+        self._stroke_count = stroke_count
+        for array in (positions, pen_down, stroke_complete):
+            array.setflags(write=False)
+        self._complete_values = stroke_complete.tolist()
+        self._target = np.empty(3)
+        self.reset()
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def stroke_count(self) -> int:
+        return self._stroke_count
+
+    @property
+    def duration(self) -> float:
+        """전체 그리기 시간 (s)"""
+        return max(len(self) - 1, 0) * self.physics_dt
+
+    @property
+    def tick(self) -> int:
+        return self._tick
+
+    @property
+    def finished(self) -> bool:
+        return self._tick >= len(self)
+
+    @property
+    def state(self) -> int:
+        """다음 step()이 내보낼 샘플의 단계 (TrajectoryFollower와 같은 상수, 펜을 들고 움직이면 APPROACH)"""
+        if self._tick < len(self) and self.pen_down[self._tick]:
+            return DRAW
+        return APPROACH
+
+    def reset(self, tick=0):
+        """tick번 샘플부터 다시 시작"""
+        self._tick = tick
+
+    def step(self, ee_pos=None, current_stroke=None):
+        """한 틱 진행 (ee_pos, current_stroke는 TrajectoryFollower와 호환용으로 무시)
+        Returns:
+            tuple: (trajectory, is_stroke_complete). trajectory는 다음 step()에서 덮어쓰는 버퍼
+        """
+        tick = self._tick
+        if tick >= len(self):
+            return None, True
+        self._tick = tick + 1
+        np.copyto(self._target, self.positions[tick])
+        return self._target, self._complete_values[tick]
+
+    def summary(self) -> str:
+        drawing = float(self.pen_down.sum()) * self.physics_dt
+        return (
+            f"{self.stroke_count} strokes, {len(self)} ticks ({self.duration:.2f} s), "
+            f"pen down {drawing:.2f} s"
+        )
+
+
+def build_timed_trajectory(
+    segments,
+    original_position,
+    stroke_offsets=None,
+    limits=DEFAULT_LIMITS,
+    physics_dt=PHYSICS_DT,
+    approach_height=0.05,
+    initial_position=None,
+) -> TimedTrajectory:
+    """획 선분을 다가가기/내리기/그리기/들기 직선 이동으로 이어 시간 매개변수화하는 함수
+
+    펜을 내리고 들 때는 멈추고, 한 획 안에서 이어지는 그리기 이동은 꼭짓점에서 꺾이는 각도가
+    허용하는 속도로 멈추지 않고 지나간다 (vertex_speeds 참고). 꼭짓점을 포물선으로 깎아 두면
+    (blend_corners) 꺾이는 각도가 작아져 더 빠르게 지나간다.
+
+    Args:
+        segments (np.array): (N, 2, 3) 글자 좌표 선분
+        original_position (np.array): 원점 위치 [x, y, z]
+        stroke_offsets (np.array): (S + 1,) 획별 선분 범위 (None이면 선분 하나가 획 하나)
+        limits (MotionLimits): 축별 속도/가속도 제한과 프로파일
+        physics_dt (float): 샘플 간격 (s)
+        approach_height (float): 펜을 든 높이 (m)
+        initial_position (np.array): 시작할 때 엔드 이펙터 위치 (None이면 첫 다가가기 지점)
+    Returns:
+        TimedTrajectory: 틱별 목표 궤적
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 3)
+    if stroke_offsets is None:
+        stroke_offsets = np.arange(len(segments) + 1)
+    stroke_offsets = np.asarray(stroke_offsets, dtype=np.int64)
+    starts = to_robot_frame(segments[:, 0], original_position)
+    ends = to_robot_frame(segments[:, 1], original_position)
+    lift = np.array([0.0, 0.0, approach_height])
+
+    # 경유점과, 경유점 사이 이동마다 펜을 내리고 그리는지
+    waypoints = []
+    drawing = []
+    last = []  # 획마다 마지막 그리기 이동 번호
+
+    def add(point, draw):
+        if waypoints:
+            drawing.append(draw)
+        waypoints.append(point)
+
+    if initial_position is not None:
+        add(np.asarray(initial_position, dtype=np.float64), False)
+    for first, stop in zip(stroke_offsets[:-1].tolist(), stroke_offsets[1:].tolist()):
+        if first == stop:
+            continue
+        add(starts[first] + lift, False)  # 다가가기
+        add(starts[first], False)  # 펜 내리기
+        for point in ends[first:stop]:
+            add(point, True)  # 그리기
+        last.append(len(drawing) - 1)
+        add(ends[stop - 1] + lift, False)  # 펜 들기
+    if not last:
+        empty = np.empty((0, 3))
+        return TimedTrajectory(empty, np.empty(0, dtype=bool), np.empty(0, dtype=bool), 0, physics_dt)
+    waypoints = np.array(waypoints)
+    drawing = np.array(drawing, dtype=bool)
+
+    delta = np.diff(waypoints, axis=0)
+    distances = np.linalg.norm(delta, axis=1)
+    directions = np.divide(delta, distances[:, None], out=np.zeros_like(delta), where=distances[:, None] > 0)
+    speeds = _path_limit(directions, limits.velocity)
+    if limits.draw_speed is not None:
+        speeds = np.where(drawing, np.minimum(speeds, limits.draw_speed), speeds)
+    accelerations = _path_limit(directions, limits.acceleration)
+    # 한 획 안에서 이어지는 그리기 이동은 가속도 제한을 가감속과 꼭짓점 방향 전환에 나눠 쓴다
+    # (멈추는 편이 빠른 급한 꼭짓점은 예전처럼 멈췄다 간다)
+    joined = drawing[:-1] & drawing[1:]
+    joined &= (directions[:-1] * directions[1:]).sum(axis=1) >= np.cos(np.radians(MAX_PASS_ANGLE))
+    continuous = np.zeros(len(drawing), dtype=bool)
+    continuous[:-1] |= joined
+    continuous[1:] |= joined
+    accelerations = np.where(continuous, accelerations * (1.0 - TURN_SHARE), accelerations)
+    passing = vertex_speeds(
+        directions,
+        distances,
+        speeds,
+        accelerations,
+        joined,
+        TURN_SHARE * min(limits.acceleration),
+        physics_dt,
+        limits.profile,
+    )
+    start_speed, end_speed = passing[:-1], passing[1:]
+    peak, ramp_up, cruise, ramp_down = move_profiles(
+        distances, speeds, accelerations, limits.profile, start_speed, end_speed
+    )
+
+    durations = ramp_up + cruise + ramp_down
+    move_end = np.cumsum(durations)
+    move_start = move_end - durations
+    total = move_end[-1]
+
+    # 물리 주기마다 샘플링 (마지막 샘플은 정확히 끝점)
+    # 긴 문서에서 임시 배열이 커지지 않도록 SAMPLE_CHUNK 틱씩 나눠 계산
+    count = int(np.ceil(total / physics_dt - 1e-9)) + 1
+    positions = np.empty((count, 3))
+    pen_down = np.empty(count, dtype=bool)
+    for first in range(0, count, SAMPLE_CHUNK):
+        times = np.minimum(np.arange(first, min(first + SAMPLE_CHUNK, count)) * physics_dt, total)
+        move = np.clip(np.searchsorted(move_end, times, side="left"), 0, len(durations) - 1)
+        s = profile_distance(
+            times - move_start[move],
+            distances[move],
+            start_speed[move],
+            end_speed[move],
+            peak[move],
+            ramp_up[move],
+            cruise[move],
+            ramp_down[move],
+            limits.profile,
+        )
+        chunk = slice(first, first + len(times))
+        np.multiply(directions[move], s[:, None], out=positions[chunk])
+        positions[chunk] += waypoints[move]
+        pen_down[chunk] = drawing[move] & (durations[move] > 0)
+    positions[-1] = waypoints[-1]
+
+    # 획의 마지막 그리기 이동이 끝나는 첫 틱에 완료 표시
+    stroke_complete = np.zeros(count, dtype=bool)
+    complete_ticks = np.minimum(
+        np.ceil(move_end[np.asarray(last, dtype=np.int64)] / physics_dt - 1e-9).astype(np.int64),
+        count - 1,
+    )
+    stroke_complete[complete_ticks] = True
+    return TimedTrajectory(positions, pen_down, stroke_complete, len(last), physics_dt)
+
+
+def timed_trajectory_from_plan(
+    plan,
+    original_position,
+    mode="segment",
+    blend_radius=0.0,
+    blend_tolerance=BLEND_TOLERANCE,
+    **kwargs,
+) -> TimedTrajectory:
+    """StrokePlan으로 TimedTrajectory 만들기 (mode, blend_radius, blend_tolerance는 plan_segments 참고)"""
+    segments, stroke_offsets = plan_segments(plan, mode, blend_radius, blend_tolerance)
+    return build_timed_trajectory(segments, original_position, stroke_offsets, **kwargs)
@@ -0,0 +1,340 @@
+import math
+
+import numpy as np
+
+from modules.stroke.corner_blending import BLEND_TOLERANCE, blend_corners
+from modules.stroke.polyline import polyline_segments
+
+# 상태 기계 단계
+APPROACH = 0  # 획 시작점 위 approach_height 지점으로 다가가기
+LOWER = 1  # 시작점으로 펜 내리기
+DRAW = 2  # 시작점에서 끝점까지 그리기
+STATE_NAMES = ("다가가기", "그리기 준비", "그리기")
+
+
+def to_robot_frame(points, original_position) -> np.ndarray:
+    """글자 좌표 [x, y, z] (x는 펜 높이)를 로봇 좌표 [-z, y, x] + 원점으로 변환
+
+    글자 좌표의 z(위쪽)는 로봇 -x, y는 그대로 y, 펜 높이 x는 로봇 z가 된다.
+
+    Args:
+        points (np.array): (..., 3) 글자 좌표
+        original_position (np.array): 원점 위치 [x, y, z]
+    Returns:
+        np.array: (..., 3) 로봇 좌표
+    """
+    points = np.asarray(points, dtype=np.float64)
+    robot = points[..., ::-1] * np.array([-1.0, 1.0, 1.0])
+    return robot + np.asarray(original_position, dtype=np.float64)
+
+
+def plan_segments(plan, mode="segment", blend_radius=0.0, blend_tolerance=BLEND_TOLERANCE):
+    """StrokePlan을 (선분, 획별 선분 범위)로 펼치는 함수
+    Args:
+        plan (StrokePlan): 컴파일된 획 계획
+        mode (str): "segment"는 선분마다 펜을 들고, "polyline"은 맞닿은 선분을
+            하나의 획으로 합쳐 꼭짓점 사이에서 펜을 들지 않는다.
+        blend_radius (float): 0보다 크면 polyline 꼭짓점을 이 거리까지 포물선으로 깎아
+            멈추지 않고 지나가게 한다 (blend_corners 참고, segment 모드에서는 효과 없음)
+        blend_tolerance (float): 블렌딩한 경로가 원래 꼭짓점에서 벗어나도 되는 최대 거리 (m)
+    Returns:
+        tuple:
+            - segments: (N, 2, 3) 글자 좌표 선분
+            - stroke_offsets: (S + 1,) 획 i는 선분 stroke_offsets[i] ~ stroke_offsets[i + 1] - 1
+    """
+    if mode != "polyline":
+        return plan.strokes, np.arange(len(plan.strokes) + 1)
+    segments, stroke_offsets = polyline_segments(plan.vertices, plan.polyline_offsets)
+    if blend_radius > 0:
+        return blend_corners(segments, stroke_offsets, blend_radius, blend_tolerance)
+    return segments, stroke_offsets
+
+
+class TrajectoryFollower:
+    """획 목록을 따라 엔드 이펙터 목표 위치를 내보내는 상태 기계
+
+    모든 선분의 로봇 좌표 시작점/끝점/다가가기 지점, 길이, 단위 방향을 생성할 때
+    한 번만 계산해 두고 현재 선분 값은 고정 버퍼에 복사해 쓰므로 step()은 새 배열을 만들지 않는다.
+    상태를 모두 객체 안에 두므로 여러 팔/환경을 한 프로세스에서 따로 돌릴 수 있다.
+
+    Args:
+        segments (np.array): (N, 2, 3) 글자 좌표 선분 [[start, end], ...]
+        original_position (np.array): 원점 위치 [x, y, z]
+        draw_scale (float): 그리기 진행 속도 (1.0보다 크면 빠르게)
+        stroke_offsets (np.array): (S + 1,) 획 i는 선분 stroke_offsets[i] ~ stroke_offsets[i + 1] - 1.
+            None이면 선분 하나가 획 하나 (선분마다 펜을 든다)
+        approach_height (float): 다가가기 지점의 펜 높이 (m)
+        approach_tolerance (float): 다가가기 완료 거리 (m)
+        start_tolerance (float): 펜 내리기 완료 거리 (m)
+        end_tolerance (float): 선분 끝 도달 거리 (m)
+        verbose (bool): 틱마다 상태와 거리 출력
+    """
+
+    def __init__(
+        self,
+        segments,
+        original_position,
+        draw_scale=2.0,
+        stroke_offsets=None,
+        approach_height=0.05,
+        approach_tolerance=0.05,
+        start_tolerance=0.01,
+        end_tolerance=0.02,
+        verbose=False,
+    ):
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 3)
+        if stroke_offsets is None:
+            stroke_offsets = np.arange(len(segments) + 1)
+        self.stroke_offsets = np.asarray(stroke_offsets, dtype=np.int64)
+        self.draw_scale = draw_scale
+        self.approach_tolerance = approach_tolerance
+        self.start_tolerance = start_tolerance
+        self.end_tolerance = end_tolerance
+        self.verbose = verbose
+
+        # 로봇 좌표계로 미리 변환 (글자 좌표 x = 펜 높이 -> 로봇 z)
+        self.starts = to_robot_frame(segments[:, 0], original_position)
+        self.ends = to_robot_frame(segments[:, 1], original_position)
+        self.approaches = self.starts.copy()
+        self.approaches[:, 2] += approach_height
+        delta = self.ends - self.starts
+        self.lengths = np.linalg.norm(delta, axis=1)
+        self.directions = np.divide(
+            delta, self.lengths[:, None], out=np.zeros_like(delta), where=self.lengths[:, None] > 0
+        )
+        for array in (self.starts, self.ends, self.approaches, self.lengths, self.directions):
+            array.setflags(write=False)
+
+        self._stroke_ends = self.stroke_offsets[1:].tolist()
+        self._stroke_starts = self.stroke_offsets[:-1].tolist()
+
+        # 현재 선분 값을 담아 두는 버퍼 (선분이 바뀔 때만 채운다)
+        self._start = np.empty(3)
+        self._end = np.empty(3)
+        self._approach = np.empty(3)
+        self._direction = np.empty(3)
+        self._length = 0.0
+        self._segment = 0
+        self._delta = np.empty(3)
+        self._target = np.empty(3)
+        self.reset()
+
+    @classmethod
+    def from_plan(
+        cls,
+        plan,
+        original_position,
+        mode="segment",
+        blend_radius=0.0,
+        blend_tolerance=BLEND_TOLERANCE,
+        **kwargs,
+    ):
+        """StrokePlan으로 만들기
+        Args:
+            plan (StrokePlan): 컴파일된 획 계획
+            original_position (np.array): 원점 위치 [x, y, z]
+            mode (str): "segment" 혹은 "polyline" (plan_segments 참고)
+            blend_radius, blend_tolerance (float): polyline 꼭짓점 블렌딩 (plan_segments 참고)
+            **kwargs: TrajectoryFollower 인자
+        """
+        segments, stroke_offsets = plan_segments(plan, mode, blend_radius, blend_tolerance)
+        return cls(segments, original_position, stroke_offsets=stroke_offsets, **kwargs)
+
+    @property
+    def stroke_count(self) -> int:
+        return len(self._stroke_starts)
+
+    @property
+    def current_stroke(self) -> int:
+        return self._stroke
+
+    @property
+    def current_segment(self) -> int:
+        return self._segment
+
+    @property
+    def state(self) -> int:
+        return self._state
+
+    @property
+    def finished(self) -> bool:
+        return self._stroke >= self.stroke_count
+
+    def reset(self, stroke=0):
+        """stroke번 획의 다가가기 단계부터 다시 시작"""
+        self._stroke = stroke
+        self._state = APPROACH
+        if stroke < self.stroke_count:
+            self._load_segment(self._stroke_starts[stroke])
+
+    def _load_segment(self, k):
+        self._segment = k
+        np.copyto(self._start, self.starts[k])
+        np.copyto(self._end, self.ends[k])
+        np.copyto(self._approach, self.approaches[k])
+        np.copyto(self._direction, self.directions[k])
+        self._length = float(self.lengths[k])
+
+    def _distance(self, ee_pos, point):
+        np.subtract(ee_pos, point, out=self._delta)
+        return math.sqrt(self._delta.dot(self._delta))
+
+    def step(self, ee_pos, current_stroke=None):
+        """한 틱 진행
+        Args:
+            ee_pos (np.array): 현재 엔드 이펙터 위치 (로봇 좌표)
+            current_stroke (int): 호출하는 쪽이 세는 획 번호. 내부 번호와 다르면 그 획부터 다시 시작
+        Returns:
+            tuple: (trajectory, is_stroke_complete)
+                - trajectory: 다음 목표 위치 (모든 획을 그렸거나 ee_pos가 없으면 None).
+                  다음 step()에서 덮어쓰는 버퍼이므로 보관하려면 복사해야 한다.
+                - is_stroke_complete: 현재 획이 완료되었는지 여부
+        """
+        if current_stroke is not None and current_stroke != self._stroke:
+            self.reset(current_stroke)
+        if self._stroke >= self.stroke_count:
+            return None, True
+        if ee_pos is None:
+            return None, False
+
+        start = self._start
+        distance_to_start = self._distance(ee_pos, start)
+        target = self._target
+
+        if self._state == APPROACH:
+            if self.verbose:
+                print(f"{STATE_NAMES[APPROACH]}: {distance_to_start}")
+            if distance_to_start <= self.approach_tolerance:
+                self._state = LOWER
+            np.copyto(target, self._approach)
+            return target, False
+
+        if self._state == LOWER:
+            if self.verbose:
+                print(f"{STATE_NAMES[LOWER]}: {distance_to_start}")
+            if distance_to_start <= self.start_tolerance:
+                self._state = DRAW
+            np.copyto(target, start)
+            return target, False
+
+        # 시작점에서 멀어진 거리에 draw_scale을 곱한 만큼 끝점 쪽으로 목표를 옮긴다
+        length = self._length
+        progress = min(1.0, distance_to_start / length * self.draw_scale) if length > 0 else 1.0
+        if self.verbose:
+            print(f"{STATE_NAMES[DRAW]}: {progress*100} %")
+        np.multiply(self._direction, length * progress, out=target)
+        np.add(target, start, out=target)
+
+        distance_to_end = self._distance(ee_pos, self._end)
+        if distance_to_end <= self.end_tolerance:
+            if self._segment + 1 < self._stroke_ends[self._stroke]:
+                # 펜을 내린 채로 다음 선분으로 이어서 그리기
+                # (끝점이 이미 end_tolerance 안에 들어온 짧은 선분은 한 틱에 건너뛴다)
+                last = self._stroke_ends[self._stroke] - 1
+                k = self._segment + 1
+                while k < last and self._distance(ee_pos, self.ends[k]) <= self.end_tolerance:
+                    k += 1
+                np.copyto(target, self.ends[k - 1])
+                self._load_segment(k)
+                return target, False
+            self.reset(self._stroke + 1)
+            return target, True
+        return target, False
+
+
+class StreamingFollower:
+    """획 계획을 한 덩어리(예: 한 줄)씩 받아 TrajectoryFollower로 이어서 그리는 상태 기계
+
+    문자열 전체의 획을 한꺼번에 만들지 않고 지금 그리는 덩어리만 로봇 좌표로 변환해 두므로
+    메모리는 덩어리 하나 분량이다. 덩어리의 마지막 획이 끝나는 step()에서 다음 덩어리를 읽기 때문에
+    stroke_count는 지금까지 읽은 획 수이고, 마지막 덩어리를 다 그린 뒤에야 전체 획 수가 된다
+    (current_stroke == stroke_count는 모두 그렸을 때만 성립한다).
+
+    Args:
+        plans: 인자 없이 부르면 StrokePlan iterable을 새로 만드는 함수 (예: iter_stroke_plans).
+            reset()할 때마다 처음부터 다시 부른다.
+        original_position (np.array): 원점 위치 [x, y, z]
+        mode, blend_radius, blend_tolerance: TrajectoryFollower.from_plan 인자
+        **kwargs: TrajectoryFollower 인자
+    """
+
+    def __init__(
+        self,
+        plans,
+        original_position,
+        mode="segment",
+        blend_radius=0.0,
+        blend_tolerance=BLEND_TOLERANCE,
+        **kwargs,
+    ):
+        self._plans = plans
+        self._options = dict(
+            original_position=original_position,
+            mode=mode,
+            blend_radius=blend_radius,
+            blend_tolerance=blend_tolerance,
+            **kwargs,
+        )
+        self.reset()
+
+    def _next_chunk(self) -> bool:
+        """획이 있는 다음 덩어리로 넘어가기 (남은 덩어리가 없으면 False)"""
+        for plan in self._chunks:
+            follower = TrajectoryFollower.from_plan(plan, **self._options)
+            if not follower.stroke_count:
+                continue
+            if self._follower is not None:
+                self._first_stroke += self._follower.stroke_count
+                self._first_segment += len(self._follower.starts)
+            self._follower = follower
+            return True
+        return False
+
+    @property
+    def stroke_count(self) -> int:
+        loaded = self._follower.stroke_count if self._follower is not None else 0
+        return self._first_stroke + loaded
+
+    @property
+    def current_stroke(self) -> int:
+        if self._follower is None:
+            return 0
+        return self._first_stroke + self._follower.current_stroke
+
+    @property
+    def current_segment(self) -> int:
+        if self._follower is None:
+            return 0
+        return self._first_segment + self._follower.current_segment
+
+    @property
+    def state(self) -> int:
+        return APPROACH if self._follower is None else self._follower.state
+
+    @property
+    def finished(self) -> bool:
+        # 덩어리가 끝나면 바로 다음 덩어리를 읽으므로 지금 덩어리가 끝났으면 남은 덩어리도 없다
+        return self._follower is None or self._follower.finished
+
+    def reset(self, stroke=0):
+        """stroke번 획의 다가가기 단계부터 다시 시작 (덩어리를 처음부터 다시 읽는다)"""
+        self._chunks = iter(self._plans())
+        self._follower = None
+        self._first_stroke = self._first_segment = 0
+        loaded = self._next_chunk()
+        while loaded and stroke >= self.stroke_count:
+            loaded = self._next_chunk()
+        if self._follower is not None:
+            self._follower.reset(stroke - self._first_stroke)
+
+    def step(self, ee_pos, current_stroke=None):
+        """한 틱 진행 (TrajectoryFollower.step과 같음, current_stroke는 전체 획 번호)"""
+        if current_stroke is not None and current_stroke != self.current_stroke:
+            self.reset(current_stroke)
+        if self.finished:
+            return None, True
+        trajectory, is_stroke_complete = self._follower.step(ee_pos)
+        if self._follower.finished:
+            # 호출하는 쪽이 획 번호를 stroke_count와 비교하기 전에 다음 덩어리의 획을 더해 둔다
+            self._next_chunk()
+        return trajectory, is_stroke_complete
@@ -0,0 +1,143 @@
+"""polyline 꼭짓점을 포물선으로 깎아 펜을 멈추지 않고 지나가게 하는 경로 블렌딩
+
+꼭짓점 V에서 들어오는 방향 u_in, 나가는 방향 u_out으로 꺾일 때 V 앞뒤로 b만큼 떨어진
+P0 = V - b * u_in, P2 = V + b * u_out 사이를 2차 베지어(포물선) P0 -> V -> P2로 잇는다.
+포물선은 P0, P2에서 원래 선분과 접하므로 방향이 연속이고, 원래 꼭짓점에서 가장 먼
+곳(가운데)의 거리는 b * sin(theta / 2) / 2 이다 (theta는 꺾인 각도).
+그래서 b를 blend 반지름과 허용 오차 둘 다로 제한하면 글자 모양에서 tolerance 이상 벗어나지 않는다.
+"""
+import numpy as np
+
+from modules.stroke.curves import CHORD_TOLERANCE
+from modules.stroke.polyline import JOIN_TOLERANCE, polyline_segments
+
+# 꼭짓점에서 깎아 내는 최대 거리 (m)
+BLEND_RADIUS = 0.01
+# 블렌딩한 경로가 원래 꼭짓점에서 벗어나도 되는 최대 거리 (m)
+BLEND_TOLERANCE = CHORD_TOLERANCE
+# 포물선을 나눌 때 조각 하나가 꺾는 최대 각도 (도)
+MAX_PIECE_ANGLE = 5.0
+
+
+def corner_cutbacks(segments, stroke_offsets, radius=BLEND_RADIUS, tolerance=BLEND_TOLERANCE):
+    """맞닿은 선분 사이 꼭짓점마다 깎아 낼 거리와 꺾인 각도
+    Args:
+        segments (np.array): (N, 2, 3) 선분
+        stroke_offsets (np.array): (S + 1,) 획 i는 선분 stroke_offsets[i] ~ stroke_offsets[i + 1] - 1
+        radius (float): 최대 깎는 거리
+        tolerance (float): 꼭짓점에서 벗어나도 되는 최대 거리
+    Returns:
+        tuple:
+            - cutback: (N,) 선분 i의 끝 꼭짓점에서 깎는 거리 (획의 마지막 선분이거나 꺾이지 않으면 0)
+            - angle: (N,) 선분 i -> i + 1로 꺾이는 각도 (rad)
+    """
+    n = len(segments)
+    delta = segments[:, 1] - segments[:, 0]
+    lengths = np.linalg.norm(delta, axis=1)
+    directions = np.divide(delta, lengths[:, None], out=np.zeros_like(delta), where=lengths[:, None] > 0)
+
+    # 같은 획 안에서 다음 선분과 맞닿은 선분만 꼭짓점을 가진다
+    joint = np.zeros(n, dtype=bool)
+    joint[:-1] = np.linalg.norm(segments[1:, 0] - segments[:-1, 1], axis=1) <= JOIN_TOLERANCE
+    nonempty = stroke_offsets[1:] > stroke_offsets[:-1]
+    joint[stroke_offsets[1:][nonempty] - 1] = False
+    joint[:-1] &= (lengths[:-1] > 0) & (lengths[1:] > 0)
+
+    # |u_out - u_in| = 2 sin(theta / 2)
+    sin_half = np.zeros(n)
+    sin_half[:-1] = 0.5 * np.linalg.norm(directions[1:] - directions[:-1], axis=1)
+    sin_half = np.where(joint, np.minimum(sin_half, 1.0), 0.0)
+    angle = 2.0 * np.arcsin(sin_half)
+
+    cutback = np.zeros(n)
+    bent = joint & (sin_half > 1e-9)
+    k = np.flatnonzero(bent)
+    cutback[k] = np.minimum.reduce(
+        [
+            np.full(len(k), float(radius)),
+            0.5 * lengths[k],
+            0.5 * lengths[k + 1],
+            2.0 * tolerance / sin_half[k],
+        ]
+    )
+    return cutback, angle
+
+
+def blend_corners(
+    segments,
+    stroke_offsets=None,
+    radius=BLEND_RADIUS,
+    tolerance=BLEND_TOLERANCE,
+    max_piece_angle=MAX_PIECE_ANGLE,
+):
+    """획 안의 꼭짓점을 포물선 조각으로 바꾼 선분 목록을 만드는 함수
+
+    획 하나가 선분 하나인 경우(segment 모드)는 꼭짓점이 없으므로 그대로 돌려준다.
+
+    Args:
+        segments (np.array): (N, 2, 3) 선분
+        stroke_offsets (np.array): (S + 1,) 획별 선분 범위 (None이면 선분 하나가 획 하나)
+        radius (float): 꼭짓점에서 깎는 최대 거리, 0이면 블렌딩하지 않는다
+        tolerance (float): 원래 꼭짓점에서 벗어나도 되는 최대 거리
+        max_piece_angle (float): 포물선 조각 하나가 꺾는 최대 각도 (도)
+    Returns:
+        tuple:
+            - segments: (M, 2, 3) 블렌딩한 선분
+            - stroke_offsets: (S + 1,) 획별 선분 범위 (획 수와 획 순서는 그대로)
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 3)
+    n = len(segments)
+    if stroke_offsets is None:
+        stroke_offsets = np.arange(n + 1)
+    stroke_offsets = np.asarray(stroke_offsets, dtype=np.int64)
+    if n == 0 or radius <= 0:
+        return segments, stroke_offsets
+
+    cutback, angle = corner_cutbacks(segments, stroke_offsets, radius, tolerance)
+    blended = cutback > 0
+    if not blended.any():
+        return segments, stroke_offsets
+    pieces = np.where(blended, np.ceil(angle / np.radians(max_piece_angle)), 0).astype(np.int64)
+
+    nonempty = stroke_offsets[1:] > stroke_offsets[:-1]
+    heads = np.zeros(n, dtype=bool)
+    heads[stroke_offsets[:-1][nonempty]] = True
+    tails = np.zeros(n, dtype=bool)
+    tails[stroke_offsets[1:][nonempty] - 1] = True
+
+    # 앞뒤 꼭짓점에서 모두 깎여 직선 부분이 남지 않으면 앞 포물선의 끝점 = 이번 포물선의 시작점
+    lengths = np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1)
+    previous = np.concatenate(([0.0], cutback[:-1]))
+    skip = (blended & (previous > 0) & (lengths - previous - cutback <= JOIN_TOLERANCE)).astype(np.int64)
+
+    # 선분 i 다음에 놓이는 꼭짓점: 획 첫 선분이면 시작점, 그 뒤에 끝점 혹은 포물선 위의 점들
+    joints = np.flatnonzero(~tails)
+    points = np.where(tails, 1, pieces + 1 - skip)
+    counts = heads + points
+    base = np.cumsum(counts) - counts
+    vertices = np.empty((int(counts.sum()), 3))
+    vertices[base[heads]] = segments[heads, 0]
+    vertices[base[tails] + heads[tails]] = segments[tails, 1]
+
+    group = np.repeat(np.arange(len(joints)), points[joints])
+    local = np.arange(len(group)) - np.repeat(np.cumsum(points[joints]) - points[joints], points[joints])
+    k = joints[group]
+    t = ((local + skip[k]) / np.maximum(pieces[k], 1))[:, None]
+    corner = segments[k, 1]
+    b = cutback[k, None]
+    u_in = (segments[k, 1] - segments[k, 0]) / np.maximum(lengths[k], 1e-300)[:, None]
+    u_out = (segments[k + 1, 1] - segments[k + 1, 0]) / np.maximum(lengths[k + 1], 1e-300)[:, None]
+    p0 = corner - b * u_in
+    p2 = corner + b * u_out
+    vertices[base[k] + heads[k] + local] = (
+        (1.0 - t) ** 2 * p0 + 2.0 * t * (1.0 - t) * corner + t * t * p2
+    )
+
+    # 획별 꼭짓점 범위 -> 선분 범위 (빈 획은 선분 0개)
+    first = stroke_offsets[:-1][nonempty]
+    last = stroke_offsets[1:][nonempty] - 1
+    vertex_offsets = np.append(base[first], base[last[-1]] + counts[last[-1]])
+    blended_segments, segment_offsets = polyline_segments(vertices, vertex_offsets)
+    stroke_counts = np.zeros(len(stroke_offsets) - 1, dtype=np.int64)
+    stroke_counts[nonempty] = np.diff(segment_offsets)
+    return blended_segments, np.concatenate(([0], np.cumsum(stroke_counts)))
@@ -0,0 +1,68 @@
+import numpy as np
+
+# 그려진 곡선이 원래 곡선에서 벗어나도 되는 최대 거리 (m, 로봇 좌표계 기준)
+CHORD_TOLERANCE = 0.001
+# 곡선 하나를 나누는 최대 선분 수
+MAX_SEGMENTS = 256
+
+
+def arc_points(center, radius, start_angle, end_angle, tolerance) -> np.ndarray:
+    """(y, z) 평면 위의 원/타원 호를 현 오차(tolerance) 이내로 나눈 꼭짓점
+
+    점 = center + (0, ry * cos(t), rz * sin(t)), t는 start_angle -> end_angle (도)
+
+    Args:
+        center: [x, y, z] 중심 (x는 펜 높이)
+        radius: 반지름 r 혹은 [ry, rz]
+        start_angle, end_angle (float): 시작/끝 각도 (도), end < start면 시계 방향
+        tolerance (float): 허용 현 오차 (같은 좌표계 단위)
+    Returns:
+        np.array: (M, 3) 꼭짓점 (M >= 2)
+    """
+    ry, rz = (radius, radius) if np.isscalar(radius) else radius
+    sweep = np.radians(end_angle - start_angle)
+    r = max(abs(ry), abs(rz))
+    # 반지름 r인 원에서 각 step의 현 오차는 r * (1 - cos(step / 2))
+    if tolerance >= r:
+        step = np.pi
+    else:
+        step = 2.0 * np.arccos(1.0 - tolerance / r)
+    n = int(np.clip(np.ceil(abs(sweep) / step), 1, MAX_SEGMENTS))
+    t = np.radians(start_angle) + sweep * np.linspace(0.0, 1.0, n + 1)
+    points = np.empty((n + 1, 3))
+    points[:, 0] = center[0]
+    points[:, 1] = center[1] + ry * np.cos(t)
+    points[:, 2] = center[2] + rz * np.sin(t)
+    return points
+
+
+def bezier_points(control, tolerance) -> np.ndarray:
+    """2차/3차 베지어 곡선을 현 오차(tolerance) 이내로 나눈 꼭짓점
+
+    균일 분할 수는 Wang의 공식 n = sqrt(d(d - 1) / 8 * M / tolerance)로 정한다.
+    (M: 제어점 2차 차분의 최대 크기, d: 차수)
+
+    Args:
+        control: (d + 1, 3) 제어점
+        tolerance (float): 허용 현 오차
+    Returns:
+        np.array: (M, 3) 꼭짓점 (M >= 2)
+    """
+    control = np.asarray(control, dtype=np.float64)
+    degree = len(control) - 1
+    second = control[2:] - 2.0 * control[1:-1] + control[:-2]
+    m = np.linalg.norm(second, axis=1).max() if len(second) else 0.0
+    n = int(np.ceil(np.sqrt(degree * (degree - 1) / 8.0 * m / tolerance))) if m > 0 else 1
+    n = int(np.clip(n, 1, MAX_SEGMENTS))
+    t = np.linspace(0.0, 1.0, n + 1)[:, None]
+    # de Casteljau를 모든 t에 대해 한 번에
+    points = np.broadcast_to(control, (n + 1,) + control.shape).copy()
+    for k in range(degree, 0, -1):
+        points = points[:, :k] * (1.0 - t[:, :, None]) + points[:, 1 : k + 1] * t[:, :, None]
+    return points[:, 0]
+
+
+def chain(points) -> np.ndarray:
+    """꼭짓점 (M, 3)을 이어진 선분 (M - 1, 2, 3) 획 배열로 변환"""
+    points = np.asarray(points, dtype=np.float64)
+    return np.stack([points[:-1], points[1:]], axis=1)
@@ -0,0 +1,70 @@
+import numpy as np
+
+# 획 배열 형식: (N, 2, 3) float64, [획][시작/끝][x, y, z]
+# x는 펜 높이, (y, z)가 글자 평면이다.
+
+IDENTITY = ((1.0, 1.0), (0.0, 0.0))
+
+
+def empty_strokes() -> np.ndarray:
+    """획이 없는 (0, 2, 3) 배열"""
+    return np.empty((0, 2, 3), dtype=np.float64)
+
+
+def compose(first, second):
+    """두 (y, z) 아핀 변환을 하나로 합치는 함수
+    Args:
+        first: 먼저 적용할 변환 ((sy, sz), (oy, oz))
+        second: 나중에 적용할 변환 ((sy, sz), (oy, oz))
+    Returns:
+        tuple: first 다음 second를 적용하는 변환
+    """
+    (s1y, s1z), (o1y, o1z) = first
+    (s2y, s2z), (o2y, o2z) = second
+    return ((s1y * s2y, s1z * s2z), (o1y * s2y + o2y, o1z * s2z + o2z))
+
+
+def transform(strokes, affine) -> np.ndarray:
+    """획 배열 전체에 (y, z) 스케일과 이동을 적용한 새 배열을 반환
+    Args:
+        strokes (np.array): (N, 2, 3) 획 배열
+        affine: ((sy, sz), (oy, oz))
+    Returns:
+        np.array: 변환된 (N, 2, 3) 배열
+    """
+    (sy, sz), (oy, oz) = affine
+    out = np.array(strokes, dtype=np.float64)
+    out[..., 1:] *= (sy, sz)
+    out[..., 1:] += (oy, oz)
+    return out
+
+
+def place(parts, affines) -> np.ndarray:
+    """여러 획 배열을 각자의 변환으로 배치해 하나로 합치는 함수
+
+    모든 부분을 한 번에 이어붙인 뒤 행마다 스케일/이동을 반복(repeat)해서
+    한 번의 벡터 연산으로 적용한다.
+
+    Args:
+        parts (list): (Ni, 2, 3) 획 배열 리스트
+        affines (list): 부분마다 적용할 ((sy, sz), (oy, oz))
+    Returns:
+        np.array: (sum Ni, 2, 3) 배열
+    """
+    if not parts:
+        return empty_strokes()
+    counts = [len(p) for p in parts]
+    out = np.concatenate(parts).astype(np.float64, copy=True)
+    if not len(out):
+        return out
+    affines = np.asarray(affines, dtype=np.float64)  # (P, 2, 2)
+    scales = np.repeat(affines[:, 0], counts, axis=0)[:, None, :]
+    offsets = np.repeat(affines[:, 1], counts, axis=0)[:, None, :]
+    out[..., 1:] *= scales
+    out[..., 1:] += offsets
+    return out
+
+
+def to_dicts(strokes) -> list:
+    """획 배열을 [{"start", "end"}, ...] 형식으로 변환"""
+    return [{"start": s, "end": e} for s, e in np.asarray(strokes).tolist()]
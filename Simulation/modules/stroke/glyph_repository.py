@@ -0,0 +1,231 @@
+import os
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from modules.stroke.curves import CHORD_TOLERANCE, arc_points, bezier_points, chain
+
+# 기본 자모 획 데이터 (Simulation/asset/korean.json)
+DEFAULT_GLYPH_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "asset",
+    "korean.json",
+)
+
+# 모음 방향 (kind[1])
+HORIZONTAL = 0  # ㅏ, ㅓ, ㅣ ... (오른쪽에 붙는 모음)
+VERTICAL = 1  # ㅗ, ㅜ, ㅡ ... (아래에 붙는 모음)
+
+
+class GlyphSchemaError(ValueError):
+    """자모 JSON 형식이 잘못되었을 때 발생하는 예외"""
+
+
+class Glyph:
+    """자모 한 개의 이름, 종류, 획 배열
+
+    path는 곡선(arc, bezier)을 기본 현 오차(CHORD_TOLERANCE)로 나눈 결과이며,
+    다른 오차가 필요하면 tessellate()로 다시 나눈다.
+    """
+
+    __slots__ = ("name", "kind", "primitives", "has_curves", "path")
+
+    def __init__(self, name, kind, primitives):
+        self.name = name
+        self.kind = kind
+        self.primitives = primitives
+        self.has_curves = any(p[0] != "line" for p in primitives)
+        self.path = _read_only(self.tessellate(CHORD_TOLERANCE))
+
+    def tessellate(self, tolerance) -> np.ndarray:
+        """곡선을 tolerance 이내의 선분으로 나눈 (N, 2, 3) 획 배열"""
+        parts = []
+        for primitive in self.primitives:
+            if primitive[0] == "line":
+                parts.append(primitive[1][None])
+            elif primitive[0] == "arc":
+                parts.append(chain(arc_points(*primitive[1:], tolerance)))
+            else:
+                parts.append(chain(bezier_points(primitive[1], tolerance)))
+        if not parts:
+            return np.empty((0, 2, 3))
+        return np.concatenate(parts)
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+def _parse_kind(kind, where):
+    """kind 항목을 tuple로 정규화 ("son" / ["son"] / ["mom", 0])"""
+    if isinstance(kind, str):
+        kind = [kind]
+    if not isinstance(kind, list) or not kind or kind[0] not in ("son", "mom"):
+        raise GlyphSchemaError(f"{where}: invalid kind {kind!r}")
+    if kind[0] == "mom" and (len(kind) < 2 or not isinstance(kind[1], int)):
+        raise GlyphSchemaError(f"{where}: vowel kind needs an orientation flag, got {kind!r}")
+    return tuple(kind)
+
+
+def _parse_point(point, where):
+    if (
+        not isinstance(point, list)
+        or len(point) != 3
+        or not all(isinstance(v, (int, float)) for v in point)
+    ):
+        raise GlyphSchemaError(f"{where}: expected [x, y, z], got {point!r}")
+    return point
+
+
+def _parse_number(value, where):
+    if not isinstance(value, (int, float)):
+        raise GlyphSchemaError(f"{where}: expected a number, got {value!r}")
+    return float(value)
+
+
+def _parse_primitive(segment, where):
+    """path 항목 한 개를 해석
+
+    지원 형식:
+        {"start": [x, y, z], "end": [x, y, z]}                        직선
+        {"type": "arc", "center": [x, y, z], "radius": r 혹은 [ry, rz],
+         "start_angle": 도, "end_angle": 도}                           (y, z) 평면 호
+        {"type": "bezier", "points": [[x, y, z], ...]}                2차/3차 베지어
+    """
+    if not isinstance(segment, dict):
+        raise GlyphSchemaError(f"{where}: expected an object")
+    kind = segment.get("type", "line")
+    if kind == "line":
+        if "start" not in segment or "end" not in segment:
+            raise GlyphSchemaError(f"{where}: expected {{'start', 'end'}}")
+        points = [
+            _parse_point(segment["start"], f"{where}.start"),
+            _parse_point(segment["end"], f"{where}.end"),
+        ]
+        return ("line", np.array(points, dtype=np.float64))
+    if kind == "arc":
+        radius = segment.get("radius")
+        if isinstance(radius, list) and len(radius) == 2:
+            radius = tuple(_parse_number(r, f"{where}.radius") for r in radius)
+        else:
+            radius = _parse_number(radius, f"{where}.radius")
+        return (
+            "arc",
+            np.array(_parse_point(segment.get("center"), f"{where}.center"), dtype=np.float64),
+            radius,
+            _parse_number(segment.get("start_angle"), f"{where}.start_angle"),
+            _parse_number(segment.get("end_angle"), f"{where}.end_angle"),
+        )
+    if kind == "bezier":
+        points = segment.get("points")
+        if not isinstance(points, list) or len(points) not in (3, 4):
+            raise GlyphSchemaError(f"{where}: bezier needs 3 or 4 control points")
+        control = [_parse_point(p, f"{where}.points[{i}]") for i, p in enumerate(points)]
+        return ("bezier", np.array(control, dtype=np.float64))
+    raise GlyphSchemaError(f"{where}: unknown segment type {kind!r}")
+
+
+def _parse_path(path, where):
+    """path 항목을 선분/곡선 primitive 리스트로 변환"""
+    if not isinstance(path, list):
+        raise GlyphSchemaError(f"{where}: path must be a list")
+    return [_parse_primitive(segment, f"{where}.path[{i}]") for i, segment in enumerate(path)]
+
+
+class GlyphRepository:
+    """자모 획 JSON을 한 번만 읽고 이름/종류로 색인하는 저장소
+
+    Args:
+        json_path (str): {"characters": [{"name", "kind", "path"}, ...]} 형식의 파일
+        require_kind (bool): False면 kind를 검사하지 않는다 (LLM이 만든 배치 파일처럼 획만 쓰는 파일,
+            kind가 없거나 "unknown"이면 None)
+    """
+
+    def __init__(self, json_path=DEFAULT_GLYPH_PATH, require_kind=True):
+        self.json_path = os.path.abspath(json_path)
+        self.require_kind = require_kind
+        with open(self.json_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("characters"), list):
+            raise GlyphSchemaError(f"{self.json_path}: missing 'characters' list")
+
+        self._glyphs = []
+        self._by_name = {}
+        self._tessellated = {}
+        for i, character in enumerate(data["characters"]):
+            where = f"{os.path.basename(self.json_path)}: characters[{i}]"
+            if not isinstance(character, dict):
+                raise GlyphSchemaError(f"{where}: expected an object")
+            name = character.get("name")
+            if not isinstance(name, str) or not name:
+                raise GlyphSchemaError(f"{where}: missing name")
+            if require_kind:
+                kind = _parse_kind(character.get("kind"), where)
+            else:
+                try:
+                    kind = _parse_kind(character.get("kind"), where)
+                except GlyphSchemaError:
+                    kind = None
+            glyph = Glyph(name, kind, _parse_path(character.get("path"), where))
+            self._glyphs.append(glyph)
+            # 이름이 중복되면 (LLM이 만든 배치 파일 등) 첫 항목을 사용
+            self._by_name.setdefault(name, glyph)
+
+        self._all_paths = _read_only(
+            np.concatenate([g.path for g in self._glyphs])
+            if self._glyphs
+            else np.empty((0, 2, 3))
+        )
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def get(self, name):
+        """이름으로 자모 찾기 (없으면 None)"""
+        return self._by_name.get(name)
+
+    def path(self, name, tolerance=None):
+        """자모의 획 배열
+        Args:
+            name: 자모 이름
+            tolerance (float): 곡선을 나눌 현 오차 (자모 좌표계), None이면 기본값
+        Returns:
+            np.array: (N, 2, 3) 읽기 전용 배열 [[start, end], ...], 없으면 None
+        """
+        glyph = self._by_name.get(name)
+        if glyph is None:
+            return None
+        if tolerance is None or not glyph.has_curves:
+            return glyph.path
+        key = (name, float(tolerance))
+        path = self._tessellated.get(key)
+        if path is None:
+            path = self._tessellated[key] = _read_only(glyph.tessellate(tolerance))
+        return path
+
+    def kind(self, name):
+        """자모의 종류
+        Returns:
+            tuple: ("son",) 혹은 ("mom", 방향), 없으면 (require_kind=False에서 kind가 잘못되었을 때도) None
+        """
+        glyph = self._by_name.get(name)
+        return None if glyph is None else glyph.kind
+
+    def all_paths(self):
+        """파일 순서대로 이어붙인 모든 획 (N, 2, 3) 읽기 전용 배열"""
+        return self._all_paths
+
+
+@lru_cache(maxsize=None)
+def _load(json_path, require_kind):
+    return GlyphRepository(json_path, require_kind)
+
+
+def get_glyph_repository(json_path=DEFAULT_GLYPH_PATH, require_kind=True) -> GlyphRepository:
+    """(파일, require_kind)마다 하나씩 공유되는 GlyphRepository 반환"""
+    return _load(os.path.abspath(json_path), require_kind)
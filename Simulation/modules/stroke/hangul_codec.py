@@ -0,0 +1,135 @@
+"""표를 미리 만들어 두고 쓰는 한글 음절 <-> 자모 분해기
+
+Simulation(puzzle.splitCharacter)과 Langgraph(Hangeul.decompose_text)가 함께 쓴다.
+Langgraph는 저장소 최상위의 pyproject.toml로 이 파일을 hangul_codec 모듈로 설치해서 import한다.
+자모는 모두 호환 자모(U+3131 ~ U+318E, 예: ㄱ, ㅏ)로 돌려준다.
+
+    >>> split_syllable("닭")
+    ('ㄷ', 'ㅏ', 'ㄺ')
+    >>> ids, lengths = decompose("한 글")
+    >>> jamo_list(ids), lengths.tolist()
+    (['ㅎ', 'ㅏ', 'ㄴ', ' ', 'ㄱ', 'ㅡ', 'ㄹ'], [3, 1, 3])
+"""
+import unicodedata
+
+import numpy as np
+
+SYLLABLE_BASE = 0xAC00  # 가
+SYLLABLE_COUNT = 11172  # 가 ~ 힣
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28  # 받침 없음 포함
+
+# 초성 19자, 중성 21자, 종성 27자 (호환 자모)
+CHOSEONG = (
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+)
+JUNGSEONG = (
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅘ", "ㅙ",
+    "ㅚ", "ㅛ", "ㅜ", "ㅝ", "ㅞ", "ㅟ", "ㅠ", "ㅡ", "ㅢ", "ㅣ",
+)
+JONGSEONG = (
+    "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ",
+    "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ",
+    "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+)
+
+# 코드 포인트 표 (종성 0번은 받침 없음)
+_CHOSEONG_CODE = np.array([ord(c) for c in CHOSEONG], dtype=np.int32)
+_JUNGSEONG_CODE = np.array([ord(c) for c in JUNGSEONG], dtype=np.int32)
+_JONGSEONG_CODE = np.array([0] + [ord(c) for c in JONGSEONG], dtype=np.int32)
+
+# 조합형 자모(U+1100 ~ U+11FF) -> 같은 이름의 호환 자모, 대응이 없으면 그대로
+# (예: HANGUL JONGSEONG KIYEOK -> HANGUL LETTER KIYEOK)
+_CONJOINING_BASE = 0x1100
+
+
+def _conjoining_table():
+    table = np.arange(_CONJOINING_BASE, _CONJOINING_BASE + 0x100, dtype=np.int32)
+    for i, code in enumerate(table):
+        name = unicodedata.name(chr(code), "")
+        for prefix in ("HANGUL CHOSEONG ", "HANGUL JUNGSEONG ", "HANGUL JONGSEONG "):
+            if name.startswith(prefix):
+                try:
+                    table[i] = ord(unicodedata.lookup("HANGUL LETTER " + name[len(prefix):]))
+                except KeyError:
+                    pass
+    return table
+
+
+_CONJOINING = _conjoining_table()
+
+# 음절 번호 -> (초성, 중성[, 종성]) 표
+_SYLLABLES = tuple(
+    (CHOSEONG[i // (JUNGSEONG_COUNT * JONGSEONG_COUNT)], JUNGSEONG[i // JONGSEONG_COUNT % JUNGSEONG_COUNT])
+    + ((JONGSEONG[i % JONGSEONG_COUNT - 1],) if i % JONGSEONG_COUNT else ())
+    for i in range(SYLLABLE_COUNT)
+)
+
+
+def _compatible(code):
+    """코드 포인트 한 개를 호환 자모로 (조합형 자모가 아니면 그대로)"""
+    if _CONJOINING_BASE <= code < _CONJOINING_BASE + len(_CONJOINING):
+        return int(_CONJOINING[code - _CONJOINING_BASE])
+    return code
+
+
+def split_syllable(a) -> tuple:
+    """한글 한 글자를 자모로 분해
+    Args:
+        a: 문자 한 개
+    Returns:
+        tuple: (초성, 중성) 혹은 (초성, 중성, 종성).
+            한글 음절이 아니면 그 문자 하나 (조합형 자모는 호환 자모로 변환)
+    """
+    code = ord(a)
+    if 0 <= code - SYLLABLE_BASE < SYLLABLE_COUNT:
+        return _SYLLABLES[code - SYLLABLE_BASE]
+    return (chr(_compatible(code)),)
+
+
+def code_points(text) -> np.ndarray:
+    """문자열을 (N,) int32 코드 포인트 배열로 변환 (배열이면 그대로)"""
+    if isinstance(text, str):
+        return np.frombuffer(text.encode("utf-32-le"), dtype="<u4").astype(np.int32)
+    return np.asarray(text, dtype=np.int32).reshape(-1)
+
+
+def decompose(text):
+    """문자열 전체를 한 번에 자모로 분해하는 함수
+    Args:
+        text: 문자열 혹은 코드 포인트 배열
+    Returns:
+        tuple:
+            - ids: (M,) int32 자모 코드 포인트 (호환 자모, 한글이 아닌 문자는 그대로)
+            - lengths: (N,) int32 글자마다 자모 수 (음절 2 ~ 3, 그 외 1)
+    """
+    codes = code_points(text)
+    index = codes - SYLLABLE_BASE
+    is_syllable = (index >= 0) & (index < SYLLABLE_COUNT)
+    index = np.where(is_syllable, index, 0)
+    jongseong = index % JONGSEONG_COUNT
+    has_jongseong = is_syllable & (jongseong > 0)
+
+    lengths = np.where(is_syllable, 2, 1).astype(np.int32) + has_jongseong
+    starts = np.cumsum(lengths) - lengths
+    ids = np.empty(int(lengths.sum()), dtype=np.int32)
+
+    # 첫 자리: 음절이면 초성, 아니면 (호환 자모로 바꾼) 문자 그대로
+    is_conjoining = (codes >= _CONJOINING_BASE) & (codes < _CONJOINING_BASE + len(_CONJOINING))
+    first = np.where(
+        is_conjoining, _CONJOINING[np.where(is_conjoining, codes - _CONJOINING_BASE, 0)], codes
+    )
+    ids[starts] = np.where(
+        is_syllable, _CHOSEONG_CODE[index // (JUNGSEONG_COUNT * JONGSEONG_COUNT)], first
+    )
+    ids[starts[is_syllable] + 1] = _JUNGSEONG_CODE[
+        index[is_syllable] // JONGSEONG_COUNT % JUNGSEONG_COUNT
+    ]
+    ids[starts[has_jongseong] + 2] = _JONGSEONG_CODE[jongseong[has_jongseong]]
+    return ids, lengths.astype(np.int32)
+
+
+def jamo_list(ids) -> list:
+    """decompose의 자모 코드 포인트를 문자 리스트로 변환"""
+    return list(np.asarray(ids, dtype="<u4").tobytes().decode("utf-32-le"))
@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from modules.stroke.geometry import empty_strokes, place, transform
+from modules.stroke.curves import CHORD_TOLERANCE
+
+# 글자 한 칸 가로, 세로 길이
+CELL_SIZE = 0.18
+# 자모 원본 좌표의 글자 상자 크기 (y, z 모두 0 ~ 0.2)
+GLYPH_EXTENT = 0.2
+# 예전 makeStrings의 9칸 배치표 (y, z)
+LEGACY_CELLS = (
+    (-CELL_SIZE * 3, 0.0), (-CELL_SIZE * 2, 0.0), (-CELL_SIZE, 0.0),
+    (0.0, 0.0), (CELL_SIZE, 0.0), (CELL_SIZE * 2, 0.0),
+    (-CELL_SIZE * 3, -0.21), (-CELL_SIZE * 2, -CELL_SIZE), (-CELL_SIZE, -CELL_SIZE),
+)
+
+# 줄바꿈 문자 (칸을 차지하지 않는다)
+NEWLINE = "\n"
+
+
+class LayoutError(ValueError):
+    """글자가 작업 영역을 벗어날 때 발생하는 예외"""
+
+
+@dataclass(frozen=True)
+class Layout:
+    """글자 배치 설정 (bounds를 제외한 값은 스케일 적용 전 글자 좌표계)
+
+    Args:
+        pitch: (칸 간격 y, 줄 간격 z)
+        origin: 첫 줄 첫 칸의 위치 (y, z). 줄은 -z 방향으로 내려간다.
+        columns: 한 줄의 칸 수. None이면 bounds에서 계산
+        lines: 한 페이지의 줄 수. None이면 bounds에서 계산 (bounds도 없으면 무제한)
+        bounds: 작업 영역 ((y_min, y_max), (z_min, z_max)), 스케일 적용 후 좌표
+        cells: 첫 페이지 앞쪽 칸의 위치를 직접 지정 (예전 9칸 표 호환)
+    """
+
+    pitch: Tuple[float, float] = (CELL_SIZE, CELL_SIZE)
+    origin: Tuple[float, float] = (-CELL_SIZE * 3, 0.0)
+    columns: Optional[int] = 6
+    lines: Optional[int] = None
+    bounds: Optional[Tuple[Tuple[float, float], Tuple[float, float]]] = None
+    cells: Tuple[Tuple[float, float], ...] = ()
+
+
+# 기존 배치와 같은 결과를 내는 기본 배치 (9칸 이후는 같은 격자로 이어짐)
+DEFAULT_LAYOUT = Layout(cells=LEGACY_CELLS)
+
+
+class PlacedSyllable(NamedTuple):
+    index: int
+    character: str
+    page: int
+    line: int
+    column: int
+    strokes: np.ndarray
+
+
+class PlacedLine(NamedTuple):
+    page: int
+    line: int
+    characters: str
+    strokes: np.ndarray
+    # 획마다 이 줄 안의 글자 번호 (characters[syllable_index[i]]가 획 i의 글자)
+    syllable_index: np.ndarray
+
+
+def placed_characters(text) -> str:
+    """칸을 차지하는 글자만 순서대로 (syllable_index의 글자 번호가 가리키는 목록)"""
+    return "".join(a for a in text if a != NEWLINE)
+
+
+def as_layout(layout) -> Layout:
+    """Layout 혹은 (y, z) 배치표를 Layout으로 변환"""
+    if isinstance(layout, Layout):
+        return layout
+    return Layout(cells=tuple(tuple(c) for c in layout))
+
+
+class LayoutEngine:
+    """문자열을 칸/줄/페이지에 배치하면서 획을 한 글자(혹은 한 줄)씩 내보내는 엔진
+
+    입력은 길이를 몰라도 되는 iterable이며 전체 문자열의 획을 한꺼번에 만들지
+    않으므로, 긴 문서도 일정한 메모리로 그릴 수 있다.
+
+    Args:
+        compose: (글자 한 개, 현 오차) -> (N, 2, 3) 획 배열 함수 (예: puzzle.syllableArray)
+        layout: Layout 혹은 (y, z) 배치표
+        size: 전체 스케일 (y, z)
+        chord_tolerance (float): 곡선을 선분으로 나눌 때 허용 오차 (m, 스케일 적용 후).
+            글자가 작을수록 글자 좌표계 오차가 커져서 선분 수가 줄어든다.
+    """
+
+    def __init__(self, compose, layout=DEFAULT_LAYOUT, size=(0.7, 0.7), chord_tolerance=CHORD_TOLERANCE):
+        self.layout = as_layout(layout)
+        self.size = tuple(size)
+        tolerance = chord_tolerance / max(abs(s) for s in self.size)
+        self.compose = lambda a: compose(a, tolerance)
+        self.columns = self.layout.columns or self._fit(0)
+        self.lines = self.layout.lines or (self._fit(1) if self.layout.bounds else None)
+        if self.columns < 1 or (self.lines is not None and self.lines < 1):
+            raise LayoutError(f"layout leaves no room for a single cell: {self.layout}")
+
+    def _fit(self, axis):
+        """bounds 안에 들어가는 칸(axis=0) 혹은 줄(axis=1) 수"""
+        if self.layout.bounds is None:
+            raise LayoutError("columns must be set when no bounds are given")
+        lo, hi = self.layout.bounds[axis]
+        s = self.size[axis]
+        pitch = self.layout.pitch[axis] * s
+        if axis == 0:
+            first = self.layout.origin[0] * s
+            return int(np.floor((hi - GLYPH_EXTENT * s - first) / pitch + 1e-9)) + 1
+        return int(np.floor((self.layout.origin[1] * s - lo) / pitch + 1e-9)) + 1
+
+    def iter_cells(self, text):
+        """(index, 글자, page, line, column, (y, z) 이동량)을 차례로 내보내는 generator
+
+        '\\n'은 줄바꿈, 칸이 다 차면 자동 줄바꿈, 줄이 다 차면 다음 페이지로 넘어간다.
+        페이지마다 같은 작업 영역을 다시 사용한다.
+        """
+        pitch_y, pitch_z = self.layout.pitch
+        origin_y, origin_z = self.layout.origin
+        cells = self.layout.cells
+        line = column = 0
+        index = 0
+        for a in text:
+            if a == NEWLINE:
+                line, column = line + 1, 0
+                continue
+            if column >= self.columns:
+                line, column = line + 1, 0
+            page, page_line = (0, line) if self.lines is None else divmod(line, self.lines)
+            slot = line * self.columns + column
+            if page == 0 and slot < len(cells):
+                offset = cells[slot]
+            else:
+                offset = (origin_y + column * pitch_y, origin_z - page_line * pitch_z)
+            yield index, a, page, page_line, column, offset
+            index += 1
+            column += 1
+
+    def _affine(self, offset):
+        sy, sz = self.size
+        return ((sy, sz), (offset[0] * sy, offset[1] * sz))
+
+    def _outside(self, strokes):
+        """획마다 작업 영역을 벗어났는지 (bounds가 없으면 None)"""
+        if self.layout.bounds is None or not len(strokes):
+            return None
+        (y_min, y_max), (z_min, z_max) = self.layout.bounds
+        lo = strokes[..., 1:].min(axis=1)
+        hi = strokes[..., 1:].max(axis=1)
+        return (
+            (lo[:, 0] < y_min - 1e-9) | (hi[:, 0] > y_max + 1e-9)
+            | (lo[:, 1] < z_min - 1e-9) | (hi[:, 1] > z_max + 1e-9)
+        )
+
+    def _check_bounds(self, characters, strokes, syllable_index=None):
+        """작업 영역을 벗어난 획이 있으면 그 글자 이름으로 LayoutError
+        Args:
+            characters: 글자 한 개, 혹은 syllable_index가 가리키는 글자 목록
+            strokes (np.array): (N, 2, 3) 배치된 획
+            syllable_index (np.array): (N,) 획마다 글자 번호 (None이면 모두 characters 한 글자)
+        """
+        outside = self._outside(strokes)
+        if outside is None or not outside.any():
+            return
+        a = characters
+        if syllable_index is not None:
+            syllable = syllable_index[np.argmax(outside)]
+            a = characters[syllable]
+            strokes = strokes[syllable_index == syllable]
+        lo = strokes[..., 1:].min(axis=(0, 1))
+        hi = strokes[..., 1:].max(axis=(0, 1))
+        raise LayoutError(
+            f"'{a}' at y[{lo[0]:.3f}, {hi[0]:.3f}] z[{lo[1]:.3f}, {hi[1]:.3f}] is outside the workspace"
+        )
+
+    def iter_syllables(self, text):
+        """배치된 글자를 한 개씩 내보내는 generator
+        Yields:
+            PlacedSyllable: (index, character, page, line, column, strokes)
+        """
+        for index, a, page, line, column, offset in self.iter_cells(text):
+            strokes = transform(self.compose(a), self._affine(offset))
+            self._check_bounds(a, strokes)
+            yield PlacedSyllable(index, a, page, line, column, strokes)
+
+    def iter_lines(self, text):
+        """배치된 글자를 한 줄씩 모아 내보내는 generator
+        Yields:
+            PlacedLine: (page, line, characters, strokes, syllable_index)
+        """
+        key, chars, parts = None, [], []
+        for syllable in self.iter_syllables(text):
+            if key is not None and key != (syllable.page, syllable.line):
+                yield self._line(key, chars, parts)
+                chars, parts = [], []
+            key = (syllable.page, syllable.line)
+            chars.append(syllable.character)
+            parts.append(syllable.strokes)
+        if key is not None:
+            yield self._line(key, chars, parts)
+
+    @staticmethod
+    def _line(key, chars, parts):
+        syllable_index = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+        return PlacedLine(*key, "".join(chars), np.concatenate(parts), syllable_index)
+
+    def compile(self, text):
+        """문자열 전체를 한 번에 배치 (획 계획 컴파일용)
+        Returns:
+            tuple: ((N, 2, 3) 획 배열, (N,) 획마다 글자 번호)
+        """
+        characters, parts, affines = [], [], []
+        for _, a, _, _, _, offset in self.iter_cells(text):
+            characters.append(a)
+            parts.append(self.compose(a))
+            affines.append(self._affine(offset))
+        if not parts:
+            return empty_strokes(), np.empty(0, dtype=np.int64)
+        strokes = place(parts, affines)
+        syllable_index = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+        self._check_bounds(characters, strokes, syllable_index)
+        return strokes, syllable_index
@@ -0,0 +1,69 @@
+import numpy as np
+
+# 이 거리 이하로 떨어진 끝점/시작점은 같은 점으로 본다
+JOIN_TOLERANCE = 1e-6
+
+
+def merge_polylines(strokes, syllable_index=None, tolerance=JOIN_TOLERANCE):
+    """끝점이 다음 획의 시작점과 이어지는 획들을 하나의 polyline으로 합치는 함수
+
+    획 순서는 그대로 두고, 연속한 두 획이 (같은 글자 안에서) 맞닿아 있을 때만
+    합친다. 예를 들어 ㅇ의 19개 선분은 polyline 하나가 된다.
+
+    Args:
+        strokes (np.array): (N, 2, 3) 획 배열
+        syllable_index (np.array): (N,) 획마다 글자 번호 (다른 글자끼리는 합치지 않음)
+        tolerance (float): 같은 점으로 볼 거리
+    Returns:
+        tuple:
+            - vertices: (N + P, 3) 모든 polyline의 꼭짓점을 이어붙인 배열
+            - offsets: (P + 1,) polyline i의 꼭짓점은 vertices[offsets[i]:offsets[i + 1]]
+            - polyline_syllable: (P,) polyline마다 글자 번호
+    """
+    strokes = np.asarray(strokes, dtype=np.float64).reshape(-1, 2, 3)
+    n = len(strokes)
+    if syllable_index is None:
+        syllable_index = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return np.empty((0, 3)), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    gaps = np.linalg.norm(strokes[1:, 0] - strokes[:-1, 1], axis=1)
+    joined = (gaps <= tolerance) & (syllable_index[1:] == syllable_index[:-1])
+    # 새 polyline이 시작되는 획 번호
+    heads = np.flatnonzero(np.concatenate(([True], ~joined)))
+
+    # polyline마다 첫 획의 시작점 + 모든 획의 끝점
+    is_head = np.zeros(n, dtype=bool)
+    is_head[heads] = True
+    vertex_count = n + len(heads)
+    vertices = np.empty((vertex_count, 3))
+    # 획 i의 끝점 위치 = i + (i까지 시작된 polyline 수)
+    end_slots = np.arange(n) + np.cumsum(is_head)
+    vertices[end_slots] = strokes[:, 1]
+    vertices[end_slots[heads] - 1] = strokes[heads, 0]
+
+    offsets = np.empty(len(heads) + 1, dtype=np.int64)
+    offsets[:-1] = end_slots[heads] - 1
+    offsets[-1] = vertex_count
+    return vertices, offsets, np.asarray(syllable_index)[heads]
+
+
+def polyline_segments(vertices, offsets):
+    """polyline 꼭짓점 배열을 (선분, polyline별 선분 범위)로 펼치는 함수
+    Args:
+        vertices (np.array): (V, 3) 모든 polyline의 꼭짓점을 이어붙인 배열
+        offsets (np.array): (P + 1,) polyline i의 꼭짓점은 vertices[offsets[i]:offsets[i + 1]]
+    Returns:
+        tuple:
+            - segments: (V - P, 2, 3) 선분
+            - segment_offsets: (P + 1,) polyline i는 선분 segment_offsets[i] ~ segment_offsets[i + 1] - 1
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    # polyline 경계를 넘는 꼭짓점 쌍을 뺀 나머지가 선분
+    inner = np.ones(max(len(vertices) - 1, 0), dtype=bool)
+    inner[offsets[1:-1] - 1] = False
+    first = np.flatnonzero(inner)
+    segments = np.stack([vertices[first], vertices[first + 1]], axis=1)
+    # polyline i의 선분 수는 꼭짓점 수 - 1
+    return segments, offsets - np.arange(len(offsets))
@@ -0,0 +1,183 @@
+"""한글 음절 11,172자의 획을 미리 합성해 둔 memmap 아틀라스
+
+파일 구성 (asset/ 아래, 자동 생성):
+    stroke_atlas.bin        float32 (총 획 수, 2, 3) 획 버퍼
+    stroke_atlas.index.bin  int64 (11172, 2) 음절별 [offset, count]
+    stroke_atlas.json       형식 버전, 원본 해시, 크기 정보, 두 .bin 파일의 sha256
+
+오프라인 빌드:
+    python -m modules.stroke.stroke_atlas [--force]
+"""
+import os
+import sys
+import json
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+
+from modules.stroke.glyph_repository import DEFAULT_GLYPH_PATH
+from modules.stroke.curves import CHORD_TOLERANCE
+
+ATLAS_VERSION = 2
+SYLLABLE_BASE = 0xAC00  # 가
+SYLLABLE_COUNT = 11172  # 가 ~ 힣
+
+# 기본 전체 스케일(0.7)로 그릴 때 CHORD_TOLERANCE가 되는 글자 칸 좌표계 현 오차
+ATLAS_TOLERANCE = CHORD_TOLERANCE / 0.7
+
+ATLAS_DIR = os.path.dirname(DEFAULT_GLYPH_PATH)
+ATLAS_PREFIX = os.path.join(ATLAS_DIR, "stroke_atlas")
+
+
+def _paths(prefix):
+    return prefix + ".bin", prefix + ".index.bin", prefix + ".json"
+
+
+def _file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_hash(glyph_path=DEFAULT_GLYPH_PATH) -> str:
+    """아틀라스 원본(자모 JSON + 배치 규칙)의 sha256"""
+    from puzzle import CHOSEONG_PLACEMENT, UPPER_PLACEMENT, JONGSEONG_PLACEMENT
+
+    h = hashlib.sha256()
+    with open(glyph_path, "rb") as f:
+        h.update(f.read())
+    rules = (
+        ATLAS_VERSION,
+        ATLAS_TOLERANCE,
+        sorted(CHOSEONG_PLACEMENT.items()),
+        UPPER_PLACEMENT,
+        JONGSEONG_PLACEMENT,
+    )
+    h.update(repr(rules).encode())
+    return h.hexdigest()
+
+
+class StrokeAtlas:
+    """memmap으로 연 음절 획 아틀라스 (읽기 전용)"""
+
+    def __init__(self, prefix=ATLAS_PREFIX):
+        buffer_path, index_path, meta_path = _paths(prefix)
+        with open(meta_path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        total = self.meta["total_strokes"]
+        # 세 파일은 따로 교체되므로, 크기가 메타와 다르면 다른 빌드의 파일이 섞인 것
+        expected = {buffer_path: total * 2 * 3 * 4, index_path: SYLLABLE_COUNT * 2 * 8}
+        for path, size in expected.items():
+            if os.path.getsize(path) != size:
+                raise ValueError(f"{path}: {os.path.getsize(path)} bytes, expected {size}")
+        self.index = np.memmap(index_path, dtype=np.int64, mode="r", shape=(SYLLABLE_COUNT, 2))
+        # 획이 하나도 없으면 크기 0 memmap을 만들 수 없으므로 빈 배열 사용
+        self.strokes = (
+            np.memmap(buffer_path, dtype=np.float32, mode="r", shape=(total, 2, 3))
+            if total
+            else np.empty((0, 2, 3), dtype=np.float32)
+        )
+
+    def matches(self, tolerance) -> bool:
+        """요청한 곡선 현 오차로 만든 아틀라스인지 (None은 기본값)"""
+        return tolerance is None or np.isclose(tolerance, self.meta["tolerance"], rtol=1e-9, atol=0.0)
+
+    def __contains__(self, a):
+        return 0 <= ord(a) - SYLLABLE_BASE < SYLLABLE_COUNT
+
+    def syllable(self, a) -> np.ndarray:
+        """음절 한 개의 획 (복사 없이 memmap을 자른 view)
+        Args:
+            a: 한글 음절 한 개 (가 ~ 힣)
+        Returns:
+            np.array: (N, 2, 3) float32 읽기 전용 view
+        """
+        offset, count = self.index[ord(a) - SYLLABLE_BASE]
+        return self.strokes[offset : offset + count]
+
+
+def build_stroke_atlas(prefix=ATLAS_PREFIX, glyph_path=DEFAULT_GLYPH_PATH) -> dict:
+    """모든 음절을 합성해 아틀라스 파일을 만드는 함수
+    Args:
+        prefix: 출력 파일 경로 접두사
+        glyph_path: 원본 자모 JSON (해시 기록용)
+    Returns:
+        dict: 기록한 메타 정보
+    """
+    from puzzle import makeStrokeArray
+
+    index = np.zeros((SYLLABLE_COUNT, 2), dtype=np.int64)
+    parts = []
+    offset = 0
+    for i in range(SYLLABLE_COUNT):
+        strokes = makeStrokeArray(chr(SYLLABLE_BASE + i), ATLAS_TOLERANCE)
+        index[i] = offset, len(strokes)
+        offset += len(strokes)
+        parts.append(strokes)
+    buffer = np.concatenate(parts).astype(np.float32)
+
+    meta = {
+        "version": ATLAS_VERSION,
+        "source_sha256": source_hash(glyph_path),
+        "syllables": SYLLABLE_COUNT,
+        "tolerance": ATLAS_TOLERANCE,
+        "total_strokes": int(offset),
+        "buffer_sha256": hashlib.sha256(buffer.tobytes()).hexdigest(),
+        "index_sha256": hashlib.sha256(index.tobytes()).hexdigest(),
+    }
+    # 다른 프로세스가 반쯤 쓴 파일을 열지 않도록 임시 파일에 쓰고 교체
+    # (파일마다 따로 교체되므로 읽는 쪽은 메타의 sha256으로 같은 빌드인지 확인한다)
+    for path, payload in zip(_paths(prefix), (buffer, index, meta)):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if isinstance(payload, dict):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+        else:
+            payload.tofile(tmp_path)
+        os.replace(tmp_path, path)
+    return meta
+
+
+def _is_current(prefix, glyph_path):
+    buffer_path, index_path, meta_path = _paths(prefix)
+    if not all(os.path.exists(p) for p in _paths(prefix)):
+        return False
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != ATLAS_VERSION or meta.get("source_sha256") != source_hash(glyph_path):
+            return False
+        # 교체 도중에 읽었거나 빌드가 중간에 멈췄으면 .bin이 메타와 다른 빌드일 수 있다
+        return (
+            meta.get("buffer_sha256") == _file_hash(buffer_path)
+            and meta.get("index_sha256") == _file_hash(index_path)
+        )
+    except (OSError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def open_stroke_atlas(prefix=ATLAS_PREFIX, glyph_path=DEFAULT_GLYPH_PATH):
+    """아틀라스를 열어 반환 (원본 해시가 바뀌었으면 다시 빌드)
+    Returns:
+        StrokeAtlas: 열린 아틀라스, 빌드할 수 없으면 None (직접 합성으로 대체)
+    """
+    try:
+        if not _is_current(prefix, glyph_path):
+            print(f"[stroke_atlas] rebuilding {prefix}.bin")
+            build_stroke_atlas(prefix, glyph_path)
+        return StrokeAtlas(prefix)
+    except (OSError, ValueError) as e:
+        print(f"[stroke_atlas] atlas unavailable, composing on the fly: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    if "--force" in sys.argv[1:] or not _is_current(ATLAS_PREFIX, DEFAULT_GLYPH_PATH):
+        meta = build_stroke_atlas()
+        print(f"Built {ATLAS_PREFIX}.bin: {meta['total_strokes']} strokes, {meta['syllables']} syllables")
+    else:
+        print(f"{ATLAS_PREFIX}.bin is up to date")
@@ -0,0 +1,137 @@
+from functools import lru_cache
+
+import numpy as np
+
+from puzzle import syllableArray, DEFAULT_LAYOUT, DEFAULT_SCALE
+from modules.stroke.layout import LayoutEngine, as_layout, placed_characters
+from modules.stroke.polyline import merge_polylines
+from modules.stroke.travel_optimizer import optimize_plan
+
+# 동시에 유지할 컴파일된 획 계획 수
+PLAN_CACHE_SIZE = 16
+
+
+class StrokePlan:
+    """한 작업(문자열, 배치, 스케일) 동안 변하지 않는 컴파일된 획 계획
+
+    모든 획을 (N, 2, 3) 읽기 전용 배열로 보관하므로
+    틱마다 획을 조회하는 비용은 인덱싱 한 번이다.
+    """
+
+    __slots__ = (
+        "text", "syllables", "layout", "size", "strokes", "starts", "ends", "syllable_index",
+        "vertices", "polyline_offsets", "polyline_syllable", "travel_report",
+    )
+
+    def __init__(self, text, layout, size, strokes, syllable_index=None, travel_report=None):
+        strokes = np.ascontiguousarray(strokes, dtype=np.float64).reshape(-1, 2, 3)
+        strokes.setflags(write=False)
+        if syllable_index is None:
+            syllable_index = np.zeros(len(strokes), dtype=np.int64)
+        syllable_index = np.ascontiguousarray(syllable_index, dtype=np.int64)
+        syllable_index.setflags(write=False)
+        object.__setattr__(self, "text", text)
+        # 칸을 차지하는 글자 (줄바꿈 제외), syllable_index는 이 문자열의 번호
+        object.__setattr__(self, "syllables", placed_characters(text))
+        object.__setattr__(self, "layout", layout)
+        object.__setattr__(self, "size", size)
+        # 획 순서 최적화 결과 (최적화하지 않았으면 None)
+        object.__setattr__(self, "travel_report", travel_report)
+        object.__setattr__(self, "strokes", strokes)
+        object.__setattr__(self, "starts", strokes[:, 0])
+        object.__setattr__(self, "ends", strokes[:, 1])
+        # 획마다 몇 번째 글자의 획인지
+        object.__setattr__(self, "syllable_index", syllable_index)
+        # 맞닿은 획을 합친 polyline (펜을 들지 않고 이어서 그릴 단위)
+        vertices, offsets, polyline_syllable = merge_polylines(strokes, syllable_index)
+        for name, array in (
+            ("vertices", vertices),
+            ("polyline_offsets", offsets),
+            ("polyline_syllable", polyline_syllable),
+        ):
+            array.setflags(write=False)
+            object.__setattr__(self, name, array)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StrokePlan is immutable")
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def polyline_count(self):
+        return len(self.polyline_offsets) - 1
+
+    def polyline(self, index):
+        """polyline 하나의 꼭짓점
+        Args:
+            index (int): polyline 번호
+        Returns:
+            np.array: (M, 3) 읽기 전용 view (M >= 2)
+        """
+        return self.vertices[self.polyline_offsets[index] : self.polyline_offsets[index + 1]]
+
+
+def _freeze(value):
+    """리스트/배열을 캐시 키로 쓸 수 있는 tuple로 변환"""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile(text, layout, size, order, allow_reverse) -> StrokePlan:
+    strokes, syllable_index = LayoutEngine(syllableArray, layout, size).compile(text)
+    plan = StrokePlan(text, layout, size, strokes, syllable_index)
+    if order is None:
+        return plan
+    strokes, syllable_index, report = optimize_plan(plan, order, allow_reverse)
+    return StrokePlan(text, layout, size, strokes, syllable_index, report)
+
+
+def compile_stroke_plan(
+    character_list, layout=DEFAULT_LAYOUT, size=DEFAULT_SCALE, order=None, allow_reverse=False
+) -> StrokePlan:
+    """(문자열, 배치, 스케일, 순서 최적화) 키마다 한 번만 획 계획을 컴파일하는 함수
+    Args:
+        character_list: 그릴 한글 문자열 (str 혹은 글자 리스트)
+        layout: Layout 혹은 글자별 이동량(y, z) 표
+        size: 전체 스케일(y, z)
+        order (str): 펜 업 이동 최적화 제약 단계 ("strict" / "syllable" / "free"),
+            None이면 JSON 순서 그대로
+        allow_reverse (bool): 최적화할 때 획 방향 뒤집기 허용 여부
+    Returns:
+        StrokePlan: 캐시된 불변 획 계획 (최적화 결과는 travel_report, 출력은 호출하는 쪽에서)
+    """
+    # str은 해시값을 저장해 두므로 틱마다 호출해도 키 계산이 문자열 길이와 무관하다
+    text = character_list if isinstance(character_list, str) else "".join(character_list)
+    return _compile(text, as_layout(layout), _freeze(size), order, allow_reverse)
+
+
+def iter_stroke_plans(
+    character_list, layout=DEFAULT_LAYOUT, size=DEFAULT_SCALE, order=None, allow_reverse=False
+):
+    """문자열을 한 줄씩 컴파일한 획 계획을 차례로 내보내는 generator
+
+    compile_stroke_plan과 달리 문자열 전체의 획을 한꺼번에 만들지 않으므로 긴 문서도 한 줄 분량의
+    메모리로 그릴 수 있다 (StreamingFollower 참고). 캐시하지 않고, 순서 최적화도 줄마다 따로 한다.
+
+    Args:
+        character_list: 그릴 한글 문자열 (str, 글자 리스트 혹은 글자 iterable)
+        layout, size, order, allow_reverse: compile_stroke_plan과 같음
+    Yields:
+        StrokePlan: 한 줄의 획 계획 (text는 그 줄의 글자, syllable_index는 줄 안의 글자 번호)
+    """
+    layout = as_layout(layout)
+    size = _freeze(size)
+    for line in LayoutEngine(syllableArray, layout, size).iter_lines(character_list):
+        plan = StrokePlan(line.characters, layout, size, line.strokes, line.syllable_index)
+        if order is not None:
+            strokes, syllable_index, report = optimize_plan(plan, order, allow_reverse)
+            plan = StrokePlan(line.characters, layout, size, strokes, syllable_index, report)
+        yield plan
+
+
+def clear_plan_cache() -> None:
+    """컴파일된 획 계획 캐시 비우기 (korean.json 수정 후 등)"""
+    _compile.cache_clear()
@@ -0,0 +1,299 @@
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from modules.robot_control.sim_rates import PEN_UP_SPEED, PHYSICS_DT
+
+# 획 순서 제약 단계
+STRICT = "strict"  # 필순 그대로 (방향 뒤집기만 허용 가능)
+SYLLABLE = "syllable"  # 글자 순서는 유지, 글자 안에서만 순서 변경
+FREE = "free"  # 문구 전체에서 자유롭게 순서 변경
+ORDER_LEVELS = (STRICT, SYLLABLE, FREE)
+
+
+class TravelReport(NamedTuple):
+    level: str
+    allow_reverse: bool
+    before: float  # 최적화 전 펜 업 이동 거리 (m)
+    after: float  # 최적화 후 펜 업 이동 거리 (m)
+    ticks_saved: float  # 추정 절약 틱 수
+
+    def summary(self) -> str:
+        ratio = 100.0 * (1.0 - self.after / self.before) if self.before > 0 else 0.0
+        return (
+            f"[{self.level}{', reverse' if self.allow_reverse else ''}] pen-up travel "
+            f"{self.before:.3f} m -> {self.after:.3f} m ({ratio:.1f}% less), "
+            f"~{self.ticks_saved:.0f} ticks saved"
+        )
+
+
+def _endpoints(starts, ends, order, flipped):
+    """순서/방향을 적용한 획마다 (들어가는 점, 나오는 점)"""
+    entry = np.where(flipped[:, None], ends[order], starts[order])
+    exit_ = np.where(flipped[:, None], starts[order], ends[order])
+    return entry, exit_
+
+
+def travel_distance(starts, ends, order=None, flipped=None, origin=None) -> float:
+    """획 사이를 펜을 들고 이동하는 총 거리
+    Args:
+        starts, ends (np.array): (K, 3) 획(혹은 polyline)의 시작점, 끝점
+        order (np.array): 그리는 순서 (기본: 그대로)
+        flipped (np.array): 획마다 방향을 뒤집었는지 (기본: 모두 False)
+        origin (np.array): 첫 획 전 펜 위치 (None이면 첫 획부터 계산)
+    """
+    k = len(starts)
+    if k == 0:
+        return 0.0
+    order = np.arange(k) if order is None else np.asarray(order)
+    flipped = np.zeros(k, dtype=bool) if flipped is None else np.asarray(flipped)
+    entry, exit_ = _endpoints(starts, ends, order, flipped)
+    total = np.linalg.norm(entry[1:] - exit_[:-1], axis=1).sum()
+    if origin is not None:
+        total += np.linalg.norm(entry[0] - origin)
+    return float(total)
+
+
+def _best_directions(starts, ends, origin):
+    """순서가 고정일 때 방향만 고르는 최적해 (2-상태 동적 계획법)"""
+    k = len(starts)
+    points = np.stack([starts, ends], axis=1)  # [i][0=정방향 입구, 1=역방향 입구]
+    exits = points[:, ::-1]
+    cost = (
+        np.zeros(2)
+        if origin is None
+        else np.linalg.norm(points[0] - origin, axis=1)
+    )
+    back = np.zeros((k, 2), dtype=np.int64)
+    for i in range(1, k):
+        # step[a, b]: 이전 획 방향 a -> 현재 획 방향 b
+        step = np.linalg.norm(exits[i - 1][:, None, :] - points[i][None, :, :], axis=2)
+        total = cost[:, None] + step
+        back[i] = np.argmin(total, axis=0)
+        cost = total[back[i], [0, 1]]
+    flipped = np.zeros(k, dtype=bool)
+    flipped[-1] = bool(np.argmin(cost))
+    for i in range(k - 1, 0, -1):
+        flipped[i - 1] = bool(back[i][int(flipped[i])])
+    return flipped
+
+
+def _greedy(starts, ends, origin, allow_reverse):
+    """가장 가까운 획부터 고르는 초기 순서"""
+    k = len(starts)
+    remaining = np.ones(k, dtype=bool)
+    order = np.empty(k, dtype=np.int64)
+    flipped = np.zeros(k, dtype=bool)
+    position = starts[0] if origin is None else origin
+    for n in range(k):
+        d_start = np.where(remaining, np.linalg.norm(starts - position, axis=1), np.inf)
+        d_end = (
+            np.where(remaining, np.linalg.norm(ends - position, axis=1), np.inf)
+            if allow_reverse
+            else np.full(k, np.inf)
+        )
+        i_start, i_end = int(np.argmin(d_start)), int(np.argmin(d_end))
+        if d_end[i_end] < d_start[i_start]:
+            order[n], flipped[n], position = i_end, True, starts[i_end]
+        else:
+            order[n], position = i_start, ends[i_start]
+        remaining[order[n]] = False
+    return order, flipped
+
+
+def _two_opt(starts, ends, order, flipped, origin, max_passes):
+    """구간 뒤집기(2-opt). 구간을 뒤집으면 각 획의 방향도 뒤집힌다."""
+    k = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(k):
+            entry, exit_ = _endpoints(starts, ends, order, flipped)
+            prev = origin if i == 0 else exit_[i - 1]
+            j = np.arange(i, k)
+            has_next = j + 1 < k
+            next_entry = entry[np.minimum(j + 1, k - 1)]
+            old = np.linalg.norm(exit_[j] - next_entry, axis=1) * has_next
+            new = np.linalg.norm(entry[i] - next_entry, axis=1) * has_next
+            if prev is not None:
+                old = old + np.linalg.norm(entry[i] - prev)
+                new = new + np.linalg.norm(exit_[j] - prev, axis=1)
+            gain = old - new
+            m = int(np.argmax(gain))
+            if gain[m] > 1e-12:
+                end = i + m
+                order[i : end + 1] = order[i : end + 1][::-1]
+                flipped[i : end + 1] = ~flipped[i : end + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return order, flipped
+
+
+def _relocate(starts, ends, order, flipped, origin, max_passes):
+    """획 하나를 떼어서 다른 위치에 끼워넣기 (방향은 유지)"""
+    k = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for p in range(k):
+            entry, exit_ = _endpoints(starts, ends, order, flipped)
+            # 자리 q의 앞/뒤 점 (q = 0..k, p를 뺀 나머지 기준). 없는 점은 거리 0
+            pred = np.vstack((np.zeros(3) if origin is None else origin, exit_))
+            succ = np.vstack((entry, np.zeros(3)))
+            pred_valid = np.ones(k + 1, dtype=bool)
+            pred_valid[0] = origin is not None
+            succ_valid = np.ones(k + 1, dtype=bool)
+            succ_valid[-1] = False
+
+            # p를 빼면 p의 앞 점(pred[p])과 뒤 점(succ[p + 1])이 바로 이어진다
+            removal_gain = (
+                pred_valid[p] * np.linalg.norm(pred[p] - entry[p])
+                + succ_valid[p + 1] * np.linalg.norm(exit_[p] - succ[p + 1])
+                - (pred_valid[p] & succ_valid[p + 1]) * np.linalg.norm(pred[p] - succ[p + 1])
+            )
+            # p를 뺀 배열에서 q번째 자리(q = 0..k-1)에 넣는 비용
+            keep = np.ones(k + 1, dtype=bool)
+            keep[p + 1] = False
+            r_pred, r_pred_valid = pred[keep], pred_valid[keep]
+            keep = np.ones(k + 1, dtype=bool)
+            keep[p] = False
+            r_succ, r_succ_valid = succ[keep], succ_valid[keep]
+            insert = (
+                r_pred_valid * np.linalg.norm(r_pred - entry[p], axis=1)
+                + r_succ_valid * np.linalg.norm(exit_[p] - r_succ, axis=1)
+                - (r_pred_valid & r_succ_valid) * np.linalg.norm(r_pred - r_succ, axis=1)
+            )
+            q = int(np.argmin(insert))
+            if removal_gain - insert[q] > 1e-12:
+                item, flip = order[p], flipped[p]
+                order = np.insert(np.delete(order, p), q, item)
+                flipped = np.insert(np.delete(flipped, p), q, flip)
+                improved = True
+        if not improved:
+            break
+    return order, flipped
+
+
+def _optimize_group(starts, ends, origin, allow_reverse, max_passes):
+    if len(starts) == 1:
+        flipped = np.zeros(1, dtype=bool)
+        if allow_reverse and origin is not None:
+            flipped[0] = np.linalg.norm(ends[0] - origin) < np.linalg.norm(starts[0] - origin)
+        return np.zeros(1, dtype=np.int64), flipped
+    order, flipped = _greedy(starts, ends, origin, allow_reverse)
+    if allow_reverse:
+        order, flipped = _two_opt(starts, ends, order, flipped, origin, max_passes)
+    order, flipped = _relocate(starts, ends, order, flipped, origin, max_passes)
+    # 탐욕/지역 탐색이 원래 순서보다 나쁘면 원래 순서 유지
+    identity = np.arange(len(starts))
+    keep = _best_directions(starts, ends, origin) if allow_reverse else np.zeros(len(starts), dtype=bool)
+    if travel_distance(starts, ends, identity, keep, origin) <= travel_distance(starts, ends, order, flipped, origin):
+        return identity, keep
+    return order, flipped
+
+
+def optimize_order(starts, ends, groups=None, level=SYLLABLE, allow_reverse=False, max_passes=20):
+    """펜 업 이동 거리가 최소가 되도록 획 순서와 방향을 고르는 함수
+    Args:
+        starts, ends (np.array): (K, 3) 획(혹은 polyline)의 시작점, 끝점
+        groups (np.array): (K,) 획마다 글자 번호 (같은 번호끼리 연속이어야 함)
+        level (str): "strict" / "syllable" / "free"
+        allow_reverse (bool): 획 방향 뒤집기 허용 여부
+        max_passes (int): 지역 탐색 최대 반복 수
+    Returns:
+        tuple: (order, flipped) 새 순서와 획마다 방향 뒤집기 여부
+    """
+    if level not in ORDER_LEVELS:
+        raise ValueError(f"level must be one of {ORDER_LEVELS}, got {level!r}")
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    k = len(starts)
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+
+    if level == STRICT:
+        order = np.arange(k)
+        flipped = _best_directions(starts, ends, None) if allow_reverse else np.zeros(k, dtype=bool)
+        return order, flipped
+    if level == FREE or groups is None:
+        return _optimize_group(starts, ends, None, allow_reverse, max_passes)
+
+    groups = np.asarray(groups)
+    bounds = np.flatnonzero(np.diff(groups)) + 1
+    orders, flips = [], []
+    origin = None
+    for chunk in np.split(np.arange(k), bounds):
+        order, flipped = _optimize_group(starts[chunk], ends[chunk], origin, allow_reverse, max_passes)
+        orders.append(chunk[order])
+        flips.append(flipped)
+        last = chunk[order[-1]]
+        origin = starts[last] if flipped[-1] else ends[last]
+    order, flipped = np.concatenate(orders), np.concatenate(flips)
+    # 글자마다 따로 최적화하면 글자의 끝점이 바뀌어 다음 글자로의 이동이 늘 수 있다
+    keep = _best_directions(starts, ends, None) if allow_reverse else np.zeros(k, dtype=bool)
+    if travel_distance(starts, ends, None, keep) < travel_distance(starts, ends, order, flipped):
+        return np.arange(k), keep
+    return order, flipped
+
+
+def estimate_ticks(distance, speed=PEN_UP_SPEED, physics_dt=PHYSICS_DT) -> float:
+    """펜을 든 이동 거리를 물리 틱 수로 환산"""
+    return distance / speed / physics_dt
+
+
+def optimize_plan(plan, level=SYLLABLE, allow_reverse=False, unit="polyline", speed=PEN_UP_SPEED, physics_dt=PHYSICS_DT):
+    """컴파일된 획 계획의 순서/방향을 최적화한 새 획 배열을 만드는 함수
+    Args:
+        plan (StrokePlan): 원래 획 계획
+        level (str): 획 순서 제약 단계
+        allow_reverse (bool): 획 방향 뒤집기 허용 여부
+        unit (str): "polyline"이면 이어진 선분 묶음을, "segment"면 선분 하나를 단위로 이동
+        speed, physics_dt: 틱 절약량 추정용 펜 업 속도와 물리 주기
+    Returns:
+        tuple: ((N, 2, 3) 새 획 배열, (N,) 획마다 글자 번호, TravelReport)
+    """
+    if unit == "polyline":
+        offsets = plan.polyline_offsets
+        starts = plan.vertices[offsets[:-1]]
+        ends = plan.vertices[offsets[1:] - 1]
+        groups = plan.polyline_syllable
+        # polyline i에 속한 선분 번호: offsets[i] - i ... offsets[i + 1] - i - 2
+        segment_ranges = [
+            np.arange(offsets[i] - i, offsets[i + 1] - i - 1) for i in range(len(offsets) - 1)
+        ]
+    elif unit == "segment":
+        starts, ends, groups = plan.starts, plan.ends, plan.syllable_index
+        segment_ranges = [np.array([i]) for i in range(len(plan))]
+    else:
+        raise ValueError(f"unit must be 'polyline' or 'segment', got {unit!r}")
+
+    order, flipped = optimize_order(starts, ends, groups, level, allow_reverse)
+    before = travel_distance(starts, ends)
+    after = travel_distance(starts, ends, order, flipped)
+
+    index = [segment_ranges[i][::-1] if f else segment_ranges[i] for i, f in zip(order, flipped)]
+    index = np.concatenate(index) if index else np.empty(0, dtype=np.int64)
+    flip_segment = np.concatenate(
+        [np.full(len(segment_ranges[i]), f) for i, f in zip(order, flipped)]
+    ) if len(order) else np.empty(0, dtype=bool)
+    strokes = plan.strokes[index]
+    strokes = np.where(flip_segment[:, None, None], strokes[:, ::-1], strokes)
+
+    report = TravelReport(
+        level, allow_reverse, before, after,
+        estimate_ticks(before - after, speed, physics_dt),
+    )
+    return strokes, plan.syllable_index[index], report
+
+
+if __name__ == "__main__":
+    # 사용법: python -m modules.stroke.travel_optimizer [문자열]
+    from modules.stroke.stroke_plan import compile_stroke_plan
+
+    text = sys.argv[1] if len(sys.argv) > 1 else "융합프로젝트공모전"
+    plan = compile_stroke_plan(text)
+    for level in ORDER_LEVELS:
+        for allow_reverse in (False, True):
+            for unit in ("segment", "polyline"):
+                _, _, report = optimize_plan(plan, level, allow_reverse, unit)
+                print(f"{unit:8s} {report.summary()}")
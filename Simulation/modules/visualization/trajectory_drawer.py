@@ -1,9 +1,11 @@
 import random
-from isaacsim.util.debug_draw import _debug_draw
 
 
 class TrajectoryDrawer:
-    """궤적을 시각화하기 위한 Debug 클래스"""
+    """궤적을 시각화하기 위한 Debug 클래스
+
+    initialize()를 부르지 않으면 Debug Draw 없이 point_list 버퍼만 관리한다 (Isaac Sim 없는 백엔드).
+    """
 
     def __init__(self):
         self.draw = None
@@ -17,6 +19,8 @@ class TrajectoryDrawer:
 
     def initialize(self):
         """Debug Draw 인터페이스 초기화"""
+        from isaacsim.util.debug_draw import _debug_draw
+
         self.draw = _debug_draw.acquire_debug_draw_interface()
 
     def update_drawing(self, position, draw_offset=[0, 0, 0]):
@@ -30,13 +34,14 @@ class TrajectoryDrawer:
         # 포인트 리스트에 현재 위치 추가 (주기적으로)
         self.point_list.append(tuple(position + draw_offset))
 
-        # 가끔씩 라인 정리
-        if len(self.point_list) % 10 == 0:
-            self.draw.clear_lines()
+        if self.draw is not None:
+            # 가끔씩 라인 정리
+            if len(self.point_list) % 10 == 0:
+                self.draw.clear_lines()
 
-        # 경로 그리기
-        if len(self.point_list) != 0:
-            self.draw.draw_lines_spline(self.point_list, self.colors, 5, False)
+            # 경로 그리기
+            if len(self.point_list) != 0:
+                self.draw.draw_lines_spline(self.point_list, self.colors, 5, False)
 
         # 버퍼 크기 관리
         if len(self.point_list) > 70:
@@ -1,25 +1,47 @@
-from isaacsim import SimulationApp
+import argparse
 
-simulation_app = SimulationApp({"headless": False})
-
-from isaacsim.core.api import World
-from isaacsim.core.utils.prims import get_prim_at_path
-from isaacsim.core.utils.viewports import set_camera_view
-from isaacsim.core.utils.stage import get_current_stage
-from pxr import UsdGeom
-
-from controllers.rmpflow_controller import RMPFlowController
-from modules.visualization.trajectory_drawer import TrajectoryDrawer
-from modules.robot_control.fr3_follow import FR3Follow
-from new_korean import generate_korean_character
+from modules.data.dataset_store import DatasetStore
+from modules.data.episode_recorder import EpisodeRecorder
+from modules.robot_control.fr3_kinematics import JOINT_COUNT, tcp_position
+from modules.robot_control.ik_compiler import CACHE_STATS
+from modules.robot_control.preflight import preflight
+from modules.robot_control.sim_backend import BACKENDS, get_backend
+from modules.robot_control.sim_rates import (
+    DEFAULT_RATES,
+    PEN_DOWN_HEIGHT,
+    SimulationClock,
+    TargetInterpolator,
+)
+from modules.stroke.stroke_plan import compile_stroke_plan
+from new_korean import create_follower, create_joint_trajectory, create_timed_trajectory
 
 import numpy as np
-import h5py
 
 
 class DrawingApp:
-    def __init__(self, character_list, original_position, draw_scale=1.5):
-        self.simulation_app = simulation_app
+    def __init__(
+        self,
+        character_list,
+        original_position,
+        draw_scale=1.5,
+        stroke_mode="segment",
+        stroke_order=None,
+        allow_reverse=False,
+        timing="reactive",
+        motion_limits=None,
+        blend_radius=0.0,
+        rates=DEFAULT_RATES,
+        backend=None,
+        dataset_path="joints_state.h5",
+        store=None,
+        stream=False,
+    ):
+        # 시뮬레이터 백엔드: None이면 Isaac Sim (KinematicBackend는 Isaac Sim 없이 NumPy로 돌린다)
+        self.backend = get_backend("isaac") if backend is None else backend
+        self.simulation_app = self.backend.app
+        self.dataset_path = dataset_path
+        # DatasetStore를 주면 dataset_path 대신 저장소에 에피소드를 하나 추가한다
+        self.store = store
         self.world = None
         self.my_task = None
         self.my_franka = None
@@ -29,26 +51,97 @@ class DrawingApp:
         self.character_list = character_list
         self.original_position = np.array(original_position)
         self.draw_scale = draw_scale
+        self.stroke_mode = stroke_mode  # "segment" 혹은 "polyline" (꼭짓점에서 펜을 들지 않음)
+        self.stroke_order = stroke_order  # None / "strict" / "syllable" / "free"
+        self.allow_reverse = allow_reverse
+        self.blend_radius = blend_radius  # polyline 꼭짓점을 포물선으로 깎는 최대 거리 (m)
+        # reactive 모드에서 획 계획을 한 줄씩 컴파일하며 그리기 (긴 문서용, timed / ik는 전체를 미리 만든다)
+        self.stream = stream and timing == "reactive"
         self.current_stroke = 0
         self.reset_needed = False
-        
-        self.recorded_qpos = []
-        self.ee_pose_data = []
+        # 물리/컨트롤러/궤적 목표/렌더링 주기 (SimulationRates)
+        self.rates = rates
+        self.clock = SimulationClock(rates)
+        # 궤적 목표 사이를 컨트롤러 주기로 보간 (ik 모드는 관절 목표를 보간)
+        self.command = TargetInterpolator(JOINT_COUNT if timing == "ik" else 3)
+        # 획 궤적 추종 상태 기계 (앱마다 하나씩, 전역 상태 없음)
+        # timing이 "timed"이면 motion_limits(MotionLimits)로 미리 시간 매개변수화한 궤적을 재생,
+        # "ik"이면 그 궤적을 오프라인 IK로 풀어 둔 관절 목표를 RMPFlow 없이 바로 재생
+        self.timing = timing
+        if timing == "ik":
+            self.follower = create_joint_trajectory(
+                character_list,
+                self.original_position,
+                limits=motion_limits,
+                mode=stroke_mode,
+                stroke_order=stroke_order,
+                allow_reverse=allow_reverse,
+                blend_radius=blend_radius,
+                physics_dt=rates.target_dt,
+            )
+            print(f"[JOINT TRAJECTORY] {self.follower.summary()}")
+            print(f"[JOINT TRAJECTORY] {CACHE_STATS.summary()}")
+        elif timing == "timed":
+            self.follower = create_timed_trajectory(
+                character_list,
+                self.original_position,
+                limits=motion_limits,
+                mode=stroke_mode,
+                stroke_order=stroke_order,
+                allow_reverse=allow_reverse,
+                blend_radius=blend_radius,
+                physics_dt=rates.target_dt,
+            )
+            print(f"[TIMED TRAJECTORY] {self.follower.summary()}")
+        else:
+            self.follower = create_follower(
+                character_list,
+                self.original_position,
+                draw_scale=draw_scale,
+                mode=stroke_mode,
+                stroke_order=stroke_order,
+                allow_reverse=allow_reverse,
+                blend_radius=blend_radius,
+                stream=self.stream,
+            )
+
+        # 스트리밍이면 전체 획 계획을 만들지 않으므로 순서 최적화 요약과 사전 점검을 건너뛴다
+        if not self.stream:
+            # 펜 업 이동 최적화 결과 (캐시된 획 계획이므로 다시 컴파일하지 않는다)
+            plan = compile_stroke_plan(character_list, order=stroke_order, allow_reverse=allow_reverse)
+            if plan.travel_report is not None:
+                print(f"[STROKE ORDER] {plan.travel_report.summary()}")
+
+            # 그리기 전에 모든 경유점의 도달 가능 여부와 조작성(특이점 근처 칸) 확인
+            report = preflight(
+                character_list,
+                self.original_position,
+                stroke_order=stroke_order,
+                allow_reverse=allow_reverse,
+                mode=stroke_mode,
+                blend_radius=blend_radius,
+            )
+            print(f"[PREFLIGHT] {report.summary()}")
+
+        # 에피소드 기록기 (run()에서 연다) 와 이번 틱의 궤적 목표 위치
+        self.recorder = None
+        self.target = np.full(3, np.nan)
 
 
     def setup_world(self):
-        """Initializes the Isaac Sim world and sets up the camera."""
-        self.world = World(stage_units_in_meters=1.0)
+        """Initializes the simulation world and sets up the camera."""
+        # 루프 한 번 = 물리 스텝 한 번 (렌더링 여부는 루프에서 고른다)
+        self.world = self.backend.create_world(self.rates)
         eye_position = [1.0, 0.0, 0.8]
         target_position = [0.0, 0.0, 0.0]
         camera_prim_path = "/OmniverseKit_Persp"
-        set_camera_view(
+        self.backend.set_camera_view(
             eye=eye_position, target=target_position, camera_prim_path=camera_prim_path
         )
 
     def setup_task(self):
         """Adds the FR3Follow task to the world."""
-        self.my_task = FR3Follow(name="drawing_task", target_position=self.original_position)
+        self.my_task = self.backend.create_task("drawing_task", self.original_position)
         self.world.add_task(self.my_task)
         self.world.reset()
         task_params = self.world.get_task("drawing_task").get_params()
@@ -61,52 +154,71 @@ class DrawingApp:
         self.my_franka.set_joints_default_state(positions=joints_default_positions)
 
     def setup_controllers(self):
-        """Initializes the RMPFlow controller."""
-        self.my_controller = RMPFlowController(
-            name="target_follower_controller", robot_articulation=self.my_franka
+        """Initializes the RMPFlow controller (or the backend's equivalent)."""
+        self.my_controller = self.backend.create_controller(
+            "target_follower_controller", self.my_franka, self.rates.control_dt
         )
 
     def setup_drawers(self):
         """Initializes the trajectory drawers."""
-        self.ee_drawer = TrajectoryDrawer()
-        self.ee_drawer.initialize()
-        self.paper_drawer = TrajectoryDrawer()
-        self.paper_drawer.initialize()
-
-    def get_end_effector_position(self):
-        """FR3 로봇의 엔드 이펙터 위치 가져오기"""
-        stage = get_current_stage()
-        ee_prim = get_prim_at_path("/World/FR3/fr3_hand_tcp")
-        if ee_prim:
-            xform = UsdGeom.Xformable(ee_prim)
-            world_transform = xform.ComputeLocalToWorldTransform(0)
-            return world_transform.ExtractTranslation()
-        return None
-
-    def record_step(self):
+        self.ee_drawer = self.backend.create_drawer()
+        self.paper_drawer = self.backend.create_drawer()
+
+    def get_end_effector_position(self, joint_positions=None):
+        """FR3 로봇의 엔드 이펙터(fr3_hand_tcp) 위치 가져오기
+
+        USD prim 변환을 조회하지 않고 관절 값으로 정기구학을 계산한다.
+
+        Args:
+            joint_positions (np.array): 관절 각도 (None이면 로봇에서 읽는다)
+        Returns:
+            np.array: 엔드 이펙터 월드 위치 [x, y, z]
+        """
+        if joint_positions is None:
+            joint_positions = self.my_franka.get_joint_positions()
+        return tcp_position(joint_positions)
+
+    def episode_attrs(self) -> dict:
+        """에피소드 설정 (데이터셋 속성으로 남긴다)"""
+        return {
+            "text": "".join(self.character_list),
+            "original_position": self.original_position,
+            "draw_scale": self.draw_scale,
+            "stroke_mode": self.stroke_mode,
+            "stroke_order": self.stroke_order,
+            "allow_reverse": self.allow_reverse,
+            "timing": self.timing,
+            "blend_radius": self.blend_radius,
+            "stream": self.stream,
+            # 스트리밍이면 지금까지 읽은 줄의 획 수 (save_dataset에서 다시 쓴다)
+            "stroke_count": self.follower.stroke_count,
+        }
+
+    def open_recorder(self):
+        """dataset_path (혹은 저장소의 새 에피소드)에 조금씩 붙여 쓰는 HDF5 기록기 열기"""
+        if self.store is not None:
+            self.recorder = self.store.open_episode(self.episode_attrs(), self.rates.physics_dt)
+            self.dataset_path = f"{self.recorder.group.file.filename}:{self.recorder.group.name}"
+        else:
+            self.recorder = EpisodeRecorder(
+                self.dataset_path, physics_dt=self.rates.physics_dt, attrs=self.episode_attrs()
+            )
+
+    def record_step(self, stroke, phase):
+        """이번 틱의 관절 값, 엔드 이펙터 위치, 궤적 목표, 획 번호, 단계를 기록"""
         qpos = self.my_franka.get_joint_positions()
         qpos = qpos[:-1]
 
-        ee_pos = self.get_end_effector_position()
-        self.ee_pose_data.append(ee_pos)
-        self.recorded_qpos.append(qpos)
-    
-    def save_dataset(self, filename='dataset.h5'):
-        print("Checking recorded image shapes...")
-        all_shapes_match = True
-        if all_shapes_match:
-            try:
-                qpos_array = np.array(self.recorded_qpos, dtype=np.float64)
-                ee_pose_array = np.array(self.ee_pose_data ,dtype=np.float64)
-
-                with h5py.File(filename, 'w') as f:
-                    f.create_dataset('action', data=qpos_array, dtype='float64')
-                    f.create_dataset('ee_pose', data=ee_pose_array , dtype='float64')
-                print(f"Dataset saved to {filename}")
-            except Exception as e:
-                print(f"Error during saving: {e}")
-        else:
-            print("Dataset not saved due to image shape mismatch.")
+        ee_pos = self.get_end_effector_position(qpos)
+        self.recorder.record(self.clock.step_index, qpos, ee_pos, self.target, stroke, phase)
+
+    def save_dataset(self, complete=True):
+        """남은 기록을 쓰고 데이터셋 파일을 닫는다"""
+        try:
+            self.recorder.close(complete=complete, attrs={"stroke_count": self.follower.stroke_count})
+            print(f"Dataset saved to {self.dataset_path} ({self.recorder.length} ticks)")
+        except Exception as e:
+            print(f"Error during saving: {e}")
 
     def run(self):
         """Main simulation loop."""
@@ -114,9 +226,11 @@ class DrawingApp:
         self.setup_task()
         self.setup_controllers()
         self.setup_drawers()
+        self.open_recorder()
         articulation_controller = self.my_franka.get_articulation_controller()
         while self.simulation_app.is_running():
-            self.world.step(render=True)
+            # 멈춰 있을 때는 UI가 돌도록 항상 렌더링
+            self.world.step(render=self.clock.render_due or not self.world.is_playing())
 
             if self.world.is_stopped() and not self.reset_needed:
                 self.reset_needed = True
@@ -127,48 +241,97 @@ class DrawingApp:
                     self.my_controller.reset()
                     self.reset_needed = False
                     self.current_stroke = 0
+                    self.follower.reset()
+                    self.clock.reset()
+                    self.command.reset()
+                    self.target[:] = np.nan
 
-                observations = self.world.get_observations()
- 
+                is_stroke_complete = False
+                # 이번 틱의 획 번호와 단계 (follower.step()이 바꾸기 전 값)
+                stroke, phase = self.current_stroke, self.follower.state
                 ee_pos = self.get_end_effector_position()
                 if ee_pos is not None:
                     self.ee_drawer.update_drawing(ee_pos)
-                    if ee_pos[2] < 0.205:
+                    if ee_pos[2] < PEN_DOWN_HEIGHT:
                         self.paper_drawer.update_drawing(ee_pos)
 
-                    trajectory, is_stroke_complete ,len_char = generate_korean_character(
-                        self.character_list,
-                        current_stroke=self.current_stroke,
-                        draw_scale=self.draw_scale,
-                        ee_pos=ee_pos,
-                        original_position=self.original_position,
-                    )
-                    if trajectory is not None:
-                        self.my_task.set_cube_pose(trajectory)
-                        actions = self.my_controller.forward(
-                            target_end_effector_position=trajectory,
-                            target_end_effector_orientation=observations[self.target_name][
-                                "orientation"
-                            ],
+                    # 새 궤적 목표는 target_decimation 컨트롤러 갱신마다 한 번
+                    if self.clock.target_due:
+                        trajectory, is_stroke_complete = self.follower.step(
+                            np.asarray(ee_pos), current_stroke=self.current_stroke
                         )
+                        if trajectory is not None:
+                            self.my_task.set_cube_pose(trajectory)
+                            np.copyto(self.target, trajectory)
+                            if self.timing == "ik":
+                                trajectory = self.follower.joint_target
+                        self.command.push(trajectory)
+
+                    # 컨트롤러는 control_decimation 물리 스텝마다, 목표 사이는 보간
+                    if self.clock.control_due and self.command.active:
+                        command = self.command.sample(self.clock.target_phase)
+                        if self.timing == "ik":
+                            actions = self.backend.joint_action(command, np.arange(JOINT_COUNT))
+                        else:
+                            observations = self.world.get_observations()
+                            actions = self.my_controller.forward(
+                                target_end_effector_position=command,
+                                target_end_effector_orientation=observations[self.target_name][
+                                    "orientation"
+                                ],
+                            )
                         articulation_controller.apply_action(actions)
-                        self.record_step()
-                        
-                    if is_stroke_complete:
-                        self.current_stroke += 1
-                        print(f"[STROKE UPDATE] current_stroke: {self.current_stroke}")
-                        print(f"[STROKE UPDATE] length_stroke: {len_char}")
+                    if self.command.active:
+                        self.record_step(stroke, phase)
+                self.clock.advance()
+                self.on_stroke_complete(is_stroke_complete)
+
+        # 끝까지 그리기 전에 창을 닫았으면 그때까지의 기록을 남긴다
+        if not self.recorder.closed:
+            self.save_dataset(complete=False)
 
-                        if self.current_stroke == len_char:
-                            print("Saving the dataset...")
-                            self.save_dataset(filename='joints_state.h5')
-                            print("Simulation run completed. Data saved.")
-                            is_stroke_complete = False
-                            self.simulation_app.close()
+    def on_stroke_complete(self, is_stroke_complete):
+        """획이 끝났으면 획 번호를 올리고, 마지막 획이면 데이터셋을 저장하고 종료"""
+        if not is_stroke_complete:
+            return
+        len_char = self.follower.stroke_count
+        self.current_stroke += 1
+        print(f"[STROKE UPDATE] current_stroke: {self.current_stroke}")
+        print(f"[STROKE UPDATE] length_stroke: {len_char}")
+
+        if self.current_stroke == len_char:
+            print("Saving the dataset...")
+            self.save_dataset()
+            print("Simulation run completed. Data saved.")
+            self.simulation_app.close()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw Hangul with the FR3")
+    parser.add_argument("--backend", choices=BACKENDS, default="isaac",
+                        help="kinematic: NumPy 기구학 시뮬레이션 (Isaac Sim 없이)")
+    parser.add_argument("--headless", action="store_true", help="Isaac Sim 창 없이 실행")
+    parser.add_argument("--output", default="joints_state.h5", help="저장할 데이터셋 경로")
+    parser.add_argument("--store", help="덮어쓰지 않고 에피소드를 추가할 데이터셋 저장소 디렉터리")
+    parser.add_argument("--shard-prefix", default="shard", help="저장소 샤드 파일 이름 (동시 실행마다 다르게)")
+    parser.add_argument("--stream", action="store_true", help="획 계획을 한 줄씩 컴파일하며 그리기 (긴 문서용)")
+    args = parser.parse_args()
+
+    if args.backend == "isaac":
+        backend = get_backend("isaac", headless=args.headless)
+    else:
+        backend = get_backend(args.backend)
     character_list = ["융", "합", "프", "로", "젝", "트", "공", "모", "전"]
     original_position = [0.5, 0, 0.2]
-    drawing_app = DrawingApp(character_list, original_position)
-    drawing_app.run()
\ No newline at end of file
+    store = DatasetStore(args.store, prefix=args.shard_prefix) if args.store else None
+    drawing_app = DrawingApp(
+        character_list,
+        original_position,
+        backend=backend,
+        dataset_path=args.output,
+        store=store,
+        stream=args.stream,
+    )
+    drawing_app.run()
+    if store is not None:
+        store.close()
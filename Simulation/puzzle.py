@@ -1,11 +1,13 @@
-import os, json
+import numpy as np
 
-# korean.json 열기
-script_path = os.path.abspath(__file__)
-json_path = os.path.dirname(script_path)
-json_path += "/asset/korean.json"
-with open(json_path, encoding="utf-8") as f:
-    data = json.load(f)
+from modules.stroke.glyph_repository import get_glyph_repository, HORIZONTAL, VERTICAL
+from modules.stroke.geometry import IDENTITY, compose, empty_strokes, place, to_dicts, transform
+from modules.stroke.stroke_atlas import ATLAS_TOLERANCE, SYLLABLE_BASE, SYLLABLE_COUNT, open_stroke_atlas
+from modules.stroke.layout import DEFAULT_LAYOUT, LayoutEngine
+from modules.stroke.hangul_codec import split_syllable
+
+# korean.json은 GlyphRepository가 한 번만 읽고 색인한다
+glyphs = get_glyph_repository()
 
 
 def find_by_name(character_name, key):
@@ -19,11 +21,16 @@ def find_by_name(character_name, key):
         "kind":
             list: [자음 모음, (모음 종류)]
     """
-    for character in data["characters"]:
-        if character["name"] == character_name:
-            return character[key]
+    glyph = glyphs.get(character_name)
+    if glyph is None:
+        return None
+    if key == "path":
+        return to_dicts(glyph.path)
+    if key == "kind":
+        return list(glyph.kind)
     return None
 
+
 def get_coordinate(i):
     """stroke 정보를 좌표 리스트로 바꾸는 함수
     Args:
@@ -46,194 +53,153 @@ def splitCharacter(a) -> list:
             자음 한 개 혹은 모음 한 개일 경우 그 문자 하나 든 리스트
             받침이 없을 경우 [자음, 모음]
     """
-    a = int(ord(a))
-    son = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', "ㅃ", 
-           'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-    mom = ['ㅏ','ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 
-           'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 
-           'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ']
-    support = ['ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 
-               'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 
-               'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-    arr = []
-    if a >= ord('가'):
-        a -= ord('가')
-        arr.append(son[a // (len(mom) * (len(support) + 1))])
-        a %= len(mom) * (len(support) + 1)
-        arr.append(mom[a // (len(support) + 1)])
-        a %= len(support) + 1
-        if a:
-            arr.append(support[a - 1])
-    else:
-        arr.append(chr(a))
+    return list(split_syllable(a))
 
-    return arr
 
+# 초성 배치 (중성 방향별): ((y 스케일, z 스케일), (y 이동, z 이동))
+CHOSEONG_PLACEMENT = {
+    HORIZONTAL: ((0.6, 0.8), (0.0, 0.02)),  # 오른쪽 모음(ㅏ, ㅓ ...) 왼쪽에 배치
+    VERTICAL: ((0.8, 0.6), (0.02, 0.06)),  # 아래 모음(ㅗ, ㅜ ...) 위에 배치
+}
+# 받침이 있으면 초성 + 중성을 위쪽으로 압축
+UPPER_PLACEMENT = ((1.0, 0.65), (0.0, 0.07))
+# 받침(종성) 배치
+JONGSEONG_PLACEMENT = ((0.8, 0.35), (0.02, 0.0))
 
-def makeStrokes(a) -> list:
+
+def makeStrokeArray(a, tolerance=None) -> np.ndarray:
     """한글 한 글자의 자음, 모음 받침을 스케일링하고 결합하는 함수
     Args:
         a: 그릴 한글 문자 한 개
+        tolerance (float): 곡선(ㅇ, ㅎ 등)을 나눌 현 오차 (글자 칸 좌표계).
+            자모마다 배치 스케일로 나눠서 적용하므로 작게 그려지는 자모일수록
+            선분 수가 줄어든다. None이면 자모 기본값
     Returns:
-        list: 한글 한 글자를 그리기 위한 획 리스트
+        np.array: 한글 한 글자를 그리기 위한 (N, 2, 3) 획 배열
     """
     characters = splitCharacter(a)
-    strokes = []
-    
+
     if len(characters) == 1:
-        stroke = find_by_name(characters[0], "path")
-        for i in stroke:
-            strokes.append(get_coordinate(i))
-    
-    elif len(characters) == 2:
-        kind_info = find_by_name(characters[1], "kind")
-        
-        if kind_info is None:
-            print(f"Warning: No kind info for '{characters[1]}'")
-            return strokes
-        
-        elif kind_info[1] == 0:
-            stroke = find_by_name(characters[0], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-            for i in strokes:
-                i[0][1] = i[0][1] * 0.6
-                i[1][1] = i[1][1] * 0.6
-                i[0][2] = i[0][2] * 0.8 + 0.02
-                i[1][2] = i[1][2] * 0.8 + 0.02
-                
-            # 중성 이동 적용 (예외 처리 추가)
-            stroke = find_by_name(characters[1], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-        
-        elif kind_info[1] == 1:
-            stroke = find_by_name(characters[0], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-            for i in strokes:
-                i[0][1] = i[0][1] * 0.8 + 0.02
-                i[1][1] = i[1][1] * 0.8 + 0.02
-                i[0][2] = i[0][2] * 0.6 + 0.06
-                i[1][2] = i[1][2] * 0.6 + 0.06
-            
-            # 중성 이동 적용 (예외 처리 추가)
-            stroke = find_by_name(characters[1], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-    
-    elif len(characters) == 3:
-        kind_info = find_by_name(characters[1], "kind")
-        
-        if kind_info is None:
-            print(f"Warning: No kind info for '{characters[1]}'")
-            return strokes
-        
-        elif kind_info[1] == 0:
-            stroke = find_by_name(characters[0], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-            for i in strokes:
-                i[0][1] = i[0][1] * 0.6
-                i[1][1] = i[1][1] * 0.6
-                i[0][2] = i[0][2] * 0.8 + 0.02
-                i[1][2] = i[1][2] * 0.8 + 0.02
-                
-            # 중성 이동 적용 (예외 처리 추가)
-            stroke = find_by_name(characters[1], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-        
-        elif kind_info[1] == 1:
-            stroke = find_by_name(characters[0], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-            for i in strokes:
-                i[0][1] = i[0][1] * 0.8 + 0.02
-                i[1][1] = i[1][1] * 0.8 + 0.02
-                i[0][2] = i[0][2] * 0.6 + 0.06
-                i[1][2] = i[1][2] * 0.6 + 0.06
-            
-            # 중성 이동 적용 (예외 처리 추가)
-            stroke = find_by_name(characters[1], "path")
-            for i in stroke:
-                strokes.append(get_coordinate(i))
-        
-        for i in strokes:
-            i[0][2] = i[0][2] * 0.65 + 0.07
-            i[1][2] = i[1][2] * 0.65 + 0.07
-        
-        _strokes = []
-        stroke = find_by_name(characters[2], "path")
-        for i in stroke:
-            _strokes.append(get_coordinate(i))
-        for i in _strokes:
-            i[0][1] = i[0][1] * 0.8 + 0.02
-            i[1][1] = i[1][1] * 0.8 + 0.02
-            i[0][2] = i[0][2] * 0.35
-            i[1][2] = i[1][2] * 0.35
-        strokes.extend(_strokes)
-
-    dict = []
-    for i in range(len(strokes)):
-        dict.append({"start": strokes[i][0], "end": strokes[i][1]})
-    return dict
+        path = glyphs.path(characters[0], tolerance)
+        return empty_strokes() if path is None else np.array(path)
+
+    kind_info = glyphs.kind(characters[1])
+    if kind_info is None:
+        print(f"Warning: No kind info for '{characters[1]}'")
+        return empty_strokes()
+
+    names, affines = [], []
+    placement = CHOSEONG_PLACEMENT.get(kind_info[1])
+    if placement is not None:
+        names += characters[:2]
+        affines += [placement, IDENTITY]
+
+    if len(characters) == 3:
+        affines = [compose(affine, UPPER_PLACEMENT) for affine in affines]
+        names.append(characters[2])
+        affines.append(JONGSEONG_PLACEMENT)
+
+    parts = [
+        glyphs.path(name, None if tolerance is None else tolerance / max(affine[0]))
+        for name, affine in zip(names, affines)
+    ]
+    return place(parts, affines)
+
+
+def syllableArray(a, tolerance=None) -> np.ndarray:
+    """미리 합성된 아틀라스에서 한 글자의 획을 가져오는 함수
+    Args:
+        a: 그릴 한글 문자 한 개
+        tolerance (float): 곡선을 나눌 현 오차 (글자 칸 좌표계).
+            아틀라스와 다른 값이면 직접 합성한다. None이면 음절은 아틀라스 오차(ATLAS_TOLERANCE)
+    Returns:
+        np.array: (N, 2, 3) 획 배열 (음절이면 아틀라스의 읽기 전용 view)
+    """
+    atlas = open_stroke_atlas()
+    if atlas is not None and a in atlas and atlas.matches(tolerance):
+        return atlas.syllable(a)
+    # 아틀라스를 열 수 없어도 (새로 받은 트리 등) 아틀라스와 같은 선분으로 나눈다
+    if tolerance is None and 0 <= ord(a) - SYLLABLE_BASE < SYLLABLE_COUNT:
+        tolerance = ATLAS_TOLERANCE
+    return makeStrokeArray(a, tolerance)
+
+
+def makeStrokes(a) -> list:
+    """한글 한 글자의 자음, 모음 받침을 스케일링하고 결합하는 함수
+    Args:
+        a: 그릴 한글 문자 한 개
+    Returns:
+        list: 한글 한 글자를 그리기 위한 획 리스트
+    """
+    return to_dicts(makeStrokeArray(a))
 
 
 def scale(stroke, y, z) -> None:
     """글자 크기를 조절하는 함수
     Args:
-        stroke: 스케일링 할 획 리스트
+        stroke (np.array): 스케일링 할 (N, 2, 3) 획 배열 (제자리에서 수정)
         y: y축 스케일
         z: z축 스케일
     """
-    for i in stroke:
-        i[0][1] = i[0][1] * y
-        i[1][1] = i[1][1] * y
-        i[0][2] = i[0][2] * z
-        i[1][2] = i[1][2] * z
+    stroke[..., 1:] *= (y, z)
     return
 
 
-def move(a, m) -> list:
+def move(a, m) -> np.ndarray:
     """한글 한 글자씩 translate하는 함수
     Args:
         a: 옮길 한글 글자 한 개
         m (list): 옮길 양(y, z)
     Returns:
-        list: 해당 글자의 모든 획
+        np.array: 해당 글자의 모든 획 (N, 2, 3)
     """
-    _strokes = []
-    stroke = makeStrokes(a)
-    for i in stroke:
-        _strokes.append(get_coordinate(i))
-    for i in _strokes:
-        i[0][1] = i[0][1] + m[0]
-        i[1][1] = i[1][1] + m[0]
-        i[0][2] = i[0][2] + m[1]
-        i[1][2] = i[1][2] + m[1]
-    return _strokes
-
-
-def makeStrings(list) -> dict:
-    """한글 한 글자의 자음, 모음 받침을 분리하는 함수
+    return transform(makeStrokeArray(a), ((1.0, 1.0), m))
+
+
+# 기본 전체 스케일 (y, z)
+DEFAULT_SCALE = (0.7, 0.7)
+
+
+def makeStringArray(list, layout=DEFAULT_LAYOUT, size=DEFAULT_SCALE) -> np.ndarray:
+    """한글 문자열의 모든 글자를 배치하고 획을 합치는 함수
+
+    글자 이동(move) 후 전체 스케일(scale)은 글자마다
+    ((sy, sz), (my * sy, mz * sz)) 변환 하나로 합쳐서 한 번에 적용한다.
+
     Args:
         list: 출력할 한글 문자열
+        layout: Layout 혹은 글자별 이동량(y, z) 표
+        size: 전체 스케일(y, z)
+    Returns:
+        np.array: 문자열을 합친 모든 획 (N, 2, 3)
+    """
+    return LayoutEngine(syllableArray, layout, size).compile(list)[0]
+
+
+def streamStrings(list, layout=DEFAULT_LAYOUT, size=DEFAULT_SCALE, by_line=False):
+    """문자열을 한 글자(혹은 한 줄)씩 배치해서 내보내는 generator
+    Args:
+        list: 출력할 한글 문자열 (길이 제한 없음, 파일 등 iterable 가능)
+        layout: Layout 혹은 글자별 이동량(y, z) 표
+        size: 전체 스케일(y, z)
+        by_line (bool): True면 한 줄씩 내보냄
+    Yields:
+        PlacedSyllable 혹은 PlacedLine
+    """
+    engine = LayoutEngine(syllableArray, layout, size)
+    if by_line:
+        yield from engine.iter_lines(list)
+    else:
+        yield from engine.iter_syllables(list)
+
+
+def makeStrings(list, layout=DEFAULT_LAYOUT, size=DEFAULT_SCALE) -> dict:
+    """한글 문자열의 모든 글자를 배치하고 획을 합치는 함수
+    Args:
+        list: 출력할 한글 문자열
+        layout: Layout 혹은 글자별 이동량(y, z) 표
+        size: 전체 스케일(y, z)
     Returns:
         dict: 문자열을 합친 모든 획
     """
-    k = 0.18    # 글자 한 칸 가로, 세로 길이
-    # 글자 배치
-    c = [
-        [-k * 3, 0.0], [-k * 2, 0.0], [-k, 0.0], 
-        [0.0, 0.0], [k, 0.0], [k * 2, 0.0], 
-        [-k * 3, -0.21], [-k * 2, -k], [-k, -k]
-    ]
-    strokes = []
-    for i in range(len(list)):
-        strokes.extend(move(list[i], c[i]))
-    scale(strokes, 0.7, 0.7)
-    dict = []
-    for i in range(len(strokes)):
-        dict.append({"start": strokes[i][0], "end": strokes[i][1]})
-    return dict
\ No newline at end of file
+    return to_dicts(makeStringArray(list, layout, size))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈을 Simulation/ 기준으로 import한다 (python main.py와 같은 경로)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
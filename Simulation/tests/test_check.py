@@ -0,0 +1,20 @@
+import h5py
+import numpy as np
+
+import check
+
+
+def test_tree_reports_unreadable_paths(tmp_path, capsys):
+    good = tmp_path / "good.h5"
+    with h5py.File(good, "w") as f:
+        f.create_dataset("action", data=np.zeros((3, 8)))
+    missing = tmp_path / "missing.h5"
+    not_hdf5 = tmp_path / "notes.h5"
+    not_hdf5.write_text("not an HDF5 file")
+
+    assert check.main(["--tree", str(missing), str(not_hdf5), str(good)]) == 0
+    out = capsys.readouterr().out
+    assert f"{missing}: unreadable" in out
+    assert f"{not_hdf5}: unreadable" in out
+    assert f"Contents of {good}:" in out
+    assert check.main(["--tree", "--strict", str(missing)]) == 1
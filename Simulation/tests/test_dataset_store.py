@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from modules.data.dataset_store import (
+    CURRENT_NAME,
+    WINDOW_KEYS,
+    DatasetStore,
+    H5Source,
+    MemmapSource,
+    WindowLoader,
+    pack_memmap,
+    read_index,
+)
+
+LENGTHS = (50, 1500, 300, 7, 129)
+
+
+@pytest.fixture
+def store_root(tmp_path):
+    rng = np.random.default_rng(0)
+    root = str(tmp_path / "store")
+    with DatasetStore(root, episodes_per_shard=2) as store:
+        for e, n in enumerate(LENGTHS):
+            recorder = store.open_episode({"text": f"t{e}"}, chunk_rows=64)
+            for t in range(n):
+                recorder.record(t, rng.normal(size=8), rng.normal(size=3), rng.normal(size=3), t // 10, t % 3)
+            recorder.close()
+    return root
+
+
+def test_memmap_windows_match_h5(store_root):
+    pack_memmap(store_root)
+    h5 = H5Source(store_root, cache_bytes=64 * 1024)
+    memmap = MemmapSource(os.path.join(store_root, "packed"))
+    assert [e["id"] for e in memmap.entries] == [e["id"] for e in read_index(store_root)]
+
+    rng = np.random.default_rng(1)
+    window = 32
+    lengths = np.array(LENGTHS)
+    episodes = np.flatnonzero(lengths >= window)
+    for _ in range(20):
+        chosen = rng.choice(episodes, size=16)
+        starts = rng.integers(0, lengths[chosen] - window + 1)
+        for name in WINDOW_KEYS:
+            np.testing.assert_array_equal(
+                memmap.windows(name, chosen, starts, window), h5.windows(name, chosen, starts, window)
+            )
+    # 에피소드 하나를 통째로 읽어도 같다 (chunk 경계를 여러 번 넘는다)
+    for name in WINDOW_KEYS:
+        np.testing.assert_array_equal(memmap.read(1, name, 0, 1500), h5.read(1, name, 0, 1500))
+    h5.close()
+    memmap.close()
+
+
+def test_window_loader_batches_agree(store_root):
+    pack_memmap(store_root)
+    loaders = [
+        WindowLoader(H5Source(store_root), 16, batch_size=8, seed=3),
+        WindowLoader(MemmapSource(os.path.join(store_root, "packed")), 16, batch_size=8, seed=3),
+    ]
+    assert len(loaders[0]) == len(loaders[1])
+    for _ in range(5):
+        h5_batch, memmap_batch = (loader.sample() for loader in loaders)
+        for name in WINDOW_KEYS:
+            np.testing.assert_array_equal(h5_batch[name], memmap_batch[name])
+
+
+def test_repacking_swaps_the_current_build(store_root):
+    packed = os.path.join(store_root, "packed")
+    first = pack_memmap(store_root)
+    opened = MemmapSource(packed)
+    second = pack_memmap(store_root, entries=read_index(store_root)[:2])
+    third = pack_memmap(store_root)
+    with open(os.path.join(packed, CURRENT_NAME), encoding="utf-8") as f:
+        assert f.read() == third["build"]
+    # 새로 연 소스는 마지막 빌드, 가린 빌드 하나만 남는다
+    assert MemmapSource(packed).meta["build"] == third["build"]
+    assert sorted(os.listdir(packed)) == sorted([CURRENT_NAME, second["build"], third["build"]])
+    assert first["build"] not in os.listdir(packed)
+    # 먼저 열어 둔 소스는 지워진 빌드라도 자기 파일을 계속 읽는다
+    assert opened.meta["build"] == first["build"]
+    assert opened.windows("action", np.array([0]), np.array([0]), 4).shape == (1, 4, 8)
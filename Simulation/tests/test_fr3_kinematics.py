@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from modules.robot_control.fr3_kinematics import (
+    JOINT_COUNT,
+    JOINT_LOWER,
+    JOINT_UPPER,
+    REST_POSITIONS,
+    forward_kinematics,
+    jacobian,
+    tcp_position,
+)
+from modules.robot_control.ik_compiler import (
+    DRAW_ORIENTATION,
+    ORIENTATION_TOLERANCE,
+    POSITION_TOLERANCE,
+    solve_ik,
+    solve_ik_batch,
+)
+
+# 관절 범위 안의 임의 자세 (특이점 근처를 피하려고 범위 가운데 70%만)
+rng = np.random.default_rng(0)
+_MIDDLE = 0.5 * (JOINT_LOWER + JOINT_UPPER)
+_HALF = 0.35 * (JOINT_UPPER - JOINT_LOWER)
+POSES = np.vstack([REST_POSITIONS, _MIDDLE + _HALF * rng.uniform(-1.0, 1.0, (8, JOINT_COUNT))])
+STEP = 1e-6
+
+
+def test_rest_pose():
+    np.testing.assert_allclose(tcp_position(REST_POSITIONS), [0.4506, 0.0, 0.5583], atol=1e-4)
+
+
+def test_tcp_position_matches_forward_kinematics():
+    expected = forward_kinematics(POSES)[:, :3, 3]
+    # 여러 자세를 한 번에 (배열 경로), 하나씩 (float 경로)
+    np.testing.assert_allclose(tcp_position(POSES), expected, atol=1e-12)
+    for q, p in zip(POSES, expected):
+        np.testing.assert_allclose(tcp_position(q), p, atol=1e-12)
+
+
+def test_base_position_offsets_the_tcp():
+    base = np.array([0.1, -0.2, 0.3])
+    np.testing.assert_allclose(tcp_position(POSES, base), tcp_position(POSES) + base, atol=1e-12)
+    np.testing.assert_allclose(
+        forward_kinematics(POSES, base)[:, :3, 3], tcp_position(POSES) + base, atol=1e-12
+    )
+
+
+def test_finger_joints_are_ignored():
+    with_fingers = np.hstack([POSES, np.full((len(POSES), 2), 0.04)])
+    np.testing.assert_allclose(tcp_position(with_fingers), tcp_position(POSES), atol=1e-12)
+
+
+@pytest.mark.parametrize("q", POSES)
+def test_jacobian_matches_finite_differences(q):
+    J = jacobian(q)
+    T = forward_kinematics(q)
+    for i in range(JOINT_COUNT):
+        dq = np.zeros(JOINT_COUNT)
+        dq[i] = STEP
+        plus, minus = forward_kinematics(q + dq), forward_kinematics(q - dq)
+        # 선속도: 위치의 중앙 차분
+        linear = (plus[:3, 3] - minus[:3, 3]) / (2.0 * STEP)
+        np.testing.assert_allclose(J[:3, i], linear, atol=1e-6)
+        # 각속도: dR/dq R^T의 반대칭 성분
+        skew = (plus[:3, :3] - minus[:3, :3]) / (2.0 * STEP) @ T[:3, :3].T
+        angular = 0.5 * np.array([skew[2, 1] - skew[1, 2], skew[0, 2] - skew[2, 0], skew[1, 0] - skew[0, 1]])
+        np.testing.assert_allclose(J[3:, i], angular, atol=1e-6)
+
+
+def test_jacobian_batch_matches_single():
+    J = jacobian(POSES)
+    assert J.shape == (len(POSES), 6, JOINT_COUNT)
+    for q, expected in zip(POSES, J):
+        np.testing.assert_allclose(jacobian(q), expected, atol=1e-12)
+
+
+# 펜을 내리고 그리는 높이 근처의 글자 하나 크기 경로 (로봇 좌표)
+_t = np.linspace(0.0, 1.0, 60)
+PATH = np.stack([0.5 - 0.1 * _t, 0.1 * np.sin(2.0 * np.pi * _t), 0.2 + 0.05 * _t], axis=1)
+
+
+def _assert_solved(q, targets, pos_err, ori_err):
+    assert pos_err.max() <= POSITION_TOLERANCE
+    assert ori_err.max() <= ORIENTATION_TOLERANCE
+    # 돌려준 오차가 실제 FK 결과와 맞는지
+    tcp = forward_kinematics(q)
+    np.testing.assert_allclose(np.linalg.norm(tcp[:, :3, 3] - targets, axis=1), pos_err, atol=1e-9)
+    np.testing.assert_allclose(tcp[:, :3, :3], np.broadcast_to(DRAW_ORIENTATION, (len(q), 3, 3)), atol=1e-3)
+    assert np.all(q >= JOINT_LOWER) and np.all(q <= JOINT_UPPER)
+
+
+def test_solve_ik_follows_path():
+    q, pos_err, ori_err = solve_ik(PATH)
+    assert q.shape == (len(PATH), 7)
+    _assert_solved(q, PATH, pos_err, ori_err)
+    # 이웃한 틱의 해가 이어진다 (가지를 갈아타지 않는다)
+    assert np.abs(np.diff(q, axis=0)).max() < 0.1
+
+
+def test_solve_ik_batch_independent_targets():
+    targets = PATH[::7]
+    q, pos_err, ori_err = solve_ik_batch(targets)
+    _assert_solved(q, targets, pos_err, ori_err)
+
+
+def test_solutions_respect_joint_limits_at_workspace_edge():
+    # 멀리 있는 목표는 다 닿지 못해도 관절 범위는 지킨다
+    targets = np.array([[0.85, 0.0, 0.2], [0.3, 0.6, 0.1], [0.2, -0.5, 0.6]])
+    q, _, _ = solve_ik_batch(targets)
+    assert np.all(q >= JOINT_LOWER) and np.all(q <= JOINT_UPPER)
+
+
+def test_empty_targets():
+    q, pos_err, ori_err = solve_ik(np.empty((0, 3)))
+    assert q.shape == (0, 7) and pos_err.shape == (0,) and ori_err.shape == (0,)
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pytest
+
+from modules.stroke.glyph_repository import GlyphSchemaError, get_glyph_repository
+
+LINE = {"start": [0.0, 0.0, 0.1], "end": [0.0, 0.1, 0.1]}
+
+
+def write_glyphs(tmp_path, characters):
+    path = tmp_path / "glyphs.json"
+    path.write_text(json.dumps({"characters": characters}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_default_file_has_valid_kinds():
+    repository = get_glyph_repository()
+    assert repository.kind("ㄱ") == ("son",)
+    assert repository.kind("ㅏ")[0] == "mom"
+
+
+@pytest.mark.parametrize("entry", [{}, {"kind": "unknown"}, {"kind": ["mom"]}])
+def test_strict_mode_rejects_bad_kind(tmp_path, entry):
+    path = write_glyphs(tmp_path, [dict(name="ㄱ", path=[LINE], **entry)])
+    with pytest.raises(GlyphSchemaError):
+        get_glyph_repository(path)
+
+
+def test_lenient_mode_ignores_kind(tmp_path):
+    # Langgraph/Hangeul.py가 kind를 빠뜨린 LLM 응답에 쓰는 형식
+    path = write_glyphs(
+        tmp_path,
+        [
+            {"name": "ㄱ", "path": [LINE]},
+            {"name": "ㅏ", "kind": "unknown", "path": [LINE, LINE]},
+            {"name": "ㄴ", "kind": ["son"], "path": [LINE]},
+        ],
+    )
+    repository = get_glyph_repository(path, require_kind=False)
+    assert len(repository) == 3
+    assert repository.kind("ㄱ") is None and repository.kind("ㅏ") is None
+    assert repository.kind("ㄴ") == ("son",)
+    np.testing.assert_array_equal(repository.all_paths(), [[LINE["start"], LINE["end"]]] * 4)
+
+
+def test_lenient_mode_still_checks_paths(tmp_path):
+    path = write_glyphs(tmp_path, [{"name": "ㄱ", "path": [{"start": [0.0, 0.0]}]}])
+    with pytest.raises(GlyphSchemaError):
+        get_glyph_repository(path, require_kind=False)
@@ -0,0 +1,67 @@
+import unicodedata
+
+import numpy as np
+
+from modules.stroke.hangul_codec import (
+    CHOSEONG,
+    JONGSEONG,
+    JONGSEONG_COUNT,
+    JUNGSEONG,
+    JUNGSEONG_COUNT,
+    SYLLABLE_BASE,
+    SYLLABLE_COUNT,
+    decompose,
+    jamo_list,
+    split_syllable,
+)
+
+ALL_SYLLABLES = "".join(chr(SYLLABLE_BASE + i) for i in range(SYLLABLE_COUNT))
+
+
+def recompose(jamos):
+    """(초성, 중성[, 종성]) 호환 자모를 음절로 다시 조합"""
+    cho, jung = CHOSEONG.index(jamos[0]), JUNGSEONG.index(jamos[1])
+    jong = JONGSEONG.index(jamos[2]) + 1 if len(jamos) == 3 else 0
+    return chr(SYLLABLE_BASE + (cho * JUNGSEONG_COUNT + jung) * JONGSEONG_COUNT + jong)
+
+
+def test_split_syllable_round_trips_every_syllable():
+    for a in ALL_SYLLABLES:
+        assert recompose(split_syllable(a)) == a
+
+
+def test_decompose_round_trips_every_syllable():
+    ids, lengths = decompose(ALL_SYLLABLES)
+    assert len(lengths) == SYLLABLE_COUNT
+    assert lengths.sum() == len(ids)
+    jamos = jamo_list(ids)
+    starts = np.cumsum(lengths) - lengths
+    rebuilt = "".join(recompose(jamos[s : s + n]) for s, n in zip(starts, lengths))
+    assert rebuilt == ALL_SYLLABLES
+
+
+def test_decompose_matches_unicode_normalization():
+    # NFD는 조합형 자모를 내므로 이름이 같은 호환 자모로 바꿔 비교
+    for a in "가각닭힣뷁쀍":
+        expected = [
+            unicodedata.lookup("HANGUL LETTER " + unicodedata.name(c).split(" ", 2)[2])
+            for c in unicodedata.normalize("NFD", a)
+        ]
+        assert jamo_list(decompose(a)[0]) == expected
+
+
+def test_decompose_matches_split_syllable_on_mixed_text():
+    text = "한 글, abc\nㄱㅏ가!"
+    ids, lengths = decompose(text)
+    expected = [j for a in text for j in split_syllable(a)]
+    assert jamo_list(ids) == expected
+    assert lengths.tolist() == [len(split_syllable(a)) for a in text]
+
+
+def test_non_hangul_passes_through():
+    assert split_syllable("a") == ("a",)
+    assert split_syllable("ㄱ") == ("ㄱ",)
+    # 조합형 자모는 호환 자모로
+    assert split_syllable("ᆨ") == ("ㄱ",)
+    ids, lengths = decompose("")
+    assert len(ids) == 0 and len(lengths) == 0
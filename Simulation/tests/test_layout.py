@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from korean import create_follower
+from modules.stroke.layout import CELL_SIZE, LEGACY_CELLS, Layout, LayoutEngine, LayoutError
+from modules.stroke.stroke_plan import compile_stroke_plan, iter_stroke_plans
+
+SCALE = (0.7, 0.7)
+
+
+def box(a, tolerance):
+    """글자마다 획 하나 (글자 상자 대각선, 글자 번호를 펜 높이 자리에 적어 둔다)"""
+    return np.array([[[ord(a) % 7, 0.0, 0.0], [ord(a) % 7, 0.2, 0.2]]])
+
+
+def cell_origins(strokes):
+    return strokes[:, 0, 1:] / np.asarray(SCALE)
+
+
+def test_more_than_nine_syllables_continue_on_the_grid():
+    text = "가나다라마바사아자차카타"
+    strokes, syllable_index = LayoutEngine(box, size=SCALE).compile(text)
+    np.testing.assert_array_equal(syllable_index, np.arange(len(text)))
+    origins = cell_origins(strokes)
+    # 앞 9칸은 예전 배치표 그대로
+    np.testing.assert_allclose(origins[:9], LEGACY_CELLS)
+    # 10번째 칸부터는 두 번째 줄 격자를 이어서 채우고, 6칸이 차면 세 번째 줄로
+    np.testing.assert_allclose(origins[9], (0.0, -CELL_SIZE))
+    np.testing.assert_allclose(origins[11], (CELL_SIZE * 2, -CELL_SIZE))
+    assert len(strokes) == len(text)
+
+
+def test_newlines_start_new_lines_and_take_no_cell():
+    layout = Layout(columns=4)
+    engine = LayoutEngine(box, layout, SCALE)
+    cells = list(engine.iter_cells("가나\n다라마바사\n\n아"))
+    assert [(a, line, column) for _, a, _, line, column, _ in cells] == [
+        ("가", 0, 0), ("나", 0, 1),
+        ("다", 1, 0), ("라", 1, 1), ("마", 1, 2), ("바", 1, 3),
+        ("사", 2, 0),
+        ("아", 4, 0),
+    ]
+    assert [index for index, *_ in cells] == list(range(8))
+    lines = list(engine.iter_lines("가나\n다라마바사\n\n아"))
+    assert [line.characters for line in lines] == ["가나", "다라마바", "사", "아"]
+    assert [line.line for line in lines] == [0, 1, 2, 4]
+    for line in lines:
+        np.testing.assert_array_equal(line.syllable_index, np.arange(len(line.characters)))
+
+
+def test_lines_wrap_to_pages_inside_bounds():
+    layout = Layout(columns=None, bounds=((-0.4, 0.4), (-0.3, 0.2)))
+    engine = LayoutEngine(box, layout, SCALE)
+    text = "가" * (engine.columns * engine.lines + 1)
+    cells = list(engine.iter_cells(text))
+    assert cells[-1][2:5] == (1, 0, 0)
+    # 둘째 페이지의 첫 칸은 첫 페이지의 첫 칸과 같은 자리
+    assert cells[-1][5] == cells[0][5]
+    strokes, _ = engine.compile(text)
+    assert strokes[..., 1].max() <= 0.4 + 1e-9 and strokes[..., 2].min() >= -0.3 - 1e-9
+
+
+def test_streamed_syllables_and_lines_match_compile():
+    text = "가나다라마바사아자\n차카타파하"
+    engine = LayoutEngine(box, Layout(columns=6), SCALE)
+    strokes, syllable_index = engine.compile(text)
+    syllables = list(engine.iter_syllables(text))
+    np.testing.assert_allclose(np.concatenate([s.strokes for s in syllables]), strokes)
+    lines = list(engine.iter_lines(text))
+    np.testing.assert_allclose(np.concatenate([line.strokes for line in lines]), strokes)
+    assert "".join(line.characters for line in lines) == "".join(s.character for s in syllables)
+
+
+def test_bounds_error_names_the_syllable():
+    layout = Layout(columns=12, bounds=((-0.5, 0.5), (-0.5, 0.5)))
+    # 7번째 칸(사)부터 y = 0.5를 넘는다
+    with pytest.raises(LayoutError, match="'사'"):
+        LayoutEngine(box, layout, SCALE).compile("가나다라마바사아자차카타")
+
+
+@pytest.mark.parametrize("order", [None, "strict"])
+def test_line_plans_match_the_compiled_plan(order):
+    text = "융합프로젝트공모전가나\n다라"
+    plans = list(iter_stroke_plans(text, order=order))
+    full = compile_stroke_plan(text, order=order)
+    assert [plan.text for plan in plans] == ["융합프로젝트", "공모전가나", "다라"]
+    np.testing.assert_allclose(np.concatenate([plan.strokes for plan in plans]), full.strokes)
+    assert sum(plan.polyline_count for plan in plans) == full.polyline_count
+
+
+@pytest.mark.parametrize("mode", ["segment", "polyline"])
+def test_streaming_follower_walks_the_same_strokes(mode):
+    text = "가나다라마바사아자\n차카"
+    origin = np.array([0.5, 0.0, 0.2])
+    full = create_follower(text, origin, mode=mode)
+    stream = create_follower(text, origin, mode=mode, stream=True)
+    # 줄을 다 그리기 전에는 지금까지 읽은 줄의 획 수만 안다
+    assert 0 < stream.stroke_count < full.stroke_count
+    # 멀리 있는 엔드 이펙터에서 step()하면 그 획의 다가가기 지점을 돌려준다
+    far = np.array([10.0, 10.0, 10.0])
+    stroke = 0
+    while not stream.finished:
+        expected, _ = full.step(far, current_stroke=stroke)
+        target, _ = stream.step(far, current_stroke=stroke)
+        np.testing.assert_allclose(target, expected)
+        stroke += 1
+        stream.reset(stroke)
+    assert stroke == stream.stroke_count == full.stroke_count
+
+
+def drive(follower, max_ticks=100000):
+    """엔드 이펙터가 목표로 바로 옮겨 간다고 보고 DrawingApp처럼 끝날 때까지 step()"""
+    ee_pos = np.array([0.5, 0.0, 0.3])
+    current_stroke = ticks = 0
+    while current_stroke != follower.stroke_count and ticks < max_ticks:
+        target, is_stroke_complete = follower.step(ee_pos, current_stroke=current_stroke)
+        if target is not None:
+            ee_pos = target.copy()
+        current_stroke += is_stroke_complete
+        ticks += 1
+    return current_stroke, ticks
+
+
+def test_streaming_follower_stops_only_after_the_last_line():
+    text = "가나다라마바사아자\n차카"
+    origin = np.array([0.5, 0.0, 0.2])
+    expected = drive(create_follower(text, origin, mode="polyline"))
+    assert drive(create_follower(text, origin, mode="polyline", stream=True)) == expected
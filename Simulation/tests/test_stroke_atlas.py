@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import puzzle
+from modules.stroke.stroke_atlas import open_stroke_atlas
+
+# 곡선 자모(ㅇ, ㅎ)가 있는 음절은 현 오차에 따라 선분 수가 달라진다
+CURVED = "앙형홍응항잉ㅎ가"
+
+
+@pytest.fixture(scope="module")
+def atlas():
+    atlas = open_stroke_atlas()
+    if atlas is None:
+        pytest.skip("stroke atlas cannot be built here")
+    return atlas
+
+
+@pytest.mark.parametrize("a", [a for a in CURVED if "가" <= a <= "힣"])
+def test_fallback_matches_atlas(atlas, monkeypatch, a):
+    expected = atlas.syllable(a)
+    monkeypatch.setattr(puzzle, "open_stroke_atlas", lambda: None)
+    strokes = puzzle.syllableArray(a)
+    assert strokes.shape == expected.shape
+    np.testing.assert_allclose(strokes, expected, atol=1e-6)
+
+
+def test_non_syllables_are_composed_directly(atlas):
+    np.testing.assert_array_equal(puzzle.syllableArray("ㅎ"), puzzle.makeStrokeArray("ㅎ"))
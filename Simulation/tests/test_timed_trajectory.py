@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from modules.stroke.corner_blending import blend_corners
+from modules.robot_control.timed_trajectory import (
+    PROFILES,
+    S_CURVE,
+    TRAPEZOID,
+    MotionLimits,
+    build_timed_trajectory,
+    move_profiles,
+    profile_distance,
+)
+
+ORIGIN = np.array([0.5, 0.0, 0.2])
+# 글자 좌표 (y, z 평면): 꺾이는 polyline 획 하나와 선분 하나짜리 획
+_VERTICES = np.array([[0, 0, 0], [0, 0.1, 0], [0, 0.1, -0.08], [0, 0.0, -0.15], [0, 0.02, -0.2]], dtype=float)
+SEGMENTS = np.concatenate(
+    [np.stack([_VERTICES[:-1], _VERTICES[1:]], axis=1), [[[0, 0.3, 0], [0, 0.35, -0.05]]]]
+)
+STROKE_OFFSETS = np.array([0, 4, 5])
+# 축마다 다른 제한이어야 축별로 지키는지 드러난다
+LIMITS = dict(velocity=(0.3, 0.2, 0.1), acceleration=(1.0, 2.0, 0.5))
+
+
+def _derivatives(trajectory):
+    dt = trajectory.physics_dt
+    velocity = np.diff(trajectory.positions, axis=0) / dt
+    return velocity, np.diff(velocity, axis=0) / dt
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_axis_limits_hold(profile):
+    limits = MotionLimits(profile=profile, **LIMITS)
+    trajectory = build_timed_trajectory(SEGMENTS, ORIGIN, STROKE_OFFSETS, limits=limits)
+    velocity, acceleration = _derivatives(trajectory)
+    assert np.all(np.abs(velocity).max(axis=0) <= np.array(limits.velocity) * (1 + 1e-6))
+    assert np.all(np.abs(acceleration).max(axis=0) <= np.array(limits.acceleration) * (1 + 1e-6))
+    assert trajectory.stroke_count == 2
+    assert trajectory.stroke_complete.sum() == 2
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_long_move_reaches_peak_velocity(profile):
+    limits = MotionLimits(profile=profile, **LIMITS)
+    # y 방향으로 길게 그리는 선분 하나
+    trajectory = build_timed_trajectory([[[0, 0, 0], [0, 0.6, 0]]], ORIGIN, limits=limits)
+    velocity, _ = _derivatives(trajectory)
+    np.testing.assert_allclose(np.abs(velocity[:, 1]).max(), limits.velocity[1], rtol=1e-6)
+
+
+def test_s_curve_is_smoother_and_slower():
+    trapezoid = build_timed_trajectory(
+        SEGMENTS, ORIGIN, STROKE_OFFSETS, limits=MotionLimits(profile=TRAPEZOID, **LIMITS)
+    )
+    s_curve = build_timed_trajectory(
+        SEGMENTS, ORIGIN, STROKE_OFFSETS, limits=MotionLimits(profile=S_CURVE, **LIMITS)
+    )
+    assert s_curve.duration > trapezoid.duration
+    # 틱 사이 가속도 변화(저크)가 사다리꼴보다 작다
+    jerk = [np.abs(np.diff(_derivatives(t)[1], axis=0)).max() for t in (trapezoid, s_curve)]
+    assert jerk[1] < jerk[0]
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_profile_covers_distance(profile):
+    distances = np.array([0.0, 0.001, 0.05, 0.5])
+    speeds = np.full(4, 0.3)
+    accelerations = np.full(4, 1.0)
+    start = np.array([0.0, 0.0, 0.1, 0.2])
+    end = np.array([0.0, 0.0, 0.0, 0.1])
+    peak, ramp_up, cruise, ramp_down = move_profiles(distances, speeds, accelerations, profile, start, end)
+    assert np.all(peak <= speeds + 1e-12)
+    total = ramp_up + cruise + ramp_down
+    covered = profile_distance(total, distances, start, end, peak, ramp_up, cruise, ramp_down, profile)
+    np.testing.assert_allclose(covered, distances, atol=1e-12)
+    # 시간에 따라 거리가 줄지 않는다
+    t = np.linspace(0.0, 1.0, 200)[:, None] * total
+    s = profile_distance(t, distances, start, end, peak, ramp_up, cruise, ramp_down, profile)
+    assert np.all(np.diff(s, axis=0) >= -1e-12)
+
+
+def test_trajectory_ends_lifted_above_last_point():
+    trajectory = build_timed_trajectory(SEGMENTS, ORIGIN, STROKE_OFFSETS, limits=MotionLimits(**LIMITS))
+    assert trajectory.positions[-1][2] == pytest.approx(ORIGIN[2] + 0.05)
+    assert trajectory.pen_down.any() and not trajectory.pen_down[-1]
+
+
+def _distance_to_polyline(points, vertices):
+    a, b = vertices[:-1], vertices[1:]
+    d = b - a
+    t = np.clip(((points[:, None] - a) * d).sum(-1) / (d * d).sum(-1), 0.0, 1.0)
+    return np.linalg.norm(points[:, None] - (a + t[..., None] * d), axis=-1).min(axis=1)
+
+
+@pytest.mark.parametrize("tolerance", [1e-4, 5e-4, 2e-3])
+def test_blended_corners_stay_within_tolerance(tolerance):
+    blended, offsets = blend_corners(SEGMENTS, STROKE_OFFSETS, radius=0.02, tolerance=tolerance)
+    assert len(offsets) == len(STROKE_OFFSETS)
+    assert len(blended) > len(SEGMENTS)
+    stroke = blended[offsets[0]:offsets[1]]
+    # 조각끼리 이어지고 획의 시작점과 끝점은 그대로
+    np.testing.assert_allclose(stroke[1:, 0], stroke[:-1, 1], atol=1e-12)
+    np.testing.assert_allclose(stroke[0, 0], _VERTICES[0])
+    np.testing.assert_allclose(stroke[-1, 1], _VERTICES[-1])
+    # 포물선 가운데(원래 꼭짓점에서 가장 먼 점)까지 촘촘히 찍어도 원래 경로에서 tolerance 안
+    t = np.linspace(0.0, 1.0, 11)[:, None, None]
+    samples = ((1.0 - t) * stroke[:, 0] + t * stroke[:, 1]).reshape(-1, 3)
+    assert _distance_to_polyline(samples, _VERTICES).max() <= tolerance * (1 + 1e-9)
+    # 선분 하나짜리 획은 그대로
+    np.testing.assert_array_equal(blended[offsets[1]:offsets[2]], SEGMENTS[STROKE_OFFSETS[1]:])
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_blended_path_keeps_axis_limits(profile):
+    limits = MotionLimits(profile=profile, **LIMITS)
+    segments, offsets = blend_corners(SEGMENTS, STROKE_OFFSETS, radius=0.02, tolerance=2e-3)
+    trajectory = build_timed_trajectory(segments, ORIGIN, offsets, limits=limits)
+    velocity, acceleration = _derivatives(trajectory)
+    assert np.all(np.abs(velocity).max(axis=0) <= np.array(limits.velocity) * (1 + 1e-6))
+    assert np.all(np.abs(acceleration).max(axis=0) <= np.array(limits.acceleration) * (1 + 1e-6))
+    assert trajectory.stroke_count == 2
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from modules.stroke.stroke_plan import StrokePlan, compile_stroke_plan
+from modules.stroke.travel_optimizer import (
+    FREE,
+    ORDER_LEVELS,
+    STRICT,
+    SYLLABLE,
+    optimize_order,
+    optimize_plan,
+    travel_distance,
+)
+
+
+def random_plan(seed, syllables=6, strokes_per_syllable=5):
+    rng = np.random.default_rng(seed)
+    count = syllables * strokes_per_syllable
+    strokes = rng.uniform(-0.2, 0.2, size=(count, 2, 3))
+    strokes[..., 0] = 0.0
+    syllable_index = np.repeat(np.arange(syllables), strokes_per_syllable)
+    return StrokePlan("가" * syllables, None, (0.7, 0.7), strokes, syllable_index)
+
+
+def segment_keys(strokes, syllable_index, undirected):
+    """(글자 번호, 선분) 묶음을 순서와 무관하게 비교할 수 있는 정렬된 목록"""
+    keys = []
+    for (start, end), syllable in zip(np.round(strokes, 12), syllable_index):
+        a, b = tuple(start), tuple(end)
+        if undirected:
+            a, b = min(a, b), max(a, b)
+        keys.append((int(syllable), a, b))
+    return sorted(keys)
+
+
+PLANS = [
+    random_plan(0),
+    random_plan(1, syllables=3, strokes_per_syllable=9),
+    compile_stroke_plan("융합프로젝트"),
+]
+
+
+@pytest.mark.parametrize("plan", PLANS)
+@pytest.mark.parametrize("level", ORDER_LEVELS)
+@pytest.mark.parametrize("allow_reverse", [False, True])
+@pytest.mark.parametrize("unit", ["segment", "polyline"])
+def test_optimize_plan_keeps_the_segment_set(plan, level, allow_reverse, unit):
+    strokes, syllable_index, report = optimize_plan(plan, level, allow_reverse, unit)
+    assert strokes.shape == plan.strokes.shape
+    assert segment_keys(strokes, syllable_index, allow_reverse) == segment_keys(
+        plan.strokes, plan.syllable_index, allow_reverse
+    )
+    assert report.after <= report.before + 1e-12
+
+
+@pytest.mark.parametrize("plan", PLANS)
+@pytest.mark.parametrize("level", ORDER_LEVELS)
+@pytest.mark.parametrize("unit", ["segment", "polyline"])
+def test_directions_are_kept_without_reverse(plan, level, unit):
+    strokes, syllable_index, _ = optimize_plan(plan, level, False, unit)
+    # 방향까지 같은 선분이 그대로 있어야 한다 (뒤집힌 선분이 없다)
+    assert segment_keys(strokes, syllable_index, False) == segment_keys(
+        plan.strokes, plan.syllable_index, False
+    )
+
+
+@pytest.mark.parametrize("plan", PLANS)
+def test_strict_keeps_the_stroke_order(plan):
+    strokes, syllable_index, report = optimize_plan(plan, STRICT, False)
+    np.testing.assert_array_equal(strokes, plan.strokes)
+    np.testing.assert_array_equal(syllable_index, plan.syllable_index)
+    assert report.after == pytest.approx(report.before)
+
+
+@pytest.mark.parametrize("plan", PLANS)
+@pytest.mark.parametrize("allow_reverse", [False, True])
+def test_syllable_level_keeps_the_syllable_order(plan, allow_reverse):
+    _, syllable_index, _ = optimize_plan(plan, SYLLABLE, allow_reverse)
+    assert np.all(np.diff(syllable_index) >= 0)
+
+
+@pytest.mark.parametrize("level", ORDER_LEVELS)
+@pytest.mark.parametrize("allow_reverse", [False, True])
+def test_optimize_order_is_a_permutation(level, allow_reverse):
+    rng = np.random.default_rng(2)
+    starts, ends = rng.uniform(size=(2, 40, 3))
+    groups = np.repeat(np.arange(8), 5)
+    order, flipped = optimize_order(starts, ends, groups, level, allow_reverse)
+    assert sorted(order.tolist()) == list(range(40))
+    if not allow_reverse:
+        assert not flipped.any()
+    if level == FREE:
+        assert travel_distance(starts, ends, order, flipped) <= travel_distance(starts, ends) + 1e-12
+
+
+def test_empty_input():
+    order, flipped = optimize_order(np.empty((0, 3)), np.empty((0, 3)))
+    assert len(order) == 0 and len(flipped) == 0